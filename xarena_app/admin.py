@@ -1,8 +1,16 @@
 from django.contrib import admin
-from .models import CustomUser, Lapangan, Jadwal, Ulasan, Pemesanan
+from .models import (
+    CustomUser, Lapangan, Jadwal, JadwalArsip, JamOperasional, PengecualianJadwal, Ulasan, Pemesanan, PemesananArsip,
+    RekapHarian,
+)
 
 admin.site.register(CustomUser)
 admin.site.register(Lapangan)
 admin.site.register(Jadwal)
+admin.site.register(JamOperasional)
+admin.site.register(PengecualianJadwal)
 admin.site.register(Ulasan)
 admin.site.register(Pemesanan)
+admin.site.register(JadwalArsip)
+admin.site.register(PemesananArsip)
+admin.site.register(RekapHarian)
@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core import checks
+from django.db.backends.signals import connection_created
 
 
 class XarenaAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'xarena_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .auth import cek_cache_bersama
+
+        checks.register(cek_cache_bersama, checks.Tags.security)
+
+        if settings.SQL_INSTRUMENTASI:
+            from .middleware import pasang_wrapper_sql
+            connection_created.connect(pasang_wrapper_sql)
@@ -0,0 +1,128 @@
+from collections import Counter
+from django.db import connections, router, transaction
+from django.db.models import Exists, F, OuterRef
+from .caching import hapus_statistik
+from .models import Jadwal, JadwalArsip, JumlahArsip, Ketersediaan, Pemesanan, PemesananArsip
+
+# pemesanan yang sudah tidak akan berubah lagi
+STATUS_TUTUP = ('selesai', 'dibatalkan')
+
+FIELDS_PEMESANAN = (
+    'id', 'user_id', 'staff_id', 'jadwal_id', 'metode_pembayaran', 'status', 'harga_total', 'created_at', 'updated_at',
+)
+FIELDS_JADWAL = ('id', 'lapangan_id', 'tanggal', 'jam_mulai', 'jam_selesai', 'is_available')
+
+
+def riwayat_pemesanan(dengan_user=True):
+    # (pemesanan aktif, arsip) dengan nama kolom yang sama, difilter / dibaca masing-masing
+    # kolom tambahan: lapangan_id, tanggal, jam_mulai, jam_selesai, nama_lapangan, harga_per_jam,
+    # dan jika dengan_user: username, email, nama_staff (join ke tabel user)
+    relasi = {
+        'username': F('user__username'),
+        'email': F('user__email'),
+        'nama_staff': F('staff__username'),
+    } if dengan_user else {}
+    aktif = Pemesanan.objects.annotate(
+        lapangan_id=F('jadwal__lapangan_id'),
+        tanggal=F('jadwal__tanggal'),
+        jam_mulai=F('jadwal__jam_mulai'),
+        jam_selesai=F('jadwal__jam_selesai'),
+        nama_lapangan=F('jadwal__lapangan__nama'),
+        harga_per_jam=F('jadwal__lapangan__harga_per_jam'),
+        **relasi,
+    )
+    arsip = PemesananArsip.objects.annotate(
+        nama_lapangan=F('lapangan__nama'),
+        harga_per_jam=F('lapangan__harga_per_jam'),
+        **relasi,
+    )
+    return aktif, arsip
+
+
+# jumlah id per DELETE, di bawah batas parameter sqlite (999)
+HAPUS_PER_QUERY = 500
+
+
+def _hapus_langsung(model, ids):
+    # DELETE ... WHERE id IN (...) tanpa Collector, jadi tanpa signal per baris
+    # yang biasanya dikerjakan signal (index ketersediaan, statistik, cache, rekap) diurus pemanggil
+    db = router.db_for_write(model)
+    connection = connections[db]
+    sql = 'DELETE FROM {} WHERE {} IN ({{}})'.format(
+        connection.ops.quote_name(model._meta.db_table),
+        connection.ops.quote_name(model._meta.pk.column),
+    )
+    with connection.cursor() as cursor:
+        for i in range(0, len(ids), HAPUS_PER_QUERY):
+            potongan = ids[i:i + HAPUS_PER_QUERY]
+            cursor.execute(sql.format(', '.join(['%s'] * len(potongan))), potongan)
+
+
+def _tambah_jumlah(rows):
+    # penghitung arsip per status, dibaca statistik dashboard
+    for status, jumlah in Counter(row['status'] for row in rows).items():
+        JumlahArsip.objects.get_or_create(status=status)
+        JumlahArsip.objects.filter(status=status).update(jumlah=F('jumlah') + jumlah)
+
+
+def arsipkan_pemesanan(batas, batch_size=1000):
+    # pemesanan tertutup dengan jadwal sebelum `batas` dipindah ke PemesananArsip
+    qs = Pemesanan.objects.filter(status__in=STATUS_TUTUP, jadwal__tanggal__lt=batas).order_by('id').values(
+        *FIELDS_PEMESANAN,
+        lapangan_id=F('jadwal__lapangan_id'),
+        tanggal=F('jadwal__tanggal'),
+        jam_mulai=F('jadwal__jam_mulai'),
+        jam_selesai=F('jadwal__jam_selesai'),
+    )
+    total = 0
+    while True:
+        with transaction.atomic():
+            rows = list(qs[:batch_size])
+            if not rows:
+                break
+            PemesananArsip.objects.bulk_create([PemesananArsip(**row) for row in rows], ignore_conflicts=True)
+            _hapus_langsung(Pemesanan, [row['id'] for row in rows])
+            _tambah_jumlah(rows)
+        total += len(rows)
+    if total:
+        hapus_statistik('pemesanan')
+    return total
+
+
+def arsipkan_jadwal(batas, batch_size=1000):
+    # jadwal sebelum `batas` yang tidak lagi dipakai pemesanan mana pun dipindah ke JadwalArsip
+    # return: (jumlah, set (lapangan_id, tanggal) yang tersentuh)
+    qs = Jadwal.objects.filter(tanggal__lt=batas).exclude(
+        Exists(Pemesanan.objects.filter(jadwal=OuterRef('pk')))
+    ).order_by('id').values(*FIELDS_JADWAL)
+    total = 0
+    hari = set()
+    while True:
+        with transaction.atomic():
+            rows = list(qs[:batch_size])
+            if not rows:
+                break
+            JadwalArsip.objects.bulk_create([JadwalArsip(**row) for row in rows], ignore_conflicts=True)
+            _hapus_langsung(Jadwal, [row['id'] for row in rows])
+        total += len(rows)
+        hari |= {(row['lapangan_id'], row['tanggal']) for row in rows}
+    return total, hari
+
+
+def rapikan_ketersediaan(batas, hari):
+    # index hari yang jadwalnya sudah habis dihapus sekaligus,
+    # hari yang masih punya jadwal (pemesanan belum tertutup) di-refresh satu per satu
+    with transaction.atomic():
+        Ketersediaan.objects.filter(tanggal__lt=batas).exclude(
+            Exists(Jadwal.objects.filter(lapangan=OuterRef('lapangan'), tanggal=OuterRef('tanggal')))
+        ).delete()
+        sisa = set(Jadwal.objects.filter(tanggal__lt=batas).values_list('lapangan_id', 'tanggal').distinct())
+        for lapangan_id, tanggal in sisa & hari:
+            Ketersediaan.refresh(lapangan_id, tanggal)
+
+
+def arsipkan(batas, batch_size=1000):
+    pemesanan = arsipkan_pemesanan(batas, batch_size)
+    jadwal, hari = arsipkan_jadwal(batas, batch_size)
+    rapikan_ketersediaan(batas, hari)
+    return pemesanan, jadwal
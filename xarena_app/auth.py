@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core import checks
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def _key_user(user_id):
+    return f'auth:user:{user_id}'
+
+
+def hapus_cache_user(user_id):
+    cache.delete(_key_user(user_id))
+
+
+def cache_bersama():
+    # LocMemCache hanya ada di satu proses: hapus_cache_user dari worker lain / changepassword tidak sampai
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+# engine session yang menyimpan session di cache
+SESSION_ENGINE_CACHE = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+def cek_cache_bersama(app_configs, **kwargs):
+    errors = []
+    if cache_bersama():
+        return errors
+    if settings.AUTH_USER_CACHE:
+        errors.append(checks.Error(
+            'AUTH_USER_CACHE butuh cache bersama (Redis / memcached / database), bukan cache per proses',
+            hint='Set XARENA_REDIS_URL atau matikan XARENA_AUTH_CACHE',
+            id='xarena.E001',
+        ))
+    # session yang dihapus (logout / flush) hanya hilang dari cache proses yang menghapusnya
+    if settings.SESSION_ENGINE in SESSION_ENGINE_CACHE and settings.JUMLAH_PROSES > 1:
+        errors.append(checks.Error(
+            f'SESSION_ENGINE {settings.SESSION_ENGINE} dengan cache per proses dan {settings.JUMLAH_PROSES} proses',
+            hint='Set XARENA_REDIS_URL atau XARENA_SESSION=db',
+            id='xarena.E001',
+        ))
+    return errors
+
+
+# user untuk request yang sudah login diambil dari cache, bukan query CustomUser setiap request
+# hanya aktif jika AUTH_USER_CACHE dan cache-nya bersama, selain itu sama persis dengan ModelBackend
+# cache dihapus lewat signal setiap user disimpan / dihapus (termasuk ganti password dan last_login),
+# perubahan tanpa signal (QuerySet.update) baru terlihat setelah AUTH_USER_CACHE_TTL
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        if not settings.AUTH_USER_CACHE or not cache_bersama():
+            return super().get_user(user_id)
+
+        key = _key_user(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.AUTH_USER_CACHE_TTL)
+        return user
@@ -0,0 +1,129 @@
+from datetime import timedelta
+from functools import wraps
+from hashlib import md5
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+from .models import CustomUser, JumlahArsip, Lapangan, Pemesanan, RekapHarian, Ulasan
+
+# statistik dashboard, dihitung satu query agregat per tabel lalu dicache singkat
+STATISTIK_KEYS = {
+    'pemesanan': 'statistik:pemesanan',
+    'user': 'statistik:user',
+    'lapangan': 'statistik:lapangan',
+    'ulasan': 'statistik:ulasan',
+    'rekap': 'statistik:rekap',
+}
+
+# jumlah hari terakhir di grafik dashboard admin
+GRAFIK_REKAP_HARI = 30
+
+
+def _statistik(nama, hitung):
+    return cache.get_or_set(STATISTIK_KEYS[nama], hitung, settings.DASHBOARD_STATS_TTL)
+
+
+def statistik_pemesanan():
+    # riwayat yang sudah diarsipkan tetap ikut dihitung, dari penghitung JumlahArsip (tanpa scan arsip)
+    def hitung():
+        aktif = Pemesanan.objects.aggregate(
+            total=Count('id'),
+            pending=Count('id', filter=Q(status='pending')),
+            diterima=Count('id', filter=Q(status='diterima')),
+            selesai=Count('id', filter=Q(status='selesai')),
+        )
+        arsip = dict(JumlahArsip.objects.values_list('status', 'jumlah'))
+        statistik = {key: aktif[key] + arsip.get(key, 0) for key in ('pending', 'diterima', 'selesai')}
+        statistik['total'] = aktif['total'] + sum(arsip.values())
+        # jumlah di tabel utama saja, total perkiraan paginasi dashboard
+        statistik['aktif'] = aktif['total']
+        return statistik
+
+    return _statistik('pemesanan', hitung)
+
+
+def statistik_user():
+    return _statistik('user', lambda: CustomUser.objects.aggregate(
+        users=Count('id', filter=Q(is_staff=False, is_superuser=False)),
+        staff=Count('id', filter=Q(is_staff=True)),
+    ))
+
+
+def statistik_lapangan():
+    return _statistik('lapangan', lambda: Lapangan.objects.aggregate(total=Count('id')))
+
+
+def statistik_ulasan():
+    return _statistik('ulasan', lambda: Ulasan.objects.aggregate(total=Count('id')))
+
+
+def statistik_rekap():
+    # pendapatan & okupansi semua lapangan per hari, dibaca dari rekap harian (bukan join pemesanan)
+    def hitung():
+        akhir = timezone.localdate()
+        mulai = akhir - timedelta(days=GRAFIK_REKAP_HARI - 1)
+        rows = {
+            row['tanggal']: row
+            for row in RekapHarian.objects.filter(tanggal__range=(mulai, akhir)).values('tanggal').annotate(
+                pendapatan=Sum('pendapatan'), terpesan=Sum('jam_terpesan'), tersedia=Sum('jam_tersedia'),
+            ).order_by()
+        }
+        grafik = {'label': [], 'pendapatan': [], 'okupansi': []}
+        for i in range(GRAFIK_REKAP_HARI):
+            tanggal = mulai + timedelta(days=i)
+            row = rows.get(tanggal)
+            grafik['label'].append(tanggal.strftime('%d/%m'))
+            grafik['pendapatan'].append(float(row['pendapatan']) if row else 0)
+            grafik['okupansi'].append(
+                round(float(row['terpesan'] * 100 / row['tersedia']), 2) if row and row['tersedia'] else 0
+            )
+        return grafik
+
+    return _statistik('rekap', hitung)
+
+
+def hapus_statistik(*nama):
+    # dijalankan setelah commit supaya request lain tidak mengisi cache dengan data lama
+    keys = [STATISTIK_KEYS[n] for n in nama or STATISTIK_KEYS]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+# versi katalog lapangan publik, dibaca dari database (jumlah lapangan & perubahan terakhir)
+# supaya perubahan dari proses lain (worker lain, rebuild_rating, worker gambar) langsung terlihat
+# semua fragment & halaman publik memakai versi ini di key-nya, jadi tidak perlu dihapus satu-satu
+def versi_katalog():
+    row = Lapangan.objects.aggregate(jumlah=Count('id'), diubah=Max('diubah_at'))
+    diubah = int(row['diubah'].timestamp() * 1_000_000) if row['diubah'] else 0
+    return f"{row['jumlah']}-{diubah}"
+
+
+def cache_halaman_publik(view):
+    # cache seluruh response untuk pengunjung tanpa session & pesan (navbar & pesan tidak bergantung user)
+    # pengunjung dengan session tetap dirender, tapi fragment katalog tetap dari cache
+    @wraps(view)
+    def inner(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or any(
+            cookie in request.COOKIES for cookie in (settings.SESSION_COOKIE_NAME, CookieStorage.cookie_name)
+        ):
+            return view(request, *args, **kwargs)
+
+        path = md5(request.get_full_path().encode()).hexdigest()
+        # dipakai ulang oleh view untuk key fragment katalog
+        request.versi_katalog = versi_katalog()
+        key = f'halaman:{request.versi_katalog}:{path}'
+        response = cache.get(key)
+        if response is not None:
+            return response
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200:
+            if getattr(response, 'is_rendered', True):
+                cache.set(key, response, settings.KATALOG_CACHE_TTL)
+            else:
+                response.add_post_render_callback(lambda r: cache.set(key, r, settings.KATALOG_CACHE_TTL))
+        return response
+
+    return inner
@@ -0,0 +1,184 @@
+import csv
+import zipfile
+from decimal import Decimal
+from itertools import chain
+from xml.sax.saxutils import escape
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from .arsip import riwayat_pemesanan
+from .models import durasi_menit
+
+KOLOM = [
+    ('id', 'ID'),
+    ('tanggal', 'Tanggal'),
+    ('jam_mulai', 'Jam Mulai'),
+    ('jam_selesai', 'Jam Selesai'),
+    ('nama_lapangan', 'Lapangan'),
+    ('username', 'User'),
+    ('email', 'Email'),
+    ('status', 'Status'),
+    ('metode_pembayaran', 'Metode Pembayaran'),
+    ('harga', 'Harga'),
+    ('nama_staff', 'Staff'),
+    ('created_at', 'Dibuat'),
+    ('arsip', 'Arsip'),
+]
+
+FIELDS = (
+    'id', 'tanggal', 'jam_mulai', 'jam_selesai', 'nama_lapangan', 'username', 'email', 'status',
+    'metode_pembayaran', 'harga_total', 'harga_per_jam', 'nama_staff', 'created_at',
+)
+
+
+def baris_pemesanan(mulai=None, selesai=None, lapangan_id=None, status=None, chunk_size=2000):
+    # arsip lalu pemesanan aktif, masing-masing dibaca per chunk urut id (tanpa sort di database)
+    querysets = []
+    for qs in riwayat_pemesanan():
+        if mulai:
+            qs = qs.filter(tanggal__gte=mulai)
+        if selesai:
+            qs = qs.filter(tanggal__lte=selesai)
+        if lapangan_id:
+            qs = qs.filter(lapangan_id=lapangan_id)
+        if status:
+            qs = qs.filter(status=status)
+        querysets.append(qs.order_by('id').values(*FIELDS).iterator(chunk_size=chunk_size))
+    aktif, arsip = querysets
+
+    for row, diarsipkan in chain(((row, True) for row in arsip), ((row, False) for row in aktif)):
+        harga = row['harga_total']
+        if harga is None:
+            # pemesanan lama tanpa snapshot harga, dihitung seperti Pemesanan.hitung_harga
+            durasi = durasi_menit(row['jam_mulai'], row['jam_selesai'])
+            harga = (row['harga_per_jam'] * Decimal(durasi) / 60).quantize(Decimal('0.01'))
+        row['harga'] = harga
+        row['created_at'] = timezone.localtime(row['created_at']).strftime('%Y-%m-%d %H:%M:%S')
+        row['arsip'] = 'ya' if diarsipkan else 'tidak'
+        yield [row[key] for key, _ in KOLOM]
+
+
+class _Gema:
+    # "file" untuk csv.writer yang langsung mengembalikan baris yang ditulis
+    def write(self, value):
+        return value
+
+
+# awalan teks yang dibaca Excel / LibreOffice sebagai formula (username, email, nama lapangan dari user)
+AWALAN_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _sel_csv(value):
+    if value is None:
+        return ''
+    if isinstance(value, str) and value.startswith(AWALAN_FORMULA):
+        # petik di depan membuat sel dibaca sebagai teks, bukan formula
+        return "'" + value
+    return value
+
+
+def stream_csv(rows, baris_per_potongan=500):
+    writer = csv.writer(_Gema())
+    potongan = [writer.writerow([judul for _, judul in KOLOM])]
+    for row in rows:
+        potongan.append(writer.writerow([_sel_csv(value) for value in row]))
+        if len(potongan) >= baris_per_potongan:
+            yield ''.join(potongan)
+            potongan = []
+    yield ''.join(potongan)
+
+
+async def stream_async(konten):
+    # di ASGI iterator sinkron dibaca habis dulu oleh StreamingHttpResponse sebelum dikirim,
+    # jadi potongan diambil satu per satu di thread (query database tetap di thread yang sama)
+    berikut = sync_to_async(next, thread_sensitive=True)
+    konten = iter(konten)
+    while (potongan := await berikut(konten, None)) is not None:
+        yield potongan
+
+
+class _Penampung:
+    # tujuan zipfile yang tidak bisa di-seek, isinya diambil generator setiap beberapa baris
+    def __init__(self):
+        self.potongan = []
+
+    def write(self, data):
+        self.potongan.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def ambil(self):
+        data = b''.join(self.potongan)
+        self.potongan = []
+        return data
+
+
+XLSX_STATIS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Pemesanan" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _sel_xlsx(value):
+    if value is None:
+        return '<c/>'
+    if isinstance(value, (int, Decimal)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    return f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+
+def stream_xlsx(rows, baris_per_potongan=500):
+    # xlsx minimal (inline string, tanpa style) ditulis sebagai zip streaming
+    # zipfile memakai data descriptor jika tujuan tidak bisa di-seek, jadi tidak perlu file sementara
+    # ukuran sheet belum diketahui saat header ditulis: tanpa force_zip64 export di atas 2 GiB
+    # gagal di tengah stream ("File size too large")
+    penampung = _Penampung()
+    with zipfile.ZipFile(penampung, 'w', compression=zipfile.ZIP_DEFLATED) as xlsx:
+        for nama, isi in XLSX_STATIS.items():
+            xlsx.writestr(nama, isi)
+
+        with xlsx.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            rows = chain([[judul for _, judul in KOLOM]], rows)
+            for i, row in enumerate(rows, 1):
+                sheet.write(f'<row>{"".join(_sel_xlsx(value) for value in row)}</row>'.encode())
+                if i % baris_per_potongan == 0:
+                    yield penampung.ambil()
+            sheet.write(b'</sheetData></worksheet>')
+    yield penampung.ambil()
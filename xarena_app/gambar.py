@@ -0,0 +1,94 @@
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# format turunan: (ekstensi, format Pillow, opsi save)
+FORMAT_TURUNAN = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+_executor = None
+
+
+def path_turunan(nama, ukuran, ekstensi):
+    # lapangan_images/lap1.jpg -> lapangan_images/turunan/lap1_thumb.webp
+    folder, file = posixpath.split(nama)
+    return posixpath.join(folder, 'turunan', f'{posixpath.splitext(file)[0]}_{ukuran}.{ekstensi}')
+
+
+def semua_path_turunan(nama, turunan):
+    # semua file turunan gambar `nama`, turunan: {'thumb': lebar, ...} seperti Lapangan.gambar_turunan
+    return [path_turunan(nama, ukuran, ekstensi) for ukuran in turunan for ekstensi, _, _ in FORMAT_TURUNAN]
+
+
+def hapus_file(paths):
+    for path in paths:
+        default_storage.delete(path)
+
+
+def _simpan(path, isi):
+    if default_storage.exists(path):
+        default_storage.delete(path)
+    default_storage.save(path, ContentFile(isi))
+
+
+def buat_turunan(lapangan_id, file_lama=()):
+    # file_lama: turunan gambar sebelumnya, dihapus setelah turunan baru tersimpan
+    from .models import Lapangan
+
+    lapangan = Lapangan.objects.filter(pk=lapangan_id).only('id', 'gambar').first()
+    if lapangan is None or not lapangan.gambar:
+        return None
+    nama = lapangan.gambar.name
+
+    with default_storage.open(nama) as f:
+        asli = ImageOps.exif_transpose(Image.open(f))
+        asli = asli.convert('RGB')
+
+    turunan = {}
+    for ukuran, lebar in settings.GAMBAR_TURUNAN.items():
+        # gambar kecil tidak diperbesar
+        lebar = min(lebar, asli.width)
+        gambar = asli.resize((lebar, max(1, round(asli.height * lebar / asli.width))), Image.LANCZOS)
+        for ekstensi, format, opsi in FORMAT_TURUNAN:
+            buffer = BytesIO()
+            gambar.save(buffer, format, **opsi)
+            _simpan(path_turunan(nama, ukuran, ekstensi), buffer.getvalue())
+        turunan[ukuran] = lebar
+
+    # hanya jika gambar belum diganti selama turunan dibuat, jika sudah diganti turunan ini ikut dibuang
+    baru = semua_path_turunan(nama, turunan)
+    if not Lapangan.objects.filter(pk=lapangan_id, gambar=nama).update(
+        gambar_turunan=turunan, diubah_at=timezone.now(),
+    ):
+        hapus_file(baru)
+    hapus_file(set(file_lama) - set(baru))
+    return turunan
+
+
+def _jalankan(lapangan_id, file_lama):
+    close_old_connections()
+    try:
+        buat_turunan(lapangan_id, file_lama)
+    except Exception:
+        logger.exception('Gagal membuat turunan gambar lapangan %s', lapangan_id)
+    finally:
+        close_old_connections()
+
+
+def jadwalkan_turunan(lapangan_id, file_lama=()):
+    # resize di thread worker setelah commit, request upload tidak menunggu
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.GAMBAR_WORKER, thread_name_prefix='gambar')
+    transaction.on_commit(lambda: _executor.submit(_jalankan, lapangan_id, file_lama))
@@ -0,0 +1,55 @@
+import asyncio
+from collections import defaultdict
+from threading import Lock
+
+# broker event ketersediaan dalam satu proses
+# setiap stream SSE berlangganan ke (lapangan, tanggal) dengan asyncio.Queue milik event loop-nya
+_pelanggan = defaultdict(set)
+_lock = Lock()
+
+MAKS_ANTREAN = 100
+
+
+def _key(lapangan_id, tanggal):
+    return f'{lapangan_id}:{tanggal}'
+
+
+def subscribe(lapangan_id, tanggal):
+    antrean = asyncio.Queue(maxsize=MAKS_ANTREAN)
+    with _lock:
+        _pelanggan[_key(lapangan_id, tanggal)].add((asyncio.get_running_loop(), antrean))
+    return antrean
+
+
+def unsubscribe(lapangan_id, tanggal, antrean):
+    key = _key(lapangan_id, tanggal)
+    with _lock:
+        _pelanggan[key] = {p for p in _pelanggan[key] if p[1] is not antrean}
+        if not _pelanggan[key]:
+            del _pelanggan[key]
+
+
+def jumlah_pelanggan():
+    with _lock:
+        return sum(len(p) for p in _pelanggan.values())
+
+
+def _kirim(antrean, events):
+    for event in events:
+        try:
+            antrean.put_nowait(event)
+        except asyncio.QueueFull:
+            # klien yang lambat cukup menerima event terakhir, toh klien selalu fetch ulang daftar slot
+            pass
+
+
+def publish(lapangan_id, tanggal, events):
+    # dipanggil dari thread mana saja (view sync, management command), antrean diisi lewat loop pemiliknya
+    with _lock:
+        pelanggan = list(_pelanggan.get(_key(lapangan_id, tanggal), ()))
+    for loop, antrean in pelanggan:
+        try:
+            loop.call_soon_threadsafe(_kirim, antrean, events)
+        except RuntimeError:
+            # loop sudah ditutup tanpa sempat unsubscribe
+            unsubscribe(lapangan_id, tanggal, antrean)
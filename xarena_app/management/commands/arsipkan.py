@@ -0,0 +1,23 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from xarena_app.arsip import arsipkan
+
+
+class Command(BaseCommand):
+    help = 'Pindahkan jadwal & pemesanan tertutup yang lebih lama dari masa retensi ke tabel arsip'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retensi', type=int, help='Jumlah hari yang tetap di tabel utama, default ARSIP_RETENSI_HARI')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        retensi = options['retensi'] if options['retensi'] is not None else settings.ARSIP_RETENSI_HARI
+        batas = timezone.localdate() - timedelta(days=retensi)
+
+        pemesanan, jadwal = arsipkan(batas, batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Data sebelum {batas}: {pemesanan} pemesanan dan {jadwal} jadwal diarsipkan'
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from xarena_app.gambar import buat_turunan
+from xarena_app.models import Lapangan
+
+
+class Command(BaseCommand):
+    help = 'Buat turunan gambar (thumb, card, hero dalam WebP & JPEG) untuk lapangan yang sudah ada'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semua', action='store_true', help='Buat ulang juga yang sudah punya turunan')
+
+    def handle(self, *args, **options):
+        lapangan_list = Lapangan.objects.exclude(gambar='').exclude(gambar__isnull=True)
+        if not options['semua']:
+            lapangan_list = lapangan_list.filter(gambar_turunan={})
+
+        berhasil = gagal = 0
+        for lapangan_id, nama in lapangan_list.values_list('id', 'gambar'):
+            try:
+                buat_turunan(lapangan_id)
+            except (OSError, ValueError) as e:
+                gagal += 1
+                self.stderr.write(f'{nama}: {e}')
+                continue
+            berhasil += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Turunan {berhasil} gambar berhasil dibuat, {gagal} gagal'))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from xarena_app.models import Pemesanan
+
+
+class Command(BaseCommand):
+    help = 'Isi harga_total pemesanan lama yang belum punya snapshot harga'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = 0
+        last_id = 0
+
+        # per batch urut id, harga dihitung dari harga lapangan saat ini
+        while True:
+            batch = list(Pemesanan.objects.filter(
+                harga_total__isnull=True, id__gt=last_id
+            ).select_related('jadwal__lapangan').order_by('id')[:batch_size])
+            if not batch:
+                break
+
+            for pemesanan in batch:
+                pemesanan.harga_total = pemesanan.hitung_harga()
+            with transaction.atomic():
+                Pemesanan.objects.bulk_update(batch, ['harga_total'])
+
+            total += len(batch)
+            last_id = batch[-1].id
+
+        self.stdout.write(self.style.SUCCESS(f'harga_total {total} pemesanan berhasil diisi'))
@@ -0,0 +1,130 @@
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.utils import timezone
+from xarena_app.models import Jadwal, Lapangan
+
+PREFIX = 'benchdb_'
+PROFIL = ('sqlite-basic', 'sqlite', 'postgres')
+
+
+def _worker(lapangan_id, nomor, jumlah, mulai, hasil):
+    connections.close_all()
+    awal = datetime.combine(timezone.localdate() + timedelta(days=1), datetime.min.time())
+    mulai.wait()
+    for i in range(jumlah):
+        # setiap transaksi: buat jadwal lalu klaim, seperti alur pemesanan slot virtual
+        slot = awal + timedelta(minutes=30 * (nomor * jumlah + i))
+        t0 = time.perf_counter()
+        try:
+            with transaction.atomic():
+                jadwal = Jadwal.objects.create(
+                    lapangan_id=lapangan_id,
+                    tanggal=slot.date(),
+                    jam_mulai=slot.time(),
+                    jam_selesai=(slot + timedelta(minutes=30)).time(),
+                )
+                Jadwal.objects.klaim(jadwal)
+            status = 'ok'
+        except OperationalError as e:
+            status = str(e)
+        hasil.put((status, time.perf_counter() - t0))
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Ukur throughput tulis database untuk setiap profil XARENA_DB'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profil', nargs='+', choices=PROFIL, help='Default: profil yang sedang dipakai')
+        parser.add_argument('--processes', type=int, default=8)
+        parser.add_argument('--transaksi', type=int, default=200, help='Jumlah transaksi per proses')
+        parser.add_argument('--json', help='Simpan hasil ke file JSON')
+        parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            self.stdout.write(json.dumps(self._ukur(options['processes'], options['transaksi'])))
+            return
+
+        hasil = []
+        for profil in options['profil'] or [settings.DB_PROFIL]:
+            self.stdout.write(f'profil {profil} ...')
+            hasil.append(self._jalankan_profil(profil, options))
+            row = hasil[-1]
+            self.stdout.write(
+                f"  {row['transaksi']} transaksi dalam {row['durasi']:.2f}s ({row['tps']:.0f} tx/s), "
+                f"p50 {row['p50_ms']:.1f}ms, p99 {row['p99_ms']:.1f}ms, error {row['error']}"
+            )
+            for pesan in row['pesan_error']:
+                self.stdout.write(f'    {pesan}')
+
+        if options['json']:
+            with open(options['json'], 'w') as f:
+                json.dump(hasil, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Hasil disimpan di {options['json']}"))
+
+    def _jalankan_profil(self, profil, options):
+        # setiap profil dijalankan di proses baru karena DATABASES dibaca saat settings dimuat
+        env = dict(os.environ, XARENA_DB=profil)
+        manage = [sys.executable, str(settings.BASE_DIR / 'manage.py')]
+        with tempfile.TemporaryDirectory() as tmp:
+            if profil.startswith('sqlite'):
+                # sqlite diuji di file database sementara, data asli tidak tersentuh
+                env['XARENA_DB_NAME'] = os.path.join(tmp, 'benchmark.sqlite3')
+                subprocess.run(manage + ['migrate', '--noinput', '-v0'], env=env, check=True)
+
+            proses = subprocess.run(
+                manage + ['benchmark_db', '--worker',
+                          '--processes', str(options['processes']), '--transaksi', str(options['transaksi'])],
+                env=env, capture_output=True, text=True,
+            )
+        if proses.returncode:
+            raise CommandError(f'profil {profil} gagal:\n{proses.stderr}')
+        return dict(json.loads(proses.stdout.strip().splitlines()[-1]), profil=profil)
+
+    def _ukur(self, processes, jumlah):
+        lapangan = Lapangan.objects.create(nama=f'{PREFIX}lapangan', deskripsi='Data uji benchmark_db', harga_per_jam=0)
+        ctx = multiprocessing.get_context('fork')
+        mulai = ctx.Event()
+        hasil = ctx.Queue()
+
+        connections.close_all()
+        # pool psycopg tidak boleh diwariskan ke proses anak
+        if hasattr(connection, 'close_pool'):
+            connection.close_pool()
+        workers = [ctx.Process(target=_worker, args=(lapangan.id, i, jumlah, mulai, hasil)) for i in range(processes)]
+        for worker in workers:
+            worker.start()
+
+        time.sleep(0.5)
+        t0 = time.perf_counter()
+        mulai.set()
+        rows = [hasil.get() for _ in range(processes * jumlah)]
+        durasi = time.perf_counter() - t0
+        for worker in workers:
+            worker.join()
+
+        Lapangan.objects.filter(pk=lapangan.pk).delete()
+
+        latencies = sorted(latency for _, latency in rows)
+        error = [status for status, _ in rows if status != 'ok']
+        return {
+            'processes': processes,
+            'transaksi': len(rows),
+            'durasi': durasi,
+            'tps': (len(rows) - len(error)) / durasi,
+            'p50_ms': latencies[len(latencies) // 2] * 1000,
+            'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+            'error': len(error),
+            'pesan_error': sorted(set(error)),
+        }
@@ -0,0 +1,211 @@
+import json
+import statistics
+import time
+import django
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import get_resolver, reverse
+from django.utils import timezone
+from xarena_app.models import CustomUser, Jadwal, Pemesanan
+
+PREFIX = 'bench_'
+
+# budget per view: (maks query per request, cache kosong maupun hangat; maks median ms saat cache hangat)
+BUDGET = {
+    'landing': (2, 50),
+    'about': (2, 50),
+    'register': (2, 50),
+    'login': (2, 50),
+    'logout': (2, 50),
+    'list_lapangan': (3, 300),
+    'dashboard_user': (6, 100),
+    'detail_lapangan': (8, 150),
+    'pesan_lapangan': (5, 100),
+    'konfirmasi_pemesanan': (5, 100),
+    'cancel_pemesanan': (4, 100),
+    'detail_pemesanan_user': (6, 100),
+    'dashboard_staff': (10, 150),
+    'detail_pemesanan_staff': (7, 100),
+    'dashboard_admin': (10, 150),
+    'manage_lapangan': (4, 300),
+    'manage_jadwal': (8, 300),
+    'generate_jadwal': (10, 300),
+    # session + user (cache user login mati secara default) + versi + slot
+    'get_jadwal': (5, 50),
+    'get_window_kosong': (5, 100),
+}
+
+# view yang tidak diukur: mengubah data setiap dipanggil atau tidak pernah selesai (stream)
+DILEWATI = {
+    'add_ulasan': 'POST mengubah data',
+    'update_pemesanan': 'POST mengubah data',
+    'add_pemesanan': 'POST mengubah data',
+    'delete_ulasan': 'POST mengubah data',
+    'add_lapangan': 'POST mengubah data',
+    'edit_lapangan': 'POST mengubah data',
+    'delete_lapangan': 'POST mengubah data',
+    'edit_jadwal': 'POST mengubah data',
+    'stream_jadwal': 'stream SSE tidak pernah selesai',
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark semua view di xarena_app/urls.py pada dataset besar, dengan budget query & latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lapangan', type=int, default=2000)
+        parser.add_argument('--user', type=int, default=5000)
+        parser.add_argument('--hari', type=int, default=50)
+        parser.add_argument('--slot', type=int, default=10, help='Jumlah slot 1 jam per hari per lapangan')
+        parser.add_argument('--ulasan-per-user', type=float, default=2.0)
+        parser.add_argument('--rasio-pesan', type=float, default=0.05, help='Porsi jadwal yang sudah dipesan')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--ulang', type=int, default=5, help='Jumlah request hangat per view')
+        parser.add_argument('--db-file', default='xarena_benchmark.sqlite3', help='File database uji (sqlite)')
+        parser.add_argument('--keepdb', action='store_true', help='Pakai ulang database uji yang sudah di-seed')
+        parser.add_argument('--json', help='Simpan hasil ke file JSON')
+        parser.add_argument('--tanpa-budget', action='store_true', help='Jangan gagal jika budget terlampaui')
+        parser.add_argument('--host', default='localhost', help='HTTP_HOST yang diizinkan ALLOWED_HOSTS')
+
+    def handle(self, *args, **options):
+        # database uji terpisah seperti test runner, data asli tidak tersentuh
+        if connection.vendor == 'sqlite':
+            connection.settings_dict['TEST']['NAME'] = options['db_file']
+        nama_db = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            with override_settings(CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'xarena-benchmark',
+            }}):
+                if not CustomUser.objects.filter(username=f'{PREFIX}admin').exists():
+                    call_command(
+                        'seed', prefix=PREFIX, hari_lalu=0, stdout=self.stdout,
+                        **{k: options[k] for k in ('lapangan', 'user', 'hari', 'slot', 'rasio_pesan', 'ulasan_per_user', 'seed')},
+                    )
+                hasil, dilewati = self._ukur_semua(options['ulang'], options['host'])
+        finally:
+            connection.creation.destroy_test_db(nama_db, verbosity=0, keepdb=options['keepdb'])
+
+        gagal = [row for row in hasil if not row['lolos']]
+        for row in hasil:
+            tanda = self.style.SUCCESS('ok') if row['lolos'] else self.style.ERROR('GAGAL')
+            self.stdout.write(
+                f"{tanda} {row['nama']:<24} [{row['status']}/{row['status_harapan']}] query {row['query_cold']}/{row['query_warm']} "
+                f"(budget {row['budget_query']}), p50 {row['ms_p50']:.1f}ms (budget {row['budget_ms']}ms), "
+                f"cold {row['ms_cold']:.1f}ms"
+            )
+        for nama, alasan in dilewati.items():
+            self.stdout.write(f'-- {nama:<24} dilewati: {alasan}')
+
+        if options['json']:
+            with open(options['json'], 'w') as f:
+                json.dump({
+                    'waktu': timezone.now().isoformat(),
+                    'django': django.get_version(),
+                    'database': connection.vendor,
+                    'dataset': {k: options[k] for k in ('lapangan', 'user', 'hari', 'slot', 'ulasan_per_user', 'rasio_pesan', 'seed')},
+                    'hasil': hasil,
+                    'dilewati': dilewati,
+                }, f, indent=2)
+            self.stdout.write(f"Hasil disimpan di {options['json']}")
+
+        if gagal and not options['tanpa_budget']:
+            raise CommandError(
+                f"{len(gagal)} view gagal (status / budget): {', '.join(row['nama'] for row in gagal)}"
+            )
+
+    def _ukur_semua(self, ulang, host):
+        user = CustomUser.objects.filter(
+            username__startswith=f'{PREFIX}user_', pemesanan_user__status='pending'
+        ).order_by('id').first()
+        staff = CustomUser.objects.get(username=f'{PREFIX}staff')
+        admin = CustomUser.objects.get(username=f'{PREFIX}admin')
+        pemesanan = Pemesanan.objects.filter(user=user, status='pending').order_by('id').first()
+        jadwal = Jadwal.objects.filter(is_available=True).order_by('id').first()
+        lapangan = jadwal.lapangan
+        tanggal = jadwal.tanggal.isoformat()
+
+        # (nama url, login sebagai, method, args, query string / data POST, status yang diharapkan)
+        spec = [
+            ('landing', None, 'get', [], None, 200),
+            ('about', None, 'get', [], None, 200),
+            ('register', None, 'get', [], None, 200),
+            ('login', None, 'get', [], None, 200),
+            ('list_lapangan', None, 'get', [], None, 200),
+            ('logout', user, 'get', [], None, 200),
+            ('dashboard_user', user, 'get', [], None, 200),
+            ('detail_lapangan', user, 'get', [lapangan.id], None, 200),
+            ('pesan_lapangan', user, 'get', [jadwal.id], None, 200),
+            ('konfirmasi_pemesanan', user, 'get', [jadwal.id], None, 200),
+            ('cancel_pemesanan', user, 'get', [pemesanan.id], None, 200),
+            ('detail_pemesanan_user', user, 'get', [pemesanan.id], None, 200),
+            ('get_jadwal', user, 'get', [], {'lapangan': lapangan.id, 'tanggal': tanggal}, 200),
+            ('get_window_kosong', user, 'get', [], {'lapangan': lapangan.id, 'tanggal': tanggal}, 200),
+            ('dashboard_staff', staff, 'get', [], None, 200),
+            ('detail_pemesanan_staff', staff, 'get', [pemesanan.id], None, 200),
+            ('dashboard_admin', admin, 'get', [], None, 200),
+            ('manage_lapangan', admin, 'get', [], None, 200),
+            # 7 tanggal per halaman untuk semua lapangan = 7 x jumlah lapangan baris, diukur per lapangan
+            ('manage_jadwal', admin, 'get', [], {'lapangan': lapangan.id}, 200),
+            ('generate_jadwal', admin, 'post', [], {
+                'lapangan': lapangan.id, 'tanggal_mulai': tanggal, 'tanggal_selesai': tanggal,
+                'jam_mulai': '08:00', 'jam_selesai': '12:00', 'durasi': 60,
+            }, 302),
+        ]
+
+        semua = {p.name for p in get_resolver('xarena_app.urls').url_patterns if p.name}
+        diukur = {nama for nama, *_ in spec}
+        dilewati = {nama: DILEWATI.get(nama, 'belum ada skenario') for nama in sorted(semua - diukur)}
+
+        hasil = []
+        for nama, login_as, method, args, data, status_harapan in spec:
+            # host harus lolos ALLOWED_HOSTS, kalau tidak semua request berhenti di 400 tanpa menyentuh view
+            client = Client(HTTP_HOST=host)
+            if login_as:
+                client.force_login(login_as)
+            kirim = getattr(client, method)
+            url = reverse(nama, args=args)
+
+            cache.clear()
+            reset_queries()
+            with CaptureQueriesContext(connection) as queries:
+                t0 = time.perf_counter()
+                statuses = [kirim(url, data).status_code]
+                ms_cold = (time.perf_counter() - t0) * 1000
+            query_cold = len(queries)
+
+            latencies = []
+            for i in range(ulang):
+                reset_queries()
+                with CaptureQueriesContext(connection) as queries:
+                    t0 = time.perf_counter()
+                    statuses.append(kirim(url, data).status_code)
+                    latencies.append((time.perf_counter() - t0) * 1000)
+            query_warm = len(queries)
+            # status pertama yang menyimpang (cold maupun hangat) yang dilaporkan
+            status = next((s for s in statuses if s != status_harapan), status_harapan)
+
+            budget_query, budget_ms = BUDGET.get(nama, (None, None))
+            ms_p50 = statistics.median(latencies) if latencies else ms_cold
+            hasil.append({
+                'nama': nama,
+                'url': url,
+                'method': method.upper(),
+                'status': status,
+                'status_harapan': status_harapan,
+                'query_cold': query_cold,
+                'query_warm': query_warm,
+                'ms_cold': round(ms_cold, 2),
+                'ms_p50': round(ms_p50, 2),
+                'ms_max': round(max(latencies or [ms_cold]), 2),
+                'budget_query': budget_query,
+                'budget_ms': budget_ms,
+                # query hangat ikut dicek: cache yang tidak lagi kena terlihat di sini, bukan di cold
+                'lolos': status == status_harapan and (budget_query is None or (
+                    max(query_cold, query_warm) <= budget_query and ms_p50 <= budget_ms
+                )),
+            })
+        return hasil, dilewati
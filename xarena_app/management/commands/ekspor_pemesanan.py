@@ -0,0 +1,46 @@
+import sys
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from xarena_app.ekspor import baris_pemesanan, stream_csv, stream_xlsx
+
+
+class Command(BaseCommand):
+    help = 'Export riwayat pemesanan (termasuk arsip) ke CSV / XLSX secara streaming'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv')
+        parser.add_argument('--output', help='File tujuan, default stdout')
+        parser.add_argument('--mulai', help='Tanggal jadwal mulai YYYY-MM-DD')
+        parser.add_argument('--selesai', help='Tanggal jadwal selesai YYYY-MM-DD')
+        parser.add_argument('--lapangan', type=int, help='ID lapangan')
+        parser.add_argument('--status', choices=['pending', 'diterima', 'selesai', 'dibatalkan'])
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            mulai, selesai = (
+                datetime.strptime(options[key], '%Y-%m-%d').date() if options[key] else None
+                for key in ('mulai', 'selesai')
+            )
+        except ValueError as e:
+            raise CommandError(f'Error format input: {e}')
+
+        rows = baris_pemesanan(
+            mulai=mulai,
+            selesai=selesai,
+            lapangan_id=options['lapangan'],
+            status=options['status'],
+            chunk_size=options['chunk_size'],
+        )
+        if options['format'] == 'csv':
+            potongan = (baris.encode() for baris in stream_csv(rows))
+        else:
+            potongan = stream_xlsx(rows)
+
+        tujuan = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        try:
+            for data in potongan:
+                tujuan.write(data)
+        finally:
+            if options['output']:
+                tujuan.close()
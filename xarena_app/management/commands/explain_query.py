@@ -0,0 +1,100 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from xarena_app.models import CustomUser, Lapangan, Pemesanan
+
+# tabel besar yang tidak boleh di-scan penuh
+TABEL_PANTAU = (
+    'xarena_app_jadwal', 'xarena_app_pemesanan', 'xarena_app_ulasan', 'xarena_app_ketersediaan',
+    'xarena_app_jadwalarsip', 'xarena_app_pemesananarsip',
+)
+
+
+class Command(BaseCommand):
+    help = 'Tampilkan EXPLAIN QUERY PLAN setiap query yang dijalankan view utama'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='localhost', help='HTTP_HOST yang diizinkan ALLOWED_HOSTS')
+        parser.add_argument('--strict', action='store_true', help='Gagal jika ada full scan pada tabel besar')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'Database {connection.vendor} belum didukung')
+
+        user = CustomUser.objects.filter(is_staff=False, is_superuser=False).order_by('id').first()
+        staff = CustomUser.objects.filter(is_staff=True).order_by('id').first()
+        admin = CustomUser.objects.filter(is_superuser=True).order_by('id').first()
+        lapangan = Lapangan.objects.order_by('id').first()
+        today = timezone.localdate()
+
+        views = [(None, 'list_lapangan', reverse('list_lapangan'))]
+        if user:
+            views.append((user, 'dashboard_user', reverse('dashboard_user')))
+            pemesanan = Pemesanan.objects.filter(user=user).order_by('id').first()
+            if pemesanan:
+                views.append((user, 'detail_pemesanan_user', reverse('detail_pemesanan_user', args=[pemesanan.id])))
+        if user and lapangan:
+            views += [
+                (user, 'detail_lapangan', reverse('detail_lapangan', args=[lapangan.id])),
+                (user, 'get_jadwal', f"{reverse('get_jadwal')}?lapangan={lapangan.id}&tanggal={today}"),
+                (user, 'get_window_kosong', f"{reverse('get_window_kosong')}?lapangan={lapangan.id}&tanggal={today}"),
+            ]
+        if staff:
+            views.append((staff, 'dashboard_staff', reverse('dashboard_staff')))
+        if admin:
+            views += [
+                (admin, 'dashboard_admin', reverse('dashboard_admin')),
+                (admin, 'manage_lapangan', reverse('manage_lapangan')),
+                (admin, 'manage_jadwal', reverse('manage_jadwal')),
+            ]
+
+        scan = []
+        # cache dimatikan supaya semua query benar-benar dijalankan
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}):
+            for login_as, nama, url in views:
+                client = Client(HTTP_HOST=options['host'])
+                if login_as:
+                    client.force_login(login_as)
+                with CaptureQueriesContext(connection) as queries:
+                    status = client.get(url).status_code
+
+                self.stdout.write(self.style.MIGRATE_HEADING(f'\n{nama} {url} [{status}] {len(queries)} query'))
+                for query in queries:
+                    sql = query['sql']
+                    if not sql.lstrip().upper().startswith('SELECT'):
+                        continue
+                    self.stdout.write(f'  {sql[:200]}')
+                    for baris in self._explain(sql):
+                        full_scan = self._full_scan(baris)
+                        self.stdout.write(f'    {baris}' + ('  <-- full scan' if full_scan else ''))
+                        if full_scan:
+                            scan.append((nama, baris))
+
+        self.stdout.write('')
+        if scan:
+            for nama, baris in scan:
+                self.stdout.write(self.style.WARNING(f'full scan di {nama}: {baris}'))
+            if options['strict']:
+                raise CommandError(f'{len(scan)} full scan pada tabel besar')
+        else:
+            self.stdout.write(self.style.SUCCESS('Tidak ada full scan pada tabel besar'))
+
+    def _explain(self, sql):
+        prefix = 'EXPLAIN QUERY PLAN' if connection.vendor == 'sqlite' else 'EXPLAIN'
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}')
+            rows = cursor.fetchall()
+        # sqlite: (id, parent, notused, detail), postgresql: (baris plan,)
+        return [row[-1] for row in rows]
+
+    def _full_scan(self, baris):
+        for tabel in TABEL_PANTAU:
+            if connection.vendor == 'sqlite':
+                if baris.startswith(f'SCAN {tabel}') and 'USING' not in baris:
+                    return True
+            elif f'Seq Scan on {tabel}' in baris:
+                return True
+        return False
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from xarena_app.models import Jadwal, Lapangan
+
+
+class Command(BaseCommand):
+    help = 'Generate jadwal untuk satu atau semua lapangan (slot yang sudah ada dilewati)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lapangan', type=int, action='append', help='ID lapangan, bisa diulang. Default semua lapangan')
+        parser.add_argument('--mulai', help='Tanggal mulai YYYY-MM-DD, default hari ini')
+        parser.add_argument('--hari', type=int, default=90, help='Jumlah hari ke depan')
+        parser.add_argument('--jam-mulai', default='08:00')
+        parser.add_argument('--jam-selesai', default='22:00')
+        parser.add_argument('--durasi', type=int, default=60, help='Durasi slot dalam menit')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        durasi = options['durasi']
+        if durasi < 30 or durasi % 30 != 0:
+            raise CommandError('Durasi harus kelipatan 30 menit')
+
+        try:
+            start_date = (
+                datetime.strptime(options['mulai'], '%Y-%m-%d').date()
+                if options['mulai'] else timezone.localdate()
+            )
+            start_time = datetime.strptime(options['jam_mulai'], '%H:%M').time()
+            end_time = datetime.strptime(options['jam_selesai'], '%H:%M').time()
+        except ValueError as e:
+            raise CommandError(f'Error format input: {e}')
+        end_date = start_date + timedelta(days=options['hari'] - 1)
+
+        lapangan_list = Lapangan.objects.all()
+        if options['lapangan']:
+            lapangan_list = lapangan_list.filter(id__in=options['lapangan'])
+
+        total_created = total_skipped = 0
+        for lapangan in lapangan_list:
+            created, skipped = Jadwal.objects.generate(
+                lapangan, start_date, end_date, start_time, end_time, durasi,
+                batch_size=options['batch_size'],
+            )
+            total_created += created
+            total_skipped += skipped
+            self.stdout.write(f'{lapangan.nama}: {created} slot baru, {skipped} slot sudah ada')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Selesai: {total_created} slot baru, {total_skipped} slot sudah ada'
+        ))
@@ -0,0 +1,45 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from xarena_app.caching import hapus_statistik
+from xarena_app.models import Pemesanan
+
+
+class Command(BaseCommand):
+    help = 'Batalkan pemesanan pending yang kedaluwarsa dan selesaikan pemesanan yang jadwalnya sudah lewat'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hold', type=int, help='Batas pending dalam menit, default PEMESANAN_HOLD_MENIT')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--loop', action='store_true', help='Jalan terus sebagai worker')
+        parser.add_argument('--interval', type=int, help='Jeda antar putaran (detik), default LIFECYCLE_INTERVAL')
+
+    def handle(self, *args, **options):
+        # --hold 0 / --interval 0 tetap dipakai, hanya None yang diganti default settings
+        hold = timedelta(minutes=settings.PEMESANAN_HOLD_MENIT if options['hold'] is None else options['hold'])
+        interval = settings.LIFECYCLE_INTERVAL if options['interval'] is None else options['interval']
+
+        while True:
+            self.putaran(hold, options['batch_size'])
+            if not options['loop']:
+                break
+            try:
+                time.sleep(interval)
+            except KeyboardInterrupt:
+                break
+
+    def putaran(self, hold, batch_size):
+        sekarang = timezone.now()
+        dibatalkan, hari = Pemesanan.objects.kedaluwarsa(sekarang, hold, batch_size=batch_size)
+        selesai = Pemesanan.objects.selesaikan(sekarang, batch_size=batch_size)
+
+        # update() tidak memicu signal, statistik dihapus manual
+        if dibatalkan or selesai:
+            hapus_statistik('pemesanan')
+
+        self.stdout.write(
+            f'[{timezone.localtime(sekarang):%Y-%m-%d %H:%M:%S}] {dibatalkan} pending dibatalkan '
+            f'({len(hari)} hari jadwal dilepas), {selesai} pemesanan selesai'
+        )
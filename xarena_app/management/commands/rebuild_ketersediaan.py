@@ -0,0 +1,48 @@
+from itertools import groupby
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from xarena_app.models import Jadwal, Ketersediaan, Lapangan
+
+
+class Command(BaseCommand):
+    help = 'Bangun ulang index ketersediaan harian dari tabel jadwal'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lapangan', type=int, help='Hanya untuk lapangan tertentu')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        jadwal = Jadwal.objects.all()
+        index = Ketersediaan.objects.all()
+        if options['lapangan']:
+            jadwal = jadwal.filter(lapangan_id=options['lapangan'])
+            index = index.filter(lapangan_id=options['lapangan'])
+
+        # satu pass urut (lapangan, tanggal, jam) lalu dikelompokkan per hari
+        rows = jadwal.order_by('lapangan_id', 'tanggal', 'jam_mulai').values(
+            'lapangan_id', 'tanggal', *Ketersediaan.FIELDS_JADWAL
+        ).iterator(chunk_size=options['batch_size'])
+
+        total = 0
+        batch = []
+        with transaction.atomic():
+            index.delete()
+            for (lapangan_id, tanggal), slots in groupby(rows, key=lambda r: (r['lapangan_id'], r['tanggal'])):
+                batch.append(Ketersediaan.dari_jadwal(lapangan_id, tanggal, slots))
+                if len(batch) >= options['batch_size']:
+                    Ketersediaan.objects.bulk_create(batch)
+                    total += len(batch)
+                    batch = []
+            Ketersediaan.objects.bulk_create(batch)
+            total += len(batch)
+
+            # index baru punya diubah_at baru, versi level lapangan ikut dinaikkan untuk hari yang hilang
+            lapangan = Lapangan.objects.all()
+            if options['lapangan']:
+                lapangan = lapangan.filter(pk=options['lapangan'])
+            lapangan.update(slot_diubah_at=timezone.now())
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Index ketersediaan {total} hari berhasil dibangun ulang'
+        ))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+from xarena_app.models import Lapangan, Ulasan
+
+
+class Command(BaseCommand):
+    help = 'Hitung ulang rating_count dan rating_sum semua lapangan dari tabel ulasan'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            lapangan_list = list(Lapangan.objects.select_for_update().only('id'))
+            agregat = {
+                row['lapangan_id']: row
+                for row in Ulasan.objects.values('lapangan_id').annotate(
+                    count=Count('id'), total=Sum('rating')
+                )
+            }
+
+            # bulk_update tidak mengisi auto_now, diubah_at (versi katalog publik) diisi manual
+            sekarang = timezone.now()
+            for lapangan in lapangan_list:
+                row = agregat.get(lapangan.id)
+                lapangan.rating_count = row['count'] if row else 0
+                lapangan.rating_sum = row['total'] if row else 0
+                lapangan.diubah_at = sekarang
+
+            Lapangan.objects.bulk_update(
+                lapangan_list, ['rating_count', 'rating_sum', 'diubah_at'], batch_size=500
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rating {len(lapangan_list)} lapangan berhasil dihitung ulang'
+        ))
@@ -0,0 +1,29 @@
+import time
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from xarena_app.caching import hapus_statistik
+from xarena_app.rekap import rekap_inkremental, rekap_penuh
+
+
+class Command(BaseCommand):
+    help = 'Hitung ulang rekap pendapatan & okupansi harian per lapangan untuk hari yang berubah sejak rekap terakhir'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--penuh', action='store_true', help='Bangun ulang rekap untuk seluruh riwayat')
+        parser.add_argument('--lapangan-per-batch', type=int, default=200, help='Lapangan per putaran rekap penuh')
+
+    def handle(self, *args, **options):
+        mulai = time.perf_counter()
+        sekarang = timezone.now()
+
+        if options['penuh']:
+            total, penuh = rekap_penuh(options['lapangan_per_batch'], dihitung_at=sekarang), True
+        else:
+            total, penuh = rekap_inkremental(dihitung_at=sekarang)
+        if total:
+            hapus_statistik('rekap')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rekap {"penuh" if penuh else "inkremental"}: {total} hari lapangan dihitung '
+            f'dalam {time.perf_counter() - mulai:.1f}s'
+        ))
@@ -0,0 +1,199 @@
+import random
+import time
+from datetime import datetime, time as jam, timedelta
+from decimal import Decimal
+from io import StringIO
+from itertools import islice
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+from xarena_app.models import CustomUser, Jadwal, Lapangan, Pemesanan, Ulasan
+
+HARGA = [Decimal(h) for h in (80000, 100000, 120000, 150000, 200000)]
+METODE = ['transfer', 'cash']
+KOMENTAR = ['Lapangan bagus', 'Rumput terawat', 'Pencahayaan kurang', 'Parkir luas', 'Harga sesuai', '']
+
+
+class Command(BaseCommand):
+    help = 'Isi database dengan data dummy dalam jumlah besar (load test / staging)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lapangan', type=int, default=50)
+        parser.add_argument('--user', type=int, default=1000)
+        parser.add_argument('--hari', type=int, default=30, help='Jumlah hari jadwal mulai hari ini')
+        parser.add_argument('--hari-lalu', type=int, default=30, help='Jumlah hari riwayat sebelum hari ini')
+        parser.add_argument('--slot', type=int, default=14, help='Slot 1 jam per hari per lapangan, mulai 08:00')
+        parser.add_argument('--rasio-pesan', type=float, default=0.3, help='Porsi slot yang dipesan')
+        parser.add_argument('--rasio-batal', type=float, default=0.1, help='Porsi pemesanan yang dibatalkan')
+        parser.add_argument('--ulasan-per-user', type=float, default=0.5, help='Rata-rata ulasan per user')
+        parser.add_argument('--seed', type=int, default=42, help='Seed random, hasil sama untuk seed yang sama')
+        parser.add_argument('--prefix', default='seed_', help='Awalan username & nama lapangan')
+        parser.add_argument('--password', default='password', help='Password semua akun seed')
+        parser.add_argument(
+            '--hash-per-user', action='store_true',
+            help='Hash password tiap user dengan salt sendiri (lambat), default satu hash dipakai bersama',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000, help='Baris per INSERT / transaksi')
+
+    def handle(self, *args, **options):
+        if not 1 <= options['slot'] <= 16:
+            raise CommandError('Slot per hari harus 1-16 (jam 08:00 - 24:00)')
+        if not 0 <= options['rasio_pesan'] <= 1 or not 0 <= options['rasio_batal'] <= 1:
+            raise CommandError('Rasio harus di antara 0 dan 1')
+        prefix = options['prefix']
+        if CustomUser.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(f'Data dengan prefix "{prefix}" sudah ada, pakai --prefix lain atau database kosong')
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        mulai = time.perf_counter()
+
+        lapangan = self._seed_lapangan(options)
+        users = self._seed_user(options)
+        jumlah_jadwal = self._seed_jadwal(options, lapangan)
+        jumlah_pesan = self._seed_pemesanan(options, lapangan, users)
+        jumlah_ulasan = self._seed_ulasan(options, lapangan, users)
+
+        # index ketersediaan & agregat rating dibangun sekali di akhir, bukan per baris
+        call_command('rebuild_ketersediaan', batch_size=self.batch_size, stdout=StringIO())
+        call_command('rebuild_rating', stdout=StringIO())
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Seed selesai dalam {time.perf_counter() - mulai:.1f}s: {len(lapangan)} lapangan, '
+            f'{len(users)} user, {jumlah_jadwal} jadwal, {jumlah_pesan} pemesanan, {jumlah_ulasan} ulasan'
+        ))
+
+    def _sisipkan(self, model, kolom, rows):
+        # INSERT lewat executemany per chunk, satu transaksi per chunk
+        # tanpa membuat instance model: bulk_create ~3x lebih lambat untuk jutaan baris
+        # kolom lain diisi nilai default field-nya (default Django tidak ada di skema database)
+        # koneksi asli, bukan proxy django.db.connection yang lambat diakses jutaan kali
+        connection = connections[DEFAULT_DB_ALIAS]
+        fields = [model._meta.get_field(nama) for nama in kolom]
+        lain = [field for field in model._meta.concrete_fields if not field.primary_key and field not in fields]
+        default = [field.get_db_prep_save(field.get_default(), connection) for field in lain]
+        fields += lain
+        qn = connection.ops.quote_name
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            qn(model._meta.db_table),
+            ', '.join(qn(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+        total = 0
+        rows = iter(rows)
+        while chunk := list(islice(rows, self.batch_size)):
+            params = [
+                [field.get_db_prep_save(value, connection) for field, value in zip(fields, row)] + default
+                for row in chunk
+            ]
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, params)
+            total += len(chunk)
+        return total
+
+    def _seed_lapangan(self, options):
+        prefix = options['prefix']
+        self._sisipkan(Lapangan, ['nama', 'deskripsi', 'harga_per_jam'], (
+            (f'{prefix}lapangan {i}', 'Lapangan futsal data seed', self.rng.choice(HARGA))
+            for i in range(options['lapangan'])
+        ))
+        return dict(
+            Lapangan.objects.filter(nama__startswith=prefix).values_list('id', 'harga_per_jam')
+        )
+
+    def _seed_user(self, options):
+        prefix = options['prefix']
+        password = options['password']
+        # PBKDF2 sengaja lambat (~ratusan ms), tanpa --hash-per-user semua user berbagi satu hash
+        hash_bersama = make_password(password)
+        sekarang = timezone.now()
+
+        def rows():
+            for i in range(options['user']):
+                yield (
+                    f'{prefix}user_{i}', f'{prefix}user_{i}@example.com',
+                    make_password(password) if options['hash_per_user'] else hash_bersama,
+                    sekarang - timedelta(days=self.rng.randint(0, 365)),
+                )
+
+        self._sisipkan(CustomUser, ['username', 'email', 'password', 'date_joined'], rows())
+        CustomUser.objects.create_user(f'{prefix}staff', password=password, is_staff=True)
+        CustomUser.objects.create_superuser(f'{prefix}admin', password=password)
+        return list(
+            CustomUser.objects.filter(username__startswith=f'{prefix}user_').order_by('id').values_list('id', flat=True)
+        )
+
+    def _seed_jadwal(self, options, lapangan):
+        hari_ini = timezone.localdate()
+        awal = hari_ini - timedelta(days=options['hari_lalu'])
+        jumlah_hari = options['hari_lalu'] + options['hari']
+
+        # slot yang dipesan (dan tidak dibatalkan) sudah tidak tersedia
+        rasio_terisi = options['rasio_pesan'] * (1 - options['rasio_batal'])
+
+        def rows():
+            for lapangan_id in lapangan:
+                for hari in range(jumlah_hari):
+                    tanggal = awal + timedelta(days=hari)
+                    for slot in range(options['slot']):
+                        yield (
+                            lapangan_id, tanggal, jam(8 + slot), jam((9 + slot) % 24),
+                            self.rng.random() >= rasio_terisi,
+                        )
+
+        return self._sisipkan(Jadwal, ['lapangan', 'tanggal', 'jam_mulai', 'jam_selesai', 'is_available'], rows())
+
+    def _seed_pemesanan(self, options, lapangan, users):
+        sekarang = timezone.now()
+        # porsi slot kosong yang punya pemesanan dibatalkan, supaya total pemesanan = rasio_pesan
+        rasio_terisi = options['rasio_pesan'] * (1 - options['rasio_batal'])
+        rasio_batal_kosong = (options['rasio_pesan'] - rasio_terisi) / (1 - rasio_terisi) if rasio_terisi < 1 else 0
+
+        jadwal = Jadwal.objects.filter(lapangan_id__in=list(lapangan)).order_by('id').values_list(
+            'id', 'lapangan_id', 'tanggal', 'jam_mulai', 'is_available'
+        ).iterator(chunk_size=self.batch_size)
+
+        def rows():
+            for jadwal_id, lapangan_id, tanggal, jam_mulai, is_available in jadwal:
+                if is_available:
+                    if self.rng.random() >= rasio_batal_kosong:
+                        continue
+                    status = 'dibatalkan'
+                mulai = timezone.make_aware(datetime.combine(tanggal, jam_mulai))
+                if not is_available:
+                    if mulai + timedelta(hours=1) <= sekarang:
+                        # sebagian kecil sengaja tertinggal untuk diproses worker lifecycle
+                        status = self.rng.choices(['selesai', 'diterima', 'pending'], weights=[90, 7, 3])[0]
+                    else:
+                        status = self.rng.choices(['pending', 'diterima'], weights=[4, 6])[0]
+                dibuat = min(mulai - timedelta(minutes=self.rng.randint(60, 60 * 24 * 14)), sekarang)
+                yield (
+                    self.rng.choice(users), jadwal_id, self.rng.choice(METODE), status,
+                    lapangan[lapangan_id], dibuat, dibuat,
+                )
+
+        return self._sisipkan(Pemesanan, [
+            'user', 'jadwal', 'metode_pembayaran', 'status', 'harga_total', 'created_at', 'updated_at',
+        ], rows())
+
+    def _seed_ulasan(self, options, lapangan, users):
+        # pasangan (user, lapangan) unik, sama seperti cek satu ulasan per lapangan di add_ulasan
+        maks = min(round(len(users) * options['ulasan_per_user']), len(users) * len(lapangan))
+        lapangan_ids = list(lapangan)
+        pasangan = set()
+        while len(pasangan) < maks:
+            pasangan.add((self.rng.choice(users), self.rng.choice(lapangan_ids)))
+
+        sekarang = timezone.now()
+
+        def rows():
+            for user_id, lapangan_id in sorted(pasangan):
+                dibuat = sekarang - timedelta(minutes=self.rng.randint(0, 60 * 24 * 365))
+                yield (
+                    user_id, lapangan_id, self.rng.choices([1, 2, 3, 4, 5], weights=[1, 1, 3, 5, 5])[0],
+                    self.rng.choice(KOMENTAR), dibuat, dibuat,
+                )
+
+        return self._sisipkan(Ulasan, ['user', 'lapangan', 'rating', 'komentar', 'created_at', 'updated_at'], rows())
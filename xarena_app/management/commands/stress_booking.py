@@ -0,0 +1,119 @@
+import logging
+import multiprocessing
+import time
+from datetime import time as jam, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from xarena_app.models import CustomUser, Jadwal, Lapangan, Pemesanan
+
+PREFIX = 'stress_'
+
+
+def _worker(user_ids, url, host, mulai, hasil):
+    # setiap proses punya koneksi database sendiri
+    connections.close_all()
+    # 409 untuk slot yang kalah sudah diharapkan, tidak perlu dilog
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    clients = []
+    for user in CustomUser.objects.filter(id__in=user_ids):
+        client = Client(HTTP_HOST=host)
+        client.force_login(user)
+        clients.append(client)
+
+    mulai.wait()
+    for client in clients:
+        t0 = time.perf_counter()
+        try:
+            status = client.post(url, {'metode_pembayaran': 'cash'}).status_code
+        except Exception as e:
+            status = type(e).__name__
+        hasil.put((status, time.perf_counter() - t0))
+
+
+class Command(BaseCommand):
+    help = 'Uji beban: banyak proses memesan satu slot yang sama secara bersamaan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attempts', type=int, default=200, help='Jumlah percobaan pemesanan per ronde')
+        parser.add_argument('--processes', type=int, default=16)
+        parser.add_argument('--rounds', type=int, default=1, help='Jumlah ronde, setiap ronde memakai slot baru')
+        parser.add_argument('--host', default='localhost', help='HTTP_HOST yang diizinkan ALLOWED_HOSTS')
+        parser.add_argument('--keep', action='store_true', help='Jangan hapus data uji setelah selesai')
+
+    def handle(self, *args, **options):
+        attempts = options['attempts']
+        processes = min(options['processes'], attempts)
+
+        lapangan = Lapangan.objects.create(
+            nama=f'{PREFIX}lapangan', deskripsi='Data uji stress_booking', harga_per_jam=100000
+        )
+        CustomUser.objects.bulk_create([
+            CustomUser(username=f'{PREFIX}{lapangan.id}_{i}', password='!')
+            for i in range(attempts)
+        ])
+        user_ids = list(CustomUser.objects.filter(
+            username__startswith=f'{PREFIX}{lapangan.id}_'
+        ).values_list('id', flat=True))
+
+        salah = 0
+        try:
+            for ronde in range(options['rounds']):
+                jadwal = Jadwal.objects.create(
+                    lapangan=lapangan,
+                    tanggal=timezone.localdate() + timedelta(days=ronde + 1),
+                    jam_mulai=jam(8),
+                    jam_selesai=jam(9),
+                )
+                statuses, latencies, durasi = self._ronde(jadwal, user_ids, processes, options['host'])
+
+                sukses = statuses.count(302)
+                ditolak = statuses.count(409)
+                error = len(statuses) - sukses - ditolak
+                jumlah_pemesanan = Pemesanan.objects.filter(jadwal=jadwal).count()
+                benar = sukses == 1 and jumlah_pemesanan == 1 and error == 0
+                salah += not benar
+
+                latencies.sort()
+                p50 = latencies[len(latencies) // 2] * 1000
+                p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+                self.stdout.write(
+                    f'ronde {ronde + 1}: {len(statuses)} percobaan dalam {durasi:.2f}s '
+                    f'({len(statuses) / durasi:.0f} req/s), p50 {p50:.1f}ms, p99 {p99:.1f}ms | '
+                    f'sukses {sukses}, ditolak {ditolak}, error {error}, pemesanan tersimpan {jumlah_pemesanan}'
+                )
+                if error:
+                    self.stdout.write(f'  status error: {sorted(set(s for s in statuses if s not in (302, 409)), key=str)}')
+        finally:
+            if not options['keep']:
+                lapangan.delete()
+                CustomUser.objects.filter(id__in=user_ids).delete()
+
+        if salah:
+            raise CommandError(f'{salah} ronde tidak konsisten (double booking atau error)')
+        self.stdout.write(self.style.SUCCESS('Semua ronde konsisten: tepat satu pemesanan per slot'))
+
+    def _ronde(self, jadwal, user_ids, processes, host):
+        url = reverse('pesan_lapangan', args=[jadwal.id])
+        ctx = multiprocessing.get_context('fork')
+        mulai = ctx.Event()
+        hasil = ctx.Queue()
+        chunks = [user_ids[i::processes] for i in range(processes)]
+
+        connections.close_all()
+        workers = [ctx.Process(target=_worker, args=(chunk, url, host, mulai, hasil)) for chunk in chunks]
+        for worker in workers:
+            worker.start()
+
+        # beri waktu semua proses login sebelum dilepas bersamaan
+        time.sleep(1)
+        t0 = time.perf_counter()
+        mulai.set()
+        rows = [hasil.get() for _ in range(len(user_ids))]
+        durasi = time.perf_counter() - t0
+        for worker in workers:
+            worker.join()
+
+        return [status for status, _ in rows], [latency for _, latency in rows], durasi
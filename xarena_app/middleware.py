@@ -0,0 +1,177 @@
+import json
+import logging
+import re
+import traceback
+from contextvars import ContextVar
+from time import perf_counter
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+logger = logging.getLogger('xarena.performa')
+
+# pencatat query request yang sedang berjalan, ikut terbawa ke thread sync_to_async
+_pencatat = ContextVar('pencatat_sql', default=None)
+
+# IN (%s, %s, ...) dan VALUES (...), (...) diringkas supaya jumlah parameter tidak membedakan bentuk query
+_POLA_IN = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_POLA_VALUES = re.compile(r'(\(\s*%s(?:\s*,\s*%s)*\s*\))(?:\s*,\s*\(\s*%s(?:\s*,\s*%s)*\s*\))+')
+
+_POLA_KOLOM = re.compile(r'^SELECT .+? FROM', re.IGNORECASE)
+
+
+def bentuk_query(sql):
+    sql = _POLA_IN.sub('(%s, ...)', sql)
+    return _POLA_VALUES.sub(r'\1, ...', sql)
+
+
+def _lokasi_kode():
+    # frame terdalam di dalam project (bukan django / site-packages / middleware ini)
+    base = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        if frame.filename.startswith(base) and 'site-packages' not in frame.filename and frame.filename != __file__:
+            return f'{frame.filename[len(base) + 1:]}:{frame.lineno} ({frame.name})'
+    return None
+
+
+class PencatatSQL:
+    def __init__(self):
+        self.jumlah = 0
+        self.durasi = 0.0
+        self.terlambat = []
+        self.bentuk = {}
+        self.lokasi = {}
+
+    def catat(self, sql, durasi):
+        self.jumlah += 1
+        self.durasi += durasi
+        self.terlambat.append((durasi, sql))
+        if len(self.terlambat) > settings.SQL_TERLAMBAT_JUMLAH * 4:
+            self.terlambat.sort(key=lambda x: x[0], reverse=True)
+            del self.terlambat[settings.SQL_TERLAMBAT_JUMLAH:]
+
+        bentuk = bentuk_query(sql)
+        jumlah = self.bentuk.get(bentuk, 0) + 1
+        self.bentuk[bentuk] = jumlah
+        # stack hanya diambil sekali, saat bentuk yang sama mencapai batas n+1
+        if jumlah == settings.SQL_N_PLUS_1_BATAS:
+            self.lokasi[bentuk] = _lokasi_kode()
+
+    def query_terlambat(self):
+        return sorted(self.terlambat, key=lambda x: x[0], reverse=True)[:settings.SQL_TERLAMBAT_JUMLAH]
+
+    def n_plus_1(self):
+        return sorted(
+            (
+                {'sql': bentuk, 'jumlah': jumlah, 'lokasi': self.lokasi.get(bentuk)}
+                for bentuk, jumlah in self.bentuk.items()
+                if jumlah >= settings.SQL_N_PLUS_1_BATAS
+            ),
+            key=lambda x: x['jumlah'],
+            reverse=True,
+        )
+
+
+def _wrapper_sql(execute, sql, params, many, context):
+    pencatat = _pencatat.get()
+    if pencatat is None:
+        return execute(sql, params, many, context)
+    mulai = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        pencatat.catat(sql, (perf_counter() - mulai) * 1000)
+
+
+# dipasang lewat signal connection_created di AppConfig.ready, jadi ikut ke koneksi di thread mana pun
+def pasang_wrapper_sql(connection, **kwargs):
+    if _wrapper_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_wrapper_sql)
+
+
+def _deskripsi(sql):
+    # nilai desc Server-Timing berupa quoted-string satu baris, daftar kolom SELECT dibuang
+    sql = _POLA_KOLOM.sub('SELECT ... FROM', ' '.join(sql.split()), count=1)
+    return sql.replace('\\', '').replace('"', '')[:100]
+
+
+# instrumentasi SQL per request: jumlah query, total waktu SQL, query terlambat & dugaan n+1
+# detail lengkap (teks SQL, lokasi n+1) hanya ke log "xarena.performa": WARNING untuk request lambat / n+1,
+# DEBUG untuk request lain. header Server-Timing berisi ringkasan saja, hanya untuk staff atau saat DEBUG
+# aktif hanya jika SQL_INSTRUMENTASI (env XARENA_INSTRUMENTASI=1), tidak butuh DEBUG
+class InstrumentasiSQLMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SQL_INSTRUMENTASI:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        pencatat = PencatatSQL()
+        token = _pencatat.set(pencatat)
+        mulai = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _pencatat.reset(token)
+        user = getattr(request, 'user', None)
+        header = settings.DEBUG or (user is not None and user.is_staff)
+        self.laporkan(request, response, pencatat, (perf_counter() - mulai) * 1000, header)
+        return response
+
+    async def __acall__(self, request):
+        pencatat = PencatatSQL()
+        token = _pencatat.set(pencatat)
+        mulai = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _pencatat.reset(token)
+        durasi = (perf_counter() - mulai) * 1000
+        # user dibaca setelah pencatat dilepas, query session / user di sini tidak ikut dihitung
+        header = settings.DEBUG
+        if not header and hasattr(request, 'auser'):
+            header = (await request.auser()).is_staff
+        self.laporkan(request, response, pencatat, durasi, header)
+        return response
+
+    def laporkan(self, request, response, pencatat, durasi, header=False):
+        terlambat = pencatat.query_terlambat()
+        n_plus_1 = pencatat.n_plus_1()
+
+        if header:
+            timing = [
+                f'app;dur={durasi:.1f}',
+                f'db;dur={pencatat.durasi:.1f};desc="{pencatat.jumlah} query"',
+            ]
+            timing += [
+                f'sql-{i};dur={dur:.1f};desc="{_deskripsi(sql)}"'
+                for i, (dur, sql) in enumerate(terlambat, 1)
+            ]
+            if n_plus_1:
+                timing.append(f'n-plus-1;desc="{len(n_plus_1)} bentuk query berulang"')
+            if response.has_header('Server-Timing'):
+                timing.insert(0, response['Server-Timing'])
+            response['Server-Timing'] = ', '.join(timing)
+
+        lambat = durasi >= settings.SQL_LAMBAT_MS or n_plus_1
+        level = logging.WARNING if lambat else logging.DEBUG
+        if logger.isEnabledFor(level):
+            logger.log(level, json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'view': getattr(request.resolver_match, 'view_name', None),
+                'status': response.status_code,
+                'durasi_ms': round(durasi, 1),
+                'query': pencatat.jumlah,
+                'sql_ms': round(pencatat.durasi, 1),
+                'terlambat': [{'ms': round(dur, 1), 'sql': sql} for dur, sql in terlambat],
+                'n_plus_1': n_plus_1,
+            }))
+
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:19
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def isi_rating(apps, schema_editor):
+    Lapangan = apps.get_model('xarena_app', 'Lapangan')
+    Ulasan = apps.get_model('xarena_app', 'Ulasan')
+    for row in Ulasan.objects.values('lapangan_id').annotate(count=Count('id'), total=Sum('rating')):
+        Lapangan.objects.filter(pk=row['lapangan_id']).update(
+            rating_count=row['count'], rating_sum=row['total']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xarena_app', '0002_alter_ulasan_rating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lapangan',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='lapangan',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(isi_rating, migrations.RunPython.noop),
+    ]
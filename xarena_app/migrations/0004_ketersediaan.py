@@ -0,0 +1,80 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:21
+
+import django.db.models.deletion
+from itertools import groupby
+from django.db import migrations, models
+
+
+# salinan perhitungan index dari Ketersediaan.dari_jadwal saat migration ini dibuat,
+# migration tidak boleh bergantung pada model aktual yang bisa berubah
+BUCKET_MENIT = 30
+JUMLAH_BUCKET = 24 * 60 // BUCKET_MENIT
+
+
+def mask_slot(jam_mulai, jam_selesai):
+    mulai = (jam_mulai.hour * 60 + jam_mulai.minute) // BUCKET_MENIT
+    # jam selesai yang tidak pas di batas bucket dibulatkan ke atas, 00:00 = akhir hari
+    selesai = -(-(jam_selesai.hour * 60 + jam_selesai.minute) // BUCKET_MENIT)
+    if selesai <= mulai:
+        selesai = JUMLAH_BUCKET
+    return ((1 << selesai) - 1) ^ ((1 << mulai) - 1)
+
+
+def hitung_index(jadwal):
+    # jadwal: iterable dict (id, jam_mulai, jam_selesai, is_available) urut jam_mulai
+    mask_tersedia = mask_terisi = 0
+    slots = []
+    for slot in jadwal:
+        mask = mask_slot(slot['jam_mulai'], slot['jam_selesai'])
+        if slot['is_available']:
+            mask_tersedia |= mask
+        else:
+            mask_terisi |= mask
+        slots.append({
+            'id': slot['id'],
+            'jam_mulai': slot['jam_mulai'].isoformat(),
+            'jam_selesai': slot['jam_selesai'].isoformat(),
+            'is_available': slot['is_available'],
+        })
+    # bucket yang juga dipakai slot terisi tidak dihitung tersedia
+    return {'mask_tersedia': mask_tersedia & ~mask_terisi, 'mask_terisi': mask_terisi, 'slots': slots}
+
+
+def isi_ketersediaan(apps, schema_editor):
+    Jadwal = apps.get_model('xarena_app', 'Jadwal')
+    Ketersediaan = apps.get_model('xarena_app', 'Ketersediaan')
+    rows = Jadwal.objects.order_by('lapangan_id', 'tanggal', 'jam_mulai').values(
+        'lapangan_id', 'tanggal', 'id', 'jam_mulai', 'jam_selesai', 'is_available'
+    )
+    batch = []
+    for (lapangan_id, tanggal), slots in groupby(rows, key=lambda r: (r['lapangan_id'], r['tanggal'])):
+        batch.append(Ketersediaan(lapangan_id=lapangan_id, tanggal=tanggal, **hitung_index(slots)))
+        if len(batch) >= 1000:
+            Ketersediaan.objects.bulk_create(batch)
+            batch = []
+    Ketersediaan.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xarena_app', '0003_lapangan_rating_count_lapangan_rating_sum'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Ketersediaan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tanggal', models.DateField()),
+                ('mask_tersedia', models.BigIntegerField(default=0)),
+                ('mask_terisi', models.BigIntegerField(default=0)),
+                ('slots', models.JSONField(default=list)),
+                ('lapangan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='xarena_app.lapangan')),
+            ],
+            options={
+                'unique_together': {('lapangan', 'tanggal')},
+            },
+        ),
+        migrations.RunPython(isi_ketersediaan, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:22
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+# salinan perhitungan index dari Ketersediaan.dari_jadwal saat migration ini dibuat (sama dengan 0004),
+# migration tidak boleh bergantung pada model aktual yang bisa berubah
+BUCKET_MENIT = 30
+JUMLAH_BUCKET = 24 * 60 // BUCKET_MENIT
+
+
+def mask_slot(jam_mulai, jam_selesai):
+    mulai = (jam_mulai.hour * 60 + jam_mulai.minute) // BUCKET_MENIT
+    # jam selesai yang tidak pas di batas bucket dibulatkan ke atas, 00:00 = akhir hari
+    selesai = -(-(jam_selesai.hour * 60 + jam_selesai.minute) // BUCKET_MENIT)
+    if selesai <= mulai:
+        selesai = JUMLAH_BUCKET
+    return ((1 << selesai) - 1) ^ ((1 << mulai) - 1)
+
+
+def hitung_index(jadwal):
+    # jadwal: iterable dict (id, jam_mulai, jam_selesai, is_available) urut jam_mulai
+    mask_tersedia = mask_terisi = 0
+    slots = []
+    for slot in jadwal:
+        mask = mask_slot(slot['jam_mulai'], slot['jam_selesai'])
+        if slot['is_available']:
+            mask_tersedia |= mask
+        else:
+            mask_terisi |= mask
+        slots.append({
+            'id': slot['id'],
+            'jam_mulai': slot['jam_mulai'].isoformat(),
+            'jam_selesai': slot['jam_selesai'].isoformat(),
+            'is_available': slot['is_available'],
+        })
+    # bucket yang juga dipakai slot terisi tidak dihitung tersedia
+    return {'mask_tersedia': mask_tersedia & ~mask_terisi, 'mask_terisi': mask_terisi, 'slots': slots}
+
+
+# status pemesanan yang masih memegang slot
+STATUS_AKTIF = ('pending', 'diterima')
+
+
+def hapus_jadwal_duplikat(apps, schema_editor):
+    # jadwal ganda (klik generate dua kali) digabung ke id terkecil sebelum unique constraint dibuat
+    Jadwal = apps.get_model('xarena_app', 'Jadwal')
+    Pemesanan = apps.get_model('xarena_app', 'Pemesanan')
+    Ketersediaan = apps.get_model('xarena_app', 'Ketersediaan')
+    duplikat = list(Jadwal.objects.values('lapangan_id', 'tanggal', 'jam_mulai').annotate(
+        jumlah=Count('id'), keep=Min('id')
+    ).filter(jumlah__gt=1))
+
+    def jadwal_grup(row):
+        return Jadwal.objects.filter(
+            lapangan_id=row['lapangan_id'], tanggal=row['tanggal'], jam_mulai=row['jam_mulai']
+        )
+
+    # slot yang dipesan aktif lebih dari sekali tidak bisa digabung tanpa membuat pemesanan ganda,
+    # dicek untuk semua grup dulu supaya tidak ada yang diubah sebelum migration dihentikan
+    bentrok = []
+    for row in duplikat:
+        aktif = list(Pemesanan.objects.filter(
+            jadwal__in=jadwal_grup(row), status__in=STATUS_AKTIF
+        ).order_by('id').values_list('id', flat=True))
+        if len(aktif) > 1:
+            bentrok.append(f"lapangan {row['lapangan_id']} {row['tanggal']} {row['jam_mulai']}: pemesanan {aktif}")
+    if bentrok:
+        raise RuntimeError(
+            'Jadwal ganda dengan lebih dari satu pemesanan aktif, selesaikan dulu (batalkan / pindahkan):\n'
+            + '\n'.join(bentrok)
+        )
+
+    for row in duplikat:
+        lainnya = jadwal_grup(row).exclude(id=row['keep'])
+        if Pemesanan.objects.filter(jadwal__in=lainnya, status__in=STATUS_AKTIF).exists():
+            Jadwal.objects.filter(id=row['keep']).update(is_available=False)
+        Pemesanan.objects.filter(jadwal__in=lainnya).update(jadwal_id=row['keep'])
+        lainnya.delete()
+
+        # index ketersediaan hari itu masih menyimpan id jadwal yang dihapus
+        slots = Jadwal.objects.filter(
+            lapangan_id=row['lapangan_id'], tanggal=row['tanggal']
+        ).order_by('jam_mulai').values('id', 'jam_mulai', 'jam_selesai', 'is_available')
+        Ketersediaan.objects.filter(lapangan_id=row['lapangan_id'], tanggal=row['tanggal']).update(
+            **hitung_index(slots)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xarena_app', '0004_ketersediaan'),
+    ]
+
+    operations = [
+        migrations.RunPython(hapus_jadwal_duplikat, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='jadwal',
+            constraint=models.UniqueConstraint(fields=('lapangan', 'tanggal', 'jam_mulai'), name='unique_jadwal_lapangan_tanggal_jam'),
+        ),
+    ]
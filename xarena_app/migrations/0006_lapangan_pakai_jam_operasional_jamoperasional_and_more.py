@@ -0,0 +1,46 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xarena_app', '0005_jadwal_unique_jadwal_lapangan_tanggal_jam'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lapangan',
+            name='pakai_jam_operasional',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='JamOperasional',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hari', models.PositiveSmallIntegerField(choices=[(0, 'Senin'), (1, 'Selasa'), (2, 'Rabu'), (3, 'Kamis'), (4, 'Jumat'), (5, 'Sabtu'), (6, 'Minggu')])),
+                ('jam_buka', models.TimeField()),
+                ('jam_tutup', models.TimeField()),
+                ('durasi', models.PositiveSmallIntegerField(default=60, help_text='Durasi slot dalam menit')),
+                ('lapangan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jam_operasional', to='xarena_app.lapangan')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PengecualianJadwal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tanggal', models.DateField()),
+                ('tutup', models.BooleanField(default=True, help_text='Jika tidak tutup, pakai jam buka / tutup di bawah')),
+                ('jam_buka', models.TimeField(blank=True, null=True)),
+                ('jam_tutup', models.TimeField(blank=True, null=True)),
+                ('durasi', models.PositiveSmallIntegerField(default=60, help_text='Durasi slot dalam menit')),
+                ('keterangan', models.CharField(blank=True, max_length=100)),
+                ('lapangan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pengecualian_jadwal', to='xarena_app.lapangan')),
+            ],
+            options={
+                'unique_together': {('lapangan', 'tanggal')},
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:28
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def isi_harga_total(apps, schema_editor):
+    # pemesanan lama diisi dengan harga lapangan saat ini (harga historis tidak tersimpan)
+    # ditulis setiap 1000 baris supaya memori tidak ikut membesar dengan jumlah pemesanan
+    Pemesanan = apps.get_model('xarena_app', 'Pemesanan')
+    batch = []
+    for pemesanan in Pemesanan.objects.select_related('jadwal__lapangan').iterator(chunk_size=1000):
+        jadwal = pemesanan.jadwal
+        menit = (jadwal.jam_selesai.hour * 60 + jadwal.jam_selesai.minute) - (jadwal.jam_mulai.hour * 60 + jadwal.jam_mulai.minute)
+        # slot yang berakhir lewat tengah malam (mis. 23:00 - 00:00)
+        menit %= 24 * 60
+        pemesanan.harga_total = (jadwal.lapangan.harga_per_jam * Decimal(menit) / 60).quantize(Decimal('0.01'))
+        batch.append(pemesanan)
+        if len(batch) >= 1000:
+            Pemesanan.objects.bulk_update(batch, ['harga_total'])
+            batch = []
+    if batch:
+        Pemesanan.objects.bulk_update(batch, ['harga_total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xarena_app', '0006_lapangan_pakai_jam_operasional_jamoperasional_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pemesanan',
+            name='harga_total',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Harga saat pemesanan dibuat', max_digits=12, null=True),
+        ),
+        migrations.RunPython(isi_harga_total, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xarena_app', '0007_pemesanan_harga_total'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lapangan',
+            name='gambar_turunan',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xarena_app', '0008_lapangan_gambar_turunan'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jadwal',
+            index=models.Index(fields=['lapangan', 'tanggal', 'is_available'], name='jadwal_lap_tgl_tersedia_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pemesanan',
+            index=models.Index(fields=['user', '-created_at'], name='pemesanan_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pemesanan',
+            index=models.Index(fields=['status'], name='pemesanan_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pemesanan',
+            index=models.Index(fields=['-created_at'], name='pemesanan_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ulasan',
+            index=models.Index(fields=['lapangan', '-created_at'], name='ulasan_lap_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ulasan',
+            index=models.Index(fields=['-created_at'], name='ulasan_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ulasan',
+            index=models.Index(fields=['user', 'lapangan'], name='ulasan_user_lapangan_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xarena_app', '0009_index_query_utama'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JadwalArsip',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('tanggal', models.DateField()),
+                ('jam_mulai', models.TimeField()),
+                ('jam_selesai', models.TimeField()),
+                ('is_available', models.BooleanField()),
+                ('diarsipkan_at', models.DateTimeField(auto_now_add=True)),
+                ('lapangan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='xarena_app.lapangan')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['lapangan', 'tanggal'], name='jadwal_arsip_lap_tgl_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PemesananArsip',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('jadwal_id', models.BigIntegerField()),
+                ('tanggal', models.DateField()),
+                ('jam_mulai', models.TimeField()),
+                ('jam_selesai', models.TimeField()),
+                ('metode_pembayaran', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('harga_total', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('diarsipkan_at', models.DateTimeField(auto_now_add=True)),
+                ('lapangan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='xarena_app.lapangan')),
+                ('staff', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tanggal', 'lapangan'], name='pemesanan_arsip_tgl_lap_idx'), models.Index(fields=['user', '-created_at'], name='pemesanan_arsip_user_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xarena_app', '0010_arsip'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RekapHarian',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tanggal', models.DateField()),
+                ('jumlah_pemesanan', models.PositiveIntegerField(default=0)),
+                ('jam_terpesan', models.DecimalField(decimal_places=2, default=0, max_digits=6)),
+                ('jam_tersedia', models.DecimalField(decimal_places=2, default=0, max_digits=6)),
+                ('pendapatan', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('okupansi', models.DecimalField(decimal_places=2, default=0, help_text='Persen jam terpesan', max_digits=5)),
+                ('dihitung_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='ketersediaan',
+            name='diubah_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='ketersediaan',
+            index=models.Index(fields=['diubah_at'], name='ketersediaan_diubah_idx'),
+        ),
+        migrations.AddField(
+            model_name='rekapharian',
+            name='lapangan',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='xarena_app.lapangan'),
+        ),
+        migrations.AddIndex(
+            model_name='rekapharian',
+            index=models.Index(fields=['tanggal'], name='rekap_tanggal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rekapharian',
+            index=models.Index(fields=['dihitung_at'], name='rekap_dihitung_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='rekapharian',
+            constraint=models.UniqueConstraint(fields=('lapangan', 'tanggal'), name='unique_rekap_lapangan_tanggal'),
+        ),
+    ]
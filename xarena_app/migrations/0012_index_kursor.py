@@ -0,0 +1,29 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xarena_app', '0011_rekap_harian'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='pemesanan',
+            name='pemesanan_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='ulasan',
+            name='ulasan_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='pemesanan',
+            index=models.Index(fields=['-created_at', '-id'], name='pemesanan_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ulasan',
+            index=models.Index(fields=['-created_at', '-id'], name='ulasan_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:29
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xarena_app', '0012_index_kursor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lapangan',
+            name='slot_diubah_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:41
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def isi_jumlah(apps, schema_editor):
+    # arsip yang sudah ada dihitung sekali di sini, selanjutnya ditambah oleh arsipkan_pemesanan
+    PemesananArsip = apps.get_model('xarena_app', 'PemesananArsip')
+    JumlahArsip = apps.get_model('xarena_app', 'JumlahArsip')
+    JumlahArsip.objects.bulk_create([
+        JumlahArsip(status=row['status'], jumlah=row['jumlah'])
+        for row in PemesananArsip.objects.values('status').annotate(jumlah=Count('id')).order_by()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xarena_app', '0013_versi_ketersediaan'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JumlahArsip',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(max_length=20, unique=True)),
+                ('jumlah', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(isi_jumlah, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xarena_app', '0014_jumlah_arsip'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='lapangan',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='lapangan',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xarena_app', '0015_rating_tidak_editable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lapangan',
+            name='diubah_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xarena_app', '0016_lapangan_diubah_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rekapharian',
+            name='basi',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='rekapharian',
+            index=models.Index(condition=models.Q(('basi', True)), fields=['basi'], name='rekap_basi_idx'),
+        ),
+    ]
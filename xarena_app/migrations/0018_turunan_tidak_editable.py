@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xarena_app', '0017_rekap_basi'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='lapangan',
+            name='gambar_turunan',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -1,7 +1,11 @@
+from itertools import groupby
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.dispatch import Signal
 from django.contrib.auth.models import AbstractUser
-from datetime import timedelta
+from django.utils import timezone
+from django.core.exceptions import ValidationError
+from datetime import datetime, time, timedelta
 from decimal import Decimal
 
 
@@ -19,18 +23,201 @@ class Lapangan(models.Model):
     deskripsi = models.TextField(max_length=500)
     harga_per_jam = models.DecimalField(max_digits=10, decimal_places=2)
     gambar = models.ImageField(upload_to='lapangan_images/', blank=True, null=True)
+    # ukuran turunan gambar yang sudah dibuat, {'thumb': lebar, ...}, diisi worker gambar
+    gambar_turunan = models.JSONField(default=dict, blank=True, editable=False)
     is_available = models.BooleanField(default=True)
+    # agregat rating, diupdate lewat F() setiap ulasan ditambah / dihapus (tidak diisi dari form)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    # mode jadwal virtual: slot dihitung dari jam operasional, Jadwal baru dibuat saat dipesan
+    pakai_jam_operasional = models.BooleanField(default=False)
+    # perubahan slot level lapangan (jam operasional, pengecualian, generate), bagian dari versi ketersediaan
+    slot_diubah_at = models.DateTimeField(default=timezone.now, editable=False)
+    # perubahan data yang tampil di katalog publik (save, rating, turunan gambar), bagian dari versi katalog
+    diubah_at = models.DateTimeField(auto_now=True)
+
+    # kolom yang hanya diubah lewat update() (signal ulasan, rebuild_rating, versi slot, worker gambar),
+    # save() biasa tidak menulisnya supaya nilai lama di instance tidak menimpa perubahan paralel
+    FIELD_TERKELOLA = ('rating_count', 'rating_sum', 'slot_diubah_at', 'gambar_turunan')
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.FIELD_TERKELOLA
+            ]
+        super().save(*args, **kwargs)
 
     def avg_rating(self):
-        ratings = Ulasan.objects.filter(lapangan=self).values_list('rating', flat=True)
-        if ratings:
-            return sum(ratings) / len(ratings)
+        if self.rating_count:
+            return self.rating_sum / self.rating_count
         return 0
 
+    def slot_template(self, tanggal, jam_operasional, pengecualian=None):
+        # jam_operasional: semua JamOperasional lapangan ini, pengecualian: PengecualianJadwal tanggal itu
+        if pengecualian is not None:
+            if pengecualian.tutup or not (pengecualian.jam_buka and pengecualian.jam_tutup):
+                return []
+            return potong_slot(tanggal, pengecualian.jam_buka, pengecualian.jam_tutup, pengecualian.durasi)
+
+        slots = []
+        for jam in jam_operasional:
+            if jam.hari == tanggal.weekday():
+                slots += potong_slot(tanggal, jam.jam_buka, jam.jam_tutup, jam.durasi)
+        return sorted(slots)
+
+    def ketersediaan(self, tanggal_mulai, tanggal_selesai):
+        index = list(Ketersediaan.objects.filter(
+            lapangan=self, tanggal__range=(tanggal_mulai, tanggal_selesai)
+        ).order_by('tanggal'))
+        if not self.pakai_jam_operasional:
+            return index
+
+        jam_operasional = list(self.jam_operasional.all())
+        pengecualian = list(self.pengecualian_jadwal.filter(tanggal__range=(tanggal_mulai, tanggal_selesai)))
+        return self._gabung_slot_virtual(tanggal_mulai, tanggal_selesai, index, jam_operasional, pengecualian)
+
+    async def aketersediaan(self, tanggal_mulai, tanggal_selesai):
+        # versi async (async ORM) dari ketersediaan() untuk view ASGI
+        index = [
+            hari async for hari in Ketersediaan.objects.filter(
+                lapangan=self, tanggal__range=(tanggal_mulai, tanggal_selesai)
+            ).order_by('tanggal')
+        ]
+        if not self.pakai_jam_operasional:
+            return index
+
+        jam_operasional = [jam async for jam in self.jam_operasional.all()]
+        pengecualian = [
+            p async for p in self.pengecualian_jadwal.filter(tanggal__range=(tanggal_mulai, tanggal_selesai))
+        ]
+        return self._gabung_slot_virtual(tanggal_mulai, tanggal_selesai, index, jam_operasional, pengecualian)
+
+    def _gabung_slot_virtual(self, tanggal_mulai, tanggal_selesai, index, jam_operasional, pengecualian):
+        # gabungkan slot virtual dengan jadwal konkret (yang sudah pernah dipesan)
+        index = {hari.tanggal: hari for hari in index}
+        pengecualian = {p.tanggal: p for p in pengecualian}
+
+        hasil = []
+        tanggal = tanggal_mulai
+        while tanggal <= tanggal_selesai:
+            konkret = {}
+            if tanggal in index:
+                konkret = {slot['jam_mulai']: slot for slot in index[tanggal].daftar_slot()}
+
+            slots = [
+                konkret.pop(mulai, None) or {
+                    'id': None, 'jam_mulai': mulai, 'jam_selesai': selesai, 'is_available': True,
+                }
+                for mulai, selesai in self.slot_template(tanggal, jam_operasional, pengecualian.get(tanggal))
+            ]
+            # jadwal konkret di luar jam operasional tetap ditampilkan
+            slots = sorted(slots + list(konkret.values()), key=lambda slot: slot['jam_mulai'])
+            if slots:
+                hasil.append(Ketersediaan.dari_jadwal(self.id, tanggal, slots))
+            tanggal += timedelta(days=1)
+        return hasil
+
     def __str__(self):
         return self.nama
 
 
+MENIT_SEHARI = 24 * 60
+
+
+# durasi slot dalam menit, jam selesai <= jam mulai berarti lewat tengah malam (mis. 23:00 - 00:00)
+# versi database: rekap._durasi
+def durasi_menit(jam_mulai, jam_selesai):
+    selesai = jam_selesai.hour * 60 + jam_selesai.minute
+    mulai = jam_mulai.hour * 60 + jam_mulai.minute
+    return (selesai - mulai + MENIT_SEHARI) % MENIT_SEHARI
+
+
+# potong rentang jam satu hari menjadi slot @durasi menit
+def potong_slot(tanggal, jam_mulai, jam_selesai, durasi):
+    slots = []
+    current = datetime.combine(tanggal, jam_mulai)
+    end = datetime.combine(tanggal, jam_selesai)
+    while current + timedelta(minutes=durasi) <= end:
+        next_time = current + timedelta(minutes=durasi)
+        slots.append((current.time(), next_time.time()))
+        current = next_time
+    return slots
+
+
+class JadwalManager(models.Manager):
+    def generate(self, lapangan, tanggal_mulai, tanggal_selesai, jam_mulai, jam_selesai, durasi, batch_size=500):
+        # hitung semua slot di awal, lalu lewati slot yang sudah ada
+        slots = []
+        tanggal = tanggal_mulai
+        while tanggal <= tanggal_selesai:
+            slots += [
+                (tanggal, mulai, selesai)
+                for mulai, selesai in potong_slot(tanggal, jam_mulai, jam_selesai, durasi)
+            ]
+            tanggal += timedelta(days=1)
+
+        existing = set(self.filter(
+            lapangan=lapangan,
+            tanggal__range=(tanggal_mulai, tanggal_selesai),
+        ).values_list('tanggal', 'jam_mulai'))
+
+        baru = [
+            self.model(lapangan=lapangan, tanggal=tanggal, jam_mulai=mulai, jam_selesai=selesai)
+            for tanggal, mulai, selesai in slots
+            if (tanggal, mulai) not in existing
+        ]
+
+        with transaction.atomic():
+            # ignore_conflicts menjaga request paralel tetap idempotent lewat unique constraint
+            self.bulk_create(baru, batch_size=batch_size, ignore_conflicts=True)
+            if baru:
+                Ketersediaan.refresh_rentang(lapangan.id, tanggal_mulai, tanggal_selesai)
+
+        return len(baru), len(slots) - len(baru)
+
+    def klaim(self, jadwal):
+        # satu UPDATE bersyarat, hanya satu request yang bisa mengubah is_available True -> False
+        berhasil = self.filter(pk=jadwal.pk, is_available=True).update(is_available=False)
+        if berhasil:
+            jadwal.is_available = False
+            Ketersediaan.refresh(jadwal.lapangan_id, jadwal.tanggal)
+        return bool(berhasil)
+
+    def lepas(self, jadwal):
+        berhasil = self.filter(pk=jadwal.pk, is_available=False).update(is_available=True)
+        if berhasil:
+            jadwal.is_available = True
+            Ketersediaan.refresh(jadwal.lapangan_id, jadwal.tanggal)
+        return bool(berhasil)
+
+    def dari_template(self, lapangan, tanggal, jam_mulai):
+        # jadwal konkret jika sudah ada, jika belum slot virtual (belum disimpan) dari jam operasional
+        jadwal = self.filter(lapangan=lapangan, tanggal=tanggal, jam_mulai=jam_mulai).first()
+        if jadwal is not None or not lapangan.pakai_jam_operasional:
+            return jadwal
+
+        pengecualian = lapangan.pengecualian_jadwal.filter(tanggal=tanggal).first()
+        for mulai, selesai in lapangan.slot_template(tanggal, lapangan.jam_operasional.all(), pengecualian):
+            if mulai == jam_mulai:
+                return self.model(lapangan=lapangan, tanggal=tanggal, jam_mulai=mulai, jam_selesai=selesai)
+        return None
+
+    def klaim_virtual(self, lapangan, tanggal, jam_mulai):
+        # baris Jadwal baru dibuat hanya saat slot virtual dipesan
+        jadwal = self.dari_template(lapangan, tanggal, jam_mulai)
+        if jadwal is None or jadwal.pk:
+            return jadwal
+
+        jadwal, _ = self.get_or_create(
+            lapangan=lapangan,
+            tanggal=tanggal,
+            jam_mulai=jam_mulai,
+            defaults={'jam_selesai': jadwal.jam_selesai},
+        )
+        return jadwal
+
+
 # jadwal model
 class Jadwal(models.Model):
     lapangan = models.ForeignKey(Lapangan, on_delete=models.CASCADE)
@@ -39,10 +226,270 @@ class Jadwal(models.Model):
     jam_selesai = models.TimeField()
     is_available = models.BooleanField(default=True)
 
+    objects = JadwalManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['lapangan', 'tanggal', 'jam_mulai'],
+                name='unique_jadwal_lapangan_tanggal_jam',
+            ),
+        ]
+        indexes = [
+            # jadwal tersedia per lapangan per tanggal (halaman detail, api jadwal)
+            models.Index(fields=['lapangan', 'tanggal', 'is_available'], name='jadwal_lap_tgl_tersedia_idx'),
+        ]
+
     def __str__(self):
         return f"{self.lapangan.nama} - {self.tanggal} ({self.jam_mulai} - {self.jam_selesai})"
 
 
+# dikirim setelah commit saat slot suatu (lapangan, tanggal) berubah
+# kwargs: lapangan_id, tanggal, events = [(nama_event, slot), ...]
+ketersediaan_berubah = Signal()
+
+
+# index ketersediaan per lapangan per hari
+# satu hari dibagi menjadi 48 bucket @30 menit, bit ke-i = bucket ke-i
+class Ketersediaan(models.Model):
+    BUCKET_MENIT = 30
+    JUMLAH_BUCKET = 24 * 60 // BUCKET_MENIT
+    FIELDS_JADWAL = ('id', 'jam_mulai', 'jam_selesai', 'is_available')
+
+    lapangan = models.ForeignKey(Lapangan, on_delete=models.CASCADE)
+    tanggal = models.DateField()
+    mask_tersedia = models.BigIntegerField(default=0)
+    mask_terisi = models.BigIntegerField(default=0)
+    slots = models.JSONField(default=list)
+    # versi ketersediaan (etag api jadwal) & hari yang berubah sejak rekap harian terakhir
+    diubah_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('lapangan', 'tanggal')
+        indexes = [
+            models.Index(fields=['diubah_at'], name='ketersediaan_diubah_idx'),
+        ]
+
+    @classmethod
+    def _qs_versi(cls, lapangan_id, tanggal):
+        return Lapangan.objects.filter(pk=lapangan_id).annotate(
+            hari_diubah_at=models.Subquery(
+                cls.objects.filter(lapangan=models.OuterRef('pk'), tanggal=tanggal).values('diubah_at')[:1]
+            ),
+        ).values_list('slot_diubah_at', 'hari_diubah_at')
+
+    @staticmethod
+    def _format_versi(row):
+        if row is None:
+            return 'x'
+        return '-'.join(str(int(waktu.timestamp() * 1_000_000)) if waktu else '0' for waktu in row)
+
+    # versi gabungan level lapangan (jam operasional, generate) dan level hari (booking, edit)
+    # dibaca dari database (satu query ber-index), jadi perubahan dari proses lain, worker lifecycle,
+    # arsip, maupun shell langsung terlihat, apa pun backend cache-nya
+    @classmethod
+    def versi(cls, lapangan_id, tanggal):
+        return cls._format_versi(cls._qs_versi(lapangan_id, tanggal).first())
+
+    @classmethod
+    async def aversi(cls, lapangan_id, tanggal):
+        return cls._format_versi(await cls._qs_versi(lapangan_id, tanggal).afirst())
+
+    @classmethod
+    def naikkan_versi(cls, lapangan_id):
+        # perubahan level hari sudah tercatat di Ketersediaan.diubah_at (auto_now) saat index di-refresh
+        Lapangan.objects.filter(pk=lapangan_id).update(slot_diubah_at=timezone.now())
+
+    @classmethod
+    def ke_bucket(cls, jam):
+        return (jam.hour * 60 + jam.minute) // cls.BUCKET_MENIT
+
+    @classmethod
+    def dari_bucket(cls, bucket):
+        # bucket terakhir berakhir tepat tengah malam
+        if bucket >= cls.JUMLAH_BUCKET:
+            return time(0, 0)
+        menit = bucket * cls.BUCKET_MENIT
+        return time(menit // 60, menit % 60)
+
+    @classmethod
+    def mask_slot(cls, jam_mulai, jam_selesai):
+        mulai = cls.ke_bucket(jam_mulai)
+        # jam selesai yang tidak pas di batas bucket dibulatkan ke atas
+        selesai = -(-(jam_selesai.hour * 60 + jam_selesai.minute) // cls.BUCKET_MENIT)
+        if selesai <= mulai:
+            selesai = cls.JUMLAH_BUCKET
+        return ((1 << selesai) - 1) ^ ((1 << mulai) - 1)
+
+    @classmethod
+    def dari_jadwal(cls, lapangan_id, tanggal, jadwal):
+        # jadwal: iterable dict (id, jam_mulai, jam_selesai, is_available) urut jam_mulai
+        mask_tersedia = mask_terisi = 0
+        slots = []
+        for slot in jadwal:
+            mask = cls.mask_slot(slot['jam_mulai'], slot['jam_selesai'])
+            if slot['is_available']:
+                mask_tersedia |= mask
+            else:
+                mask_terisi |= mask
+            slots.append({
+                'id': slot['id'],
+                'jam_mulai': slot['jam_mulai'].isoformat(),
+                'jam_selesai': slot['jam_selesai'].isoformat(),
+                'is_available': slot['is_available'],
+            })
+
+        # bucket yang juga dipakai slot terisi tidak dihitung tersedia
+        return cls(
+            lapangan_id=lapangan_id,
+            tanggal=tanggal,
+            mask_tersedia=mask_tersedia & ~mask_terisi,
+            mask_terisi=mask_terisi,
+            slots=slots,
+        )
+
+    @classmethod
+    def refresh(cls, lapangan_id, tanggal):
+        jadwal = Jadwal.objects.filter(
+            lapangan_id=lapangan_id, tanggal=tanggal
+        ).order_by('jam_mulai').values(*cls.FIELDS_JADWAL)
+
+        baru = cls.dari_jadwal(lapangan_id, tanggal, jadwal)
+
+        lama = cls.objects.filter(
+            lapangan_id=lapangan_id, tanggal=tanggal
+        ).values_list('slots', flat=True).first() or []
+        events = cls.bandingkan_slot(lama, baru.slots)
+        if events:
+            transaction.on_commit(lambda: ketersediaan_berubah.send(
+                sender=cls, lapangan_id=lapangan_id, tanggal=tanggal, events=events
+            ))
+
+        if not baru.slots:
+            cls.objects.filter(lapangan_id=lapangan_id, tanggal=tanggal).delete()
+            return None
+
+        obj, _ = cls.objects.update_or_create(
+            lapangan_id=lapangan_id,
+            tanggal=tanggal,
+            defaults={
+                'mask_tersedia': baru.mask_tersedia,
+                'mask_terisi': baru.mask_terisi,
+                'slots': baru.slots,
+            },
+        )
+        return obj
+
+    @classmethod
+    def refresh_rentang(cls, lapangan_id, tanggal_mulai, tanggal_selesai, batch_size=500):
+        # versi bulk dari refresh untuk banyak hari sekaligus (bulk_create tidak memicu signal)
+        rows = Jadwal.objects.filter(
+            lapangan_id=lapangan_id,
+            tanggal__range=(tanggal_mulai, tanggal_selesai),
+        ).order_by('tanggal', 'jam_mulai').values('tanggal', *cls.FIELDS_JADWAL)
+
+        index = [
+            cls.dari_jadwal(lapangan_id, tanggal, slots)
+            for tanggal, slots in groupby(rows, key=lambda r: r['tanggal'])
+        ]
+        cls.objects.bulk_create(
+            index,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['lapangan', 'tanggal'],
+            update_fields=['mask_tersedia', 'mask_terisi', 'slots', 'diubah_at'],
+        )
+        cls.naikkan_versi(lapangan_id)
+
+    @staticmethod
+    def bandingkan_slot(lama, baru):
+        # event slot-taken / slot-freed dari selisih daftar slot lama dan baru
+        lama = {slot['id']: slot for slot in lama}
+        events = []
+        for slot in baru:
+            if lama.pop(slot['id'], None) != slot:
+                events.append(('slot-freed' if slot['is_available'] else 'slot-taken', slot))
+        # slot yang hilang dari hari ini (dihapus / dipindah) tidak bisa dipesan lagi
+        events += [('slot-taken', slot) for slot in lama.values() if slot['is_available']]
+        return events
+
+    def daftar_slot(self, hanya_tersedia=False):
+        return [
+            {
+                'id': slot['id'],
+                'jam_mulai': time.fromisoformat(slot['jam_mulai']),
+                'jam_selesai': time.fromisoformat(slot['jam_selesai']),
+                'is_available': slot['is_available'],
+            }
+            for slot in self.slots
+            if slot['is_available'] or not hanya_tersedia
+        ]
+
+    def window_kosong(self, durasi):
+        # cari semua posisi awal dengan `durasi` menit kosong berturut-turut
+        jumlah = -(-durasi // self.BUCKET_MENIT)
+        mask = self.mask_tersedia
+        for i in range(1, jumlah):
+            mask &= self.mask_tersedia >> i
+
+        windows = []
+        while mask:
+            bucket = (mask & -mask).bit_length() - 1
+            windows.append({
+                'jam_mulai': self.dari_bucket(bucket),
+                'jam_selesai': self.dari_bucket(bucket + jumlah),
+            })
+            mask &= mask - 1
+        return windows
+
+    def __str__(self):
+        return f"{self.lapangan_id} - {self.tanggal}"
+
+
+HARI_CHOICES = [
+    (0, 'Senin'),
+    (1, 'Selasa'),
+    (2, 'Rabu'),
+    (3, 'Kamis'),
+    (4, 'Jumat'),
+    (5, 'Sabtu'),
+    (6, 'Minggu'),
+]
+
+
+# jam operasional mingguan untuk lapangan dengan jadwal virtual
+class JamOperasional(models.Model):
+    lapangan = models.ForeignKey(Lapangan, on_delete=models.CASCADE, related_name='jam_operasional')
+    hari = models.PositiveSmallIntegerField(choices=HARI_CHOICES)
+    jam_buka = models.TimeField()
+    jam_tutup = models.TimeField()
+    durasi = models.PositiveSmallIntegerField(default=60, help_text="Durasi slot dalam menit")
+
+    def __str__(self):
+        return f"{self.lapangan.nama} - {self.get_hari_display()} ({self.jam_buka} - {self.jam_tutup})"
+
+
+# pengecualian jam operasional (libur / jam khusus) pada tanggal tertentu
+class PengecualianJadwal(models.Model):
+    lapangan = models.ForeignKey(Lapangan, on_delete=models.CASCADE, related_name='pengecualian_jadwal')
+    tanggal = models.DateField()
+    tutup = models.BooleanField(default=True, help_text="Jika tidak tutup, pakai jam buka / tutup di bawah")
+    jam_buka = models.TimeField(blank=True, null=True)
+    jam_tutup = models.TimeField(blank=True, null=True)
+    durasi = models.PositiveSmallIntegerField(default=60, help_text="Durasi slot dalam menit")
+    keterangan = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        unique_together = ('lapangan', 'tanggal')
+
+    def clean(self):
+        if not self.tutup and not (self.jam_buka and self.jam_tutup):
+            raise ValidationError('Jam buka dan jam tutup wajib diisi jika lapangan tidak tutup')
+
+    def __str__(self):
+        return f"{self.lapangan.nama} - {self.tanggal}"
+
+
 # ulasan model
 class Ulasan(models.Model):
     user = models.ForeignKey(
@@ -57,10 +504,83 @@ class Ulasan(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # cek satu ulasan per user per lapangan di add_ulasan
+            models.Index(fields=['user', 'lapangan'], name='ulasan_user_lapangan_idx'),
+            # daftar ulasan terbaru di halaman detail lapangan
+            models.Index(fields=['lapangan', '-created_at'], name='ulasan_lap_created_idx'),
+            # daftar ulasan terbaru di dashboard staff, urutan kursor paginasi (created_at, id)
+            models.Index(fields=['-created_at', '-id'], name='ulasan_created_id_idx'),
+        ]
+
     def __str__(self):
         return f"Ulasan {self.rating} oleh {self.user.username} untuk {self.lapangan.nama}"
 
 
+class PemesananManager(models.Manager):
+    def _slot_berakhir(self, sekarang):
+        # tanggal & jam jadwal disimpan dalam waktu lokal, jam_selesai 00:00 = tengah malam
+        lokal = timezone.localtime(sekarang)
+        return models.Q(jadwal__tanggal__lt=lokal.date()) | models.Q(
+            jadwal__tanggal=lokal.date(),
+            jadwal__jam_selesai__lte=lokal.time(),
+            jadwal__jam_selesai__gt=models.F('jadwal__jam_mulai'),
+        )
+
+    def kedaluwarsa(self, sekarang, hold, batch_size=1000):
+        # pending yang belum dibayar setelah `hold` (atau slotnya sudah lewat) dibatalkan & slotnya dilepas
+        # per batch: satu UPDATE pemesanan + satu UPDATE jadwal, index ketersediaan di-refresh per hari
+        # return: (jumlah pemesanan, set (lapangan_id, tanggal) yang berubah)
+        qs = self.filter(
+            models.Q(created_at__lt=sekarang - hold) | self._slot_berakhir(sekarang),
+            status='pending',
+        ).order_by('id')
+
+        total = 0
+        hari = set()
+        while True:
+            with transaction.atomic():
+                rows = list(qs.select_for_update(skip_locked=True, of=('self',)).values_list(
+                    'id', 'jadwal_id', 'jadwal__lapangan_id', 'jadwal__tanggal'
+                )[:batch_size])
+                if not rows:
+                    break
+                # status dicek lagi saat UPDATE, pemesanan yang baru diterima staff tidak ikut dibatalkan
+                self.filter(pk__in=[row[0] for row in rows], status='pending').update(
+                    status='dibatalkan', updated_at=timezone.now()
+                )
+                # slot yang masih dipegang pemesanan aktif lain tidak dilepas
+                aktif = self.filter(
+                    jadwal_id__in=[row[1] for row in rows], status__in=['pending', 'diterima', 'selesai']
+                ).values_list('jadwal_id', flat=True)
+                Jadwal.objects.filter(
+                    pk__in=[row[1] for row in rows], is_available=False
+                ).exclude(pk__in=aktif).update(is_available=True)
+
+                berubah = {(row[2], row[3]) for row in rows}
+                for lapangan_id, tanggal in berubah:
+                    Ketersediaan.refresh(lapangan_id, tanggal)
+            total += len(rows)
+            hari |= berubah
+        return total, hari
+
+    def selesaikan(self, sekarang, batch_size=1000):
+        # pemesanan diterima yang jam_selesai-nya sudah lewat menjadi selesai, slot tetap terisi
+        qs = self.filter(self._slot_berakhir(sekarang), status='diterima').order_by('id')
+
+        total = 0
+        while True:
+            with transaction.atomic():
+                ids = list(qs.values_list('id', flat=True)[:batch_size])
+                if not ids:
+                    break
+                total += self.filter(pk__in=ids, status='diterima').update(
+                    status='selesai', updated_at=timezone.now()
+                )
+        return total
+
+
 # pemesanan model
 class Pemesanan(models.Model):
     user = models.ForeignKey(
@@ -88,17 +608,124 @@ class Pemesanan(models.Model):
         ('selesai', 'Selesai'),
         ('dibatalkan', 'Dibatalkan'),
     ), default='pending')
+    harga_total = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, help_text="Harga saat pemesanan dibuat")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PemesananManager()
+
+    class Meta:
+        indexes = [
+            # riwayat pemesanan user (dashboard user)
+            models.Index(fields=['user', '-created_at'], name='pemesanan_user_created_idx'),
+            models.Index(fields=['status'], name='pemesanan_status_idx'),
+            # daftar pemesanan terbaru di dashboard staff / admin, urutan kursor paginasi (created_at, id)
+            models.Index(fields=['-created_at', '-id'], name='pemesanan_created_id_idx'),
+        ]
+
     def hitung_harga(self):
-        durasi = timedelta(
-            hours=self.jadwal.jam_selesai.hour, minutes=self.jadwal.jam_selesai.minute
-        ) - timedelta(
-            hours=self.jadwal.jam_mulai.hour, minutes=self.jadwal.jam_mulai.minute
-        )
-        total_jam = Decimal(str(durasi.total_seconds() / 3600))
-        return self.jadwal.lapangan.harga_per_jam * total_jam
+        menit = durasi_menit(self.jadwal.jam_mulai, self.jadwal.jam_selesai)
+        harga = self.jadwal.lapangan.harga_per_jam * Decimal(menit) / 60
+        return harga.quantize(Decimal('0.01'))
+
+    def save(self, *args, **kwargs):
+        # snapshot harga saat pemesanan dibuat, tidak ikut berubah jika harga lapangan diubah
+        if self.harga_total is None:
+            self.harga_total = self.hitung_harga()
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Pesanan oleh {self.user.username} - {self.status}"
+
+
+# arsip jadwal & pemesanan lama (python manage.py arsipkan)
+# tabel utama hanya berisi data yang masih dipakai alur booking, laporan membaca keduanya
+class JadwalArsip(models.Model):
+    # id sama dengan id Jadwal asal
+    id = models.BigIntegerField(primary_key=True)
+    lapangan = models.ForeignKey(Lapangan, on_delete=models.CASCADE, related_name='+')
+    tanggal = models.DateField()
+    jam_mulai = models.TimeField()
+    jam_selesai = models.TimeField()
+    is_available = models.BooleanField()
+    diarsipkan_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['lapangan', 'tanggal'], name='jadwal_arsip_lap_tgl_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.lapangan_id} - {self.tanggal} ({self.jam_mulai} - {self.jam_selesai})"
+
+
+class PemesananArsip(models.Model):
+    # id sama dengan id Pemesanan asal, data jadwal disalin karena jadwalnya ikut diarsipkan / dihapus
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    staff = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    jadwal_id = models.BigIntegerField()
+    lapangan = models.ForeignKey(Lapangan, on_delete=models.CASCADE, related_name='+')
+    tanggal = models.DateField()
+    jam_mulai = models.TimeField()
+    jam_selesai = models.TimeField()
+    metode_pembayaran = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+    harga_total = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    diarsipkan_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tanggal', 'lapangan'], name='pemesanan_arsip_tgl_lap_idx'),
+            models.Index(fields=['user', '-created_at'], name='pemesanan_arsip_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"Arsip pesanan {self.id} - {self.status}"
+
+
+class JumlahArsip(models.Model):
+    # jumlah pemesanan di arsip per status, ditambah arsipkan_pemesanan dalam transaksi yang sama
+    # statistik dashboard membaca tabel kecil ini, bukan menghitung ulang PemesananArsip
+    status = models.CharField(max_length=20, unique=True)
+    jumlah = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.status}: {self.jumlah}"
+
+
+# rekap harian per lapangan (python manage.py rekap_harian), sumber grafik dashboard admin
+# dihitung dari pemesanan & jadwal aktif maupun arsip
+class RekapHarian(models.Model):
+    lapangan = models.ForeignKey(Lapangan, on_delete=models.CASCADE, related_name='+')
+    tanggal = models.DateField()
+    # pemesanan yang tidak dibatalkan
+    jumlah_pemesanan = models.PositiveIntegerField(default=0)
+    jam_terpesan = models.DecimalField(max_digits=6, decimal_places=2, default=0)
+    jam_tersedia = models.DecimalField(max_digits=6, decimal_places=2, default=0)
+    # pemesanan diterima & selesai
+    pendapatan = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    okupansi = models.DecimalField(max_digits=5, decimal_places=2, default=0, help_text="Persen jam terpesan")
+    dihitung_at = models.DateTimeField()
+    # jadwal / pemesanan hari ini dihapus: tidak ada baris sumber dengan waktu ubah yang bisa dibaca rekap
+    basi = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['lapangan', 'tanggal'], name='unique_rekap_lapangan_tanggal'),
+        ]
+        indexes = [
+            models.Index(fields=['tanggal'], name='rekap_tanggal_idx'),
+            models.Index(fields=['dihitung_at'], name='rekap_dihitung_idx'),
+            models.Index(fields=['basi'], condition=models.Q(basi=True), name='rekap_basi_idx'),
+        ]
+
+    @classmethod
+    def tandai_basi(cls, lapangan_id, tanggal):
+        # dihitung ulang di rekap_inkremental berikutnya
+        cls.objects.filter(lapangan_id=lapangan_id, tanggal=tanggal, basi=False).update(basi=True)
+
+    def __str__(self):
+        return f"{self.lapangan_id} - {self.tanggal}"
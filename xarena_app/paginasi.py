@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from math import ceil
+from django.db.models import Q
+
+# keyset (cursor) pagination urut (-created_at, -id) untuk tabel dashboard staff / admin
+# tanpa OFFSET & COUNT(*) per halaman: halaman ke-N sama murahnya dengan halaman pertama
+# kursor di query string: "<arah>.<nomor halaman>.<created_at dalam mikrodetik>.<id>"
+#   arah s = halaman sesudah baris kursor, b = halaman sebelum baris kursor
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+MIKRODETIK = timedelta(microseconds=1)
+
+
+def _kunci(obj):
+    return f'{(obj.created_at - EPOCH) // MIKRODETIK}.{obj.pk}'
+
+
+def _parse_kursor(kursor):
+    try:
+        arah, nomor, mikrodetik, pk = kursor.split('.')
+        if arah not in ('s', 'b'):
+            raise ValueError
+        return arah, max(int(nomor), 1), EPOCH + int(mikrodetik) * MIKRODETIK, int(pk)
+    except (AttributeError, ValueError, OverflowError):
+        # kursor kosong / rusak = halaman pertama
+        return None
+
+
+class HalamanKursor:
+    # antarmuka mirip Page (object_list, number, has_next, ...) supaya template tetap sederhana
+    # total hanya perkiraan (dari cache statistik), jumlah halaman ikut perkiraan
+    def __init__(self, object_list, number, has_next, has_previous, per_halaman, total=None):
+        self.object_list = object_list
+        self.number = number
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.total = total
+        self.num_pages = max(ceil(total / per_halaman), number) if total is not None else None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def next_cursor(self):
+        return f's.{self.number + 1}.{_kunci(self.object_list[-1])}' if self._has_next else ''
+
+    def previous_cursor(self):
+        return f'b.{self.number - 1}.{_kunci(self.object_list[0])}' if self._has_previous else ''
+
+
+def _halaman_pertama(queryset, per_halaman, total):
+    rows = list(queryset.order_by('-created_at', '-id')[:per_halaman + 1])
+    return HalamanKursor(rows[:per_halaman], 1, len(rows) > per_halaman, False, per_halaman, total)
+
+
+def halaman_kursor(queryset, kursor=None, per_halaman=10, total=None):
+    posisi = _parse_kursor(kursor)
+    if posisi is None:
+        return _halaman_pertama(queryset, per_halaman, total)
+
+    arah, nomor, created_at, pk = posisi
+    # created_at <= x lalu buang baris seri yang sudah lewat, supaya tetap range scan di index created_at
+    if arah == 's':
+        rows = list(queryset.filter(
+            Q(created_at__lte=created_at) & ~Q(created_at=created_at, id__gte=pk)
+        ).order_by('-created_at', '-id')[:per_halaman + 1])
+        if not rows:
+            # baris setelah kursor sudah habis (mis. dihapus / diarsipkan)
+            return _halaman_pertama(queryset, per_halaman, total)
+        return HalamanKursor(rows[:per_halaman], nomor, len(rows) > per_halaman, True, per_halaman, total)
+
+    rows = list(queryset.filter(
+        Q(created_at__gte=created_at) & ~Q(created_at=created_at, id__lte=pk)
+    ).order_by('created_at', 'id')[:per_halaman + 1])
+    if len(rows) <= per_halaman:
+        # sudah sampai halaman pertama, dibaca ulang supaya isinya penuh
+        return _halaman_pertama(queryset, per_halaman, total)
+    # halaman sebelumnya dibaca terbalik
+    return HalamanKursor(rows[:per_halaman][::-1], max(nomor, 2), True, True, per_halaman, total)
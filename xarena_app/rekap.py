@@ -0,0 +1,171 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Func, IntegerField, Max, Q, Sum
+from django.utils import timezone
+from .arsip import riwayat_pemesanan
+from .models import MENIT_SEHARI, Jadwal, JadwalArsip, Ketersediaan, Lapangan, Pemesanan, RekapHarian
+
+# status pemesanan yang dihitung sebagai pendapatan
+STATUS_PENDAPATAN = ('diterima', 'selesai')
+# perubahan yang commit sedikit setelah rekap terakhir dimulai tetap terbaca di putaran berikutnya
+MARGIN_WATERMARK = timedelta(minutes=5)
+
+
+class MenitJam(Func):
+    # jam (TimeField) -> menit sejak 00:00
+    template = '(EXTRACT(HOUR FROM %(expressions)s) * 60 + EXTRACT(MINUTE FROM %(expressions)s))'
+    output_field = IntegerField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # sqlite menyimpan TimeField sebagai teks 'HH:MM:SS', ExtractHour di sqlite memanggil
+        # fungsi python per baris (~10x lebih lambat untuk jutaan jadwal)
+        return self.as_sql(
+            compiler, connection,
+            template='(CAST(substr(%(expressions)s, 1, 2) AS INTEGER) * 60 '
+                     '+ CAST(substr(%(expressions)s, 4, 2) AS INTEGER))',
+            **extra_context,
+        )
+
+
+def _durasi():
+    # durasi jadwal dalam menit, sama dengan models.durasi_menit (lewat tengah malam dibungkus)
+    return ExpressionWrapper(
+        (MenitJam('jam_selesai') - MenitJam('jam_mulai') + MENIT_SEHARI) % MENIT_SEHARI,
+        output_field=IntegerField(),
+    )
+
+
+def _filter(qs, lapangan_ids, tanggal):
+    if lapangan_ids is not None:
+        qs = qs.filter(lapangan_id__in=lapangan_ids)
+    if tanggal is not None:
+        qs = qs.filter(tanggal__in=tanggal)
+    return qs
+
+
+def hitung_rekap(lapangan_ids=None, tanggal=None):
+    # agregat per (lapangan_id, tanggal) langsung di database, satu GROUP BY per tabel sumber
+    # jadwal & pemesanan dari tabel aktif maupun arsip
+    rekap = {}
+
+    def baris(key):
+        return rekap.setdefault(key, {
+            'jumlah_pemesanan': 0, 'menit_terpesan': 0, 'menit_tersedia': 0, 'pendapatan': Decimal(0),
+        })
+
+    for model in (Jadwal, JadwalArsip):
+        qs = _filter(model.objects.all(), lapangan_ids, tanggal)
+        for row in qs.values('lapangan_id', 'tanggal').annotate(menit=Sum(_durasi())).order_by():
+            baris((row['lapangan_id'], row['tanggal']))['menit_tersedia'] += row['menit'] or 0
+
+    dibayar = Q(status__in=STATUS_PENDAPATAN)
+    for qs in riwayat_pemesanan(dengan_user=False):
+        qs = _filter(qs, lapangan_ids, tanggal).exclude(status='dibatalkan')
+        agregat = qs.values('lapangan_id', 'tanggal').annotate(
+            jumlah=Count('id'),
+            menit=Sum(_durasi()),
+            harga=Sum('harga_total', filter=dibayar & Q(harga_total__isnull=False)),
+            # pemesanan lama tanpa snapshot harga, dihitung seperti Pemesanan.hitung_harga
+            harga_menit=Sum(
+                ExpressionWrapper(F('harga_per_jam') * _durasi(), output_field=DecimalField()),
+                filter=dibayar & Q(harga_total__isnull=True),
+            ),
+        ).order_by()
+        for row in agregat:
+            data = baris((row['lapangan_id'], row['tanggal']))
+            data['jumlah_pemesanan'] += row['jumlah']
+            data['menit_terpesan'] += row['menit'] or 0
+            data['pendapatan'] += Decimal(row['harga'] or 0) + Decimal(row['harga_menit'] or 0) / 60
+    return rekap
+
+
+def _jam(menit):
+    return (Decimal(menit) / 60).quantize(Decimal('0.01'))
+
+
+KOLOM_REKAP = (
+    'lapangan', 'tanggal', 'jumlah_pemesanan', 'jam_terpesan', 'jam_tersedia', 'pendapatan', 'okupansi', 'dihitung_at',
+    'basi',
+)
+
+
+def simpan_rekap(rekap, lapangan_ids=None, tanggal=None, dihitung_at=None, batch_size=5000):
+    # rekap untuk cakupan (lapangan_ids x tanggal) diganti seluruhnya, hari yang sudah kosong ikut terhapus
+    # INSERT lewat executemany seperti command seed, bulk_create menghabiskan sebagian besar waktu rekap penuh
+    connection = connections[DEFAULT_DB_ALIAS]
+    dihitung_at = connection.ops.adapt_datetimefield_value(dihitung_at or timezone.now())
+    rows = []
+    for (lapangan_id, tgl), data in rekap.items():
+        okupansi = Decimal(0)
+        if data['menit_tersedia']:
+            okupansi = min(Decimal(data['menit_terpesan']) * 100 / data['menit_tersedia'], Decimal(100))
+        rows.append((
+            lapangan_id,
+            tgl,
+            data['jumlah_pemesanan'],
+            _jam(data['menit_terpesan']),
+            _jam(data['menit_tersedia']),
+            data['pendapatan'].quantize(Decimal('0.01')),
+            okupansi.quantize(Decimal('0.01')),
+            dihitung_at,
+            False,
+        ))
+
+    qn = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        qn(RekapHarian._meta.db_table),
+        ', '.join(qn(RekapHarian._meta.get_field(nama).column) for nama in KOLOM_REKAP),
+        ', '.join(['%s'] * len(KOLOM_REKAP)),
+    )
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        _filter(RekapHarian.objects.all(), lapangan_ids, tanggal).delete()
+        with connection.cursor() as cursor:
+            for i in range(0, len(rows), batch_size):
+                cursor.executemany(sql, rows[i:i + batch_size])
+    return len(rows)
+
+
+def rekap_penuh(lapangan_per_batch=200, dihitung_at=None):
+    # seluruh riwayat, dibagi per kelompok lapangan supaya hasil GROUP BY tidak terlalu besar
+    dihitung_at = dihitung_at or timezone.now()
+    ids = list(Lapangan.objects.order_by('id').values_list('id', flat=True))
+    total = 0
+    for i in range(0, len(ids), lapangan_per_batch):
+        chunk = ids[i:i + lapangan_per_batch]
+        total += simpan_rekap(hitung_rekap(lapangan_ids=chunk), lapangan_ids=chunk, dihitung_at=dihitung_at)
+    return total
+
+
+def hari_berubah(sejak):
+    # (lapangan_id, tanggal) yang pemesanan atau jadwalnya berubah setelah `sejak`,
+    # ditambah hari yang ditandai basi karena jadwal / pemesanannya dihapus (lihat signals)
+    hari = set(
+        Pemesanan.objects.filter(updated_at__gt=sejak)
+        .values_list('jadwal__lapangan_id', 'jadwal__tanggal').distinct()
+    )
+    hari |= set(Ketersediaan.objects.filter(diubah_at__gt=sejak).values_list('lapangan_id', 'tanggal'))
+    hari |= set(RekapHarian.objects.filter(basi=True).values_list('lapangan_id', 'tanggal'))
+    return hari
+
+
+def rekap_inkremental(hari_per_batch=50, dihitung_at=None):
+    # hanya hari yang berubah sejak rekap terakhir, rekap kosong = bangun ulang penuh
+    # return: (jumlah baris rekap, penuh)
+    dihitung_at = dihitung_at or timezone.now()
+    terakhir = RekapHarian.objects.aggregate(terakhir=Max('dihitung_at'))['terakhir']
+    if terakhir is None:
+        return rekap_penuh(dihitung_at=dihitung_at), True
+
+    per_tanggal = {}
+    for lapangan_id, tgl in hari_berubah(terakhir - MARGIN_WATERMARK):
+        per_tanggal.setdefault(tgl, set()).add(lapangan_id)
+
+    total = 0
+    semua = sorted(per_tanggal)
+    for i in range(0, len(semua), hari_per_batch):
+        tanggal = semua[i:i + hari_per_batch]
+        lapangan_ids = set().union(*(per_tanggal[tgl] for tgl in tanggal))
+        rekap = hitung_rekap(lapangan_ids=lapangan_ids, tanggal=tanggal)
+        total += simpan_rekap(rekap, lapangan_ids=lapangan_ids, tanggal=tanggal, dihitung_at=dihitung_at)
+    return total, False
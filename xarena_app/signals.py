@@ -0,0 +1,166 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from . import live
+from .auth import hapus_cache_user
+from .gambar import hapus_file, jadwalkan_turunan, semua_path_turunan
+from .caching import hapus_statistik
+from .models import ketersediaan_berubah, CustomUser, Jadwal, JamOperasional, Ketersediaan, Lapangan, PengecualianJadwal, Pemesanan, RekapHarian, Ulasan
+
+
+def _update_rating(lapangan_id, count, rating):
+    # diubah_at ikut dinaikkan, rating tampil di katalog publik
+    Lapangan.objects.filter(pk=lapangan_id).update(
+        rating_count=F('rating_count') + count,
+        rating_sum=F('rating_sum') + rating,
+        diubah_at=timezone.now(),
+    )
+
+
+# simpan nilai lama supaya perubahan ulasan (mis. lewat django admin) ikut terhitung
+@receiver(pre_save, sender=Ulasan)
+def simpan_ulasan_lama(sender, instance, **kwargs):
+    instance._ulasan_lama = None
+    if not instance._state.adding:
+        instance._ulasan_lama = Ulasan.objects.filter(
+            pk=instance.pk
+        ).values('lapangan_id', 'rating').first()
+
+
+@receiver(post_save, sender=Ulasan)
+def update_rating_ulasan_disimpan(sender, instance, created, **kwargs):
+    lama = getattr(instance, '_ulasan_lama', None)
+    if created:
+        _update_rating(instance.lapangan_id, 1, instance.rating)
+    elif lama and (lama['lapangan_id'], lama['rating']) != (instance.lapangan_id, instance.rating):
+        _update_rating(lama['lapangan_id'], -1, -lama['rating'])
+        _update_rating(instance.lapangan_id, 1, instance.rating)
+
+
+@receiver(post_delete, sender=Ulasan)
+def update_rating_ulasan_dihapus(sender, instance, **kwargs):
+    _update_rating(instance.lapangan_id, -1, -instance.rating)
+
+
+# index ketersediaan ikut diperbarui setiap jadwal berubah
+@receiver(pre_save, sender=Jadwal)
+def simpan_jadwal_lama(sender, instance, **kwargs):
+    instance._jadwal_lama = None
+    if not instance._state.adding:
+        instance._jadwal_lama = Jadwal.objects.filter(
+            pk=instance.pk
+        ).values_list('lapangan_id', 'tanggal').first()
+
+
+@receiver(post_save, sender=Jadwal)
+def update_ketersediaan_jadwal_disimpan(sender, instance, **kwargs):
+    # edit_jadwal mengisi tanggal dari string POST
+    tanggal = Jadwal._meta.get_field('tanggal').to_python(instance.tanggal)
+    Ketersediaan.refresh(instance.lapangan_id, tanggal)
+
+    lama = getattr(instance, '_jadwal_lama', None)
+    if lama and lama != (instance.lapangan_id, tanggal):
+        Ketersediaan.refresh(*lama)
+
+
+def _dari_lapangan(origin):
+    return isinstance(origin, Lapangan) or getattr(origin, 'model', None) is Lapangan
+
+
+@receiver(post_delete, sender=Jadwal)
+def update_ketersediaan_jadwal_dihapus(sender, instance, origin=None, **kwargs):
+    # lapangan yang dihapus ikut menghapus index & rekapnya lewat cascade
+    if _dari_lapangan(origin):
+        return
+    Ketersediaan.refresh(instance.lapangan_id, instance.tanggal)
+    RekapHarian.tandai_basi(instance.lapangan_id, instance.tanggal)
+
+
+# pemesanan yang dihapus (admin, cascade user / jadwal) tidak meninggalkan updated_at untuk rekap_inkremental
+# jadwalnya masih ada di sini: Collector menghapus pemesanan sebelum jadwal
+@receiver(post_delete, sender=Pemesanan)
+def tandai_rekap_pemesanan_dihapus(sender, instance, origin=None, **kwargs):
+    if _dari_lapangan(origin):
+        return
+    hari = Jadwal.objects.filter(pk=instance.jadwal_id).values_list('lapangan_id', 'tanggal').first()
+    if hari:
+        RekapHarian.tandai_basi(*hari)
+
+
+# teruskan perubahan slot ke stream SSE yang sedang terbuka di proses ini
+@receiver(ketersediaan_berubah)
+def kirim_event_ketersediaan(sender, lapangan_id, tanggal, events, **kwargs):
+    live.publish(lapangan_id, tanggal, [
+        (nama, dict(slot, tanggal=str(tanggal))) for nama, slot in events
+    ])
+
+
+# statistik dashboard dihapus dari cache setiap data terkait berubah
+@receiver(post_save, sender=Pemesanan)
+@receiver(post_delete, sender=Pemesanan)
+def hapus_statistik_pemesanan(sender, **kwargs):
+    hapus_statistik('pemesanan')
+
+
+@receiver(post_save, sender=Ulasan)
+@receiver(post_delete, sender=Ulasan)
+def hapus_statistik_ulasan(sender, **kwargs):
+    hapus_statistik('ulasan')
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def hapus_statistik_user(sender, **kwargs):
+    hapus_statistik('user')
+
+
+# user yang dicache CachedModelBackend dihapus setiap berubah (password, is_active, last_login, dll)
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def hapus_cache_auth_user(sender, instance, **kwargs):
+    transaction.on_commit(lambda: hapus_cache_user(instance.pk))
+
+
+@receiver(post_save, sender=Lapangan)
+@receiver(post_delete, sender=Lapangan)
+def hapus_statistik_lapangan(sender, **kwargs):
+    hapus_statistik('lapangan')
+
+
+# perubahan lapangan / jam operasional mengubah slot virtual semua tanggal
+@receiver(post_save, sender=Lapangan)
+@receiver(post_save, sender=JamOperasional)
+@receiver(post_delete, sender=JamOperasional)
+@receiver(post_save, sender=PengecualianJadwal)
+@receiver(post_delete, sender=PengecualianJadwal)
+def naikkan_versi_ketersediaan(sender, instance, **kwargs):
+    Ketersediaan.naikkan_versi(instance.pk if sender is Lapangan else instance.lapangan_id)
+
+
+# gambar baru (add_lapangan, edit_lapangan, admin) dibuatkan turunannya di background
+@receiver(pre_save, sender=Lapangan)
+def simpan_gambar_lama(sender, instance, **kwargs):
+    instance._gambar_lama = instance._turunan_lama = None
+    if not instance._state.adding:
+        instance._gambar_lama, instance._turunan_lama = Lapangan.objects.filter(pk=instance.pk).values_list(
+            'gambar', 'gambar_turunan'
+        ).first() or (None, None)
+
+
+@receiver(post_save, sender=Lapangan)
+def buat_turunan_gambar(sender, instance, created, raw=False, **kwargs):
+    lama = getattr(instance, '_gambar_lama', None)
+    if raw or (instance.gambar.name or None) == (lama or None):
+        return
+    # turunan lama tidak berlaku lagi, template memakai gambar asli sampai worker selesai
+    # file-nya dihapus worker setelah turunan baru tersimpan (atau setelah commit jika gambar dikosongkan)
+    file_lama = semua_path_turunan(lama, getattr(instance, '_turunan_lama', None) or {}) if lama else []
+    if instance.gambar_turunan or file_lama:
+        instance.gambar_turunan = {}
+        Lapangan.objects.filter(pk=instance.pk).update(gambar_turunan={}, diubah_at=timezone.now())
+    if instance.gambar:
+        jadwalkan_turunan(instance.pk, file_lama)
+    elif file_lama:
+        transaction.on_commit(lambda: hapus_file(file_lama))
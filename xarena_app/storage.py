@@ -0,0 +1,39 @@
+import gzip
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# file teks yang layak dikompres, gambar jpg/png sudah terkompres
+EKSTENSI_KOMPRES = ('.css', '.js', '.svg', '.txt', '.json', '.map', '.html', '.xml', '.ico')
+
+
+def _kompresor():
+    yield '.gz', lambda isi: gzip.compress(isi, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield '.br', lambda isi: brotli.compress(isi, quality=11)
+
+
+# collectstatic: nama file di-hash (manifest) lalu dibuat varian .gz dan .br (jika modul brotli ada)
+class KompresiManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        for hashed_name in set(self.hashed_files.values()):
+            if not hashed_name.endswith(EKSTENSI_KOMPRES):
+                continue
+            with self.open(hashed_name) as f:
+                isi = f.read()
+            for ekstensi, kompres in _kompresor():
+                # nama sudah mengandung hash isi, varian yang sudah ada pasti sama
+                if self.exists(hashed_name + ekstensi):
+                    continue
+                hasil = kompres(isi)
+                if len(hasil) < len(isi) * 0.95:
+                    self._save(hashed_name + ekstensi, ContentFile(hasil))
+                    yield hashed_name, hashed_name + ekstensi, True
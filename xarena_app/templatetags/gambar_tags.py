@@ -0,0 +1,36 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+from xarena_app.gambar import path_turunan
+
+register = template.Library()
+
+
+@register.simple_tag
+def gambar_lapangan(lapangan, ukuran='card', sizes=None, **attrs):
+    # <picture> webp + jpeg dengan srcset dari turunan, fallback ke gambar asli jika belum dibuat
+    if not lapangan.gambar:
+        return ''
+    attrs.setdefault('alt', lapangan.nama)
+    attrs.setdefault('loading', 'lazy')
+    atribut = format_html_join('', ' {}="{}"', attrs.items())
+
+    turunan = lapangan.gambar_turunan or {}
+    if ukuran not in turunan:
+        return format_html('<img src="{}"{}>', lapangan.gambar.url, atribut)
+
+    nama = lapangan.gambar.name
+    lebar = sorted({lebar: u for u, lebar in turunan.items()}.items())
+    sizes = sizes or f'{turunan[ukuran]}px'
+
+    def srcset(ekstensi):
+        return ', '.join(
+            f'{default_storage.url(path_turunan(nama, u, ekstensi))} {w}w' for w, u in lebar
+        )
+
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}"{}></picture>',
+        srcset('webp'), sizes,
+        default_storage.url(path_turunan(nama, ukuran, 'jpg')), srcset('jpg'), sizes, atribut,
+    )
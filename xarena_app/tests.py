@@ -1,3 +1,760 @@
-from django.test import TestCase
+import csv
+import tempfile
+import zipfile
+from datetime import date, time, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+from PIL import Image
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from .arsip import arsipkan
+from .auth import CachedModelBackend, cache_bersama, cek_cache_bersama
+from .caching import statistik_pemesanan, versi_katalog
+from .gambar import buat_turunan, semua_path_turunan
+from .models import (
+    CustomUser, Jadwal, JadwalArsip, JamOperasional, JumlahArsip, Ketersediaan, Lapangan, PengecualianJadwal,
+    Pemesanan, PemesananArsip, RekapHarian, Ulasan, durasi_menit,
+)
+from .paginasi import halaman_kursor
+from .rekap import rekap_inkremental, rekap_penuh
 
-# Create your tests here.
+# test berjalan dengan DEBUG=False, manifest static hanya ada setelah collectstatic
+TANPA_MANIFEST = override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+
+
+class DataMixin:
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user('budi', 'budi@example.com', 'rahasia123')
+        self.lapangan = Lapangan.objects.create(nama='Lapangan A', deskripsi='Vinyl', harga_per_jam=Decimal('100000'))
+        self.hari_ini = timezone.localdate()
+
+    def buat_jadwal(self, tanggal, jam, is_available=True):
+        return Jadwal.objects.create(
+            lapangan=self.lapangan, tanggal=tanggal, jam_mulai=time(jam), jam_selesai=time((jam + 1) % 24),
+            is_available=is_available,
+        )
+
+    def buat_pemesanan(self, tanggal, jam, status='pending'):
+        jadwal = self.buat_jadwal(tanggal, jam, is_available=False)
+        return Pemesanan.objects.create(user=self.user, jadwal=jadwal, status=status)
+
+    def slot_index(self, jadwal):
+        hari = Ketersediaan.objects.get(lapangan=jadwal.lapangan, tanggal=jadwal.tanggal)
+        return next(slot for slot in hari.slots if slot['id'] == jadwal.id)
+
+
+class HalamanKursorTest(DataMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        # 5 kelompok created_at yang sama persis, urutan di dalam kelompok ditentukan id
+        waktu = timezone.now().replace(microsecond=0)
+        for i in range(25):
+            pemesanan = self.buat_pemesanan(self.hari_ini + timedelta(days=i // 10 + 1), 8 + i % 10)
+            Pemesanan.objects.filter(pk=pemesanan.pk).update(created_at=waktu - timedelta(minutes=i // 5))
+        self.urutan = list(Pemesanan.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def ids(self, halaman):
+        return [obj.id for obj in halaman]
+
+    def test_halaman_berikutnya_tanpa_duplikat_dengan_created_at_seri(self):
+        qs = Pemesanan.objects.all()
+        halaman = halaman_kursor(qs, per_halaman=7)
+        dibaca = self.ids(halaman)
+        while halaman.has_next():
+            halaman = halaman_kursor(qs, halaman.next_cursor(), per_halaman=7)
+            dibaca += self.ids(halaman)
+
+        self.assertEqual(dibaca, self.urutan)
+        self.assertEqual(halaman.number, 4)
+        self.assertTrue(halaman.has_previous())
+
+    def test_halaman_sebelumnya_dibalik_ke_urutan_semula(self):
+        qs = Pemesanan.objects.all()
+        satu = halaman_kursor(qs, per_halaman=7)
+        dua = halaman_kursor(qs, satu.next_cursor(), per_halaman=7)
+        tiga = halaman_kursor(qs, dua.next_cursor(), per_halaman=7)
+
+        kembali = halaman_kursor(qs, tiga.previous_cursor(), per_halaman=7)
+        self.assertEqual(self.ids(kembali), self.ids(dua))
+        self.assertEqual(kembali.number, 2)
+        self.assertTrue(kembali.has_next())
+
+        awal = halaman_kursor(qs, kembali.previous_cursor(), per_halaman=7)
+        self.assertEqual(self.ids(awal), self.urutan[:7])
+        self.assertEqual(awal.number, 1)
+        self.assertFalse(awal.has_previous())
+
+    def test_kursor_rusak_kembali_ke_halaman_pertama(self):
+        halaman = halaman_kursor(Pemesanan.objects.all(), 's.x.1.2', per_halaman=7)
+        self.assertEqual(self.ids(halaman), self.urutan[:7])
+        self.assertEqual(halaman.number, 1)
+
+
+class CachedModelBackendTest(DataMixin, TestCase):
+    backend = CachedModelBackend()
+
+    @override_settings(AUTH_USER_CACHE=True)
+    def test_cache_bersama_mengambil_user_dari_cache(self):
+        with mock.patch('xarena_app.auth.cache_bersama', return_value=True):
+            with self.assertNumQueries(1):
+                self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+            with self.assertNumQueries(0):
+                self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+
+            # user yang dinonaktifkan dihapus dari cache setelah commit
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.is_active = False
+                self.user.save()
+            with self.assertNumQueries(1):
+                self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    @override_settings(AUTH_USER_CACHE=True)
+    def test_cache_per_proses_selalu_query_database(self):
+        self.assertFalse(cache_bersama())
+        for i in range(2):
+            with self.assertNumQueries(1):
+                self.backend.get_user(self.user.pk)
+        self.assertEqual([e.id for e in cek_cache_bersama(None)], ['xarena.E001'])
+
+    def test_session_cache_per_proses_ditolak_jika_lebih_dari_satu_proses(self):
+        for engine, proses, error in (
+            ('django.contrib.sessions.backends.cached_db', 2, True),
+            ('django.contrib.sessions.backends.cache', 4, True),
+            ('django.contrib.sessions.backends.cached_db', 1, False),
+            ('django.contrib.sessions.backends.db', 4, False),
+        ):
+            with self.subTest(engine=engine, proses=proses), override_settings(
+                SESSION_ENGINE=engine, JUMLAH_PROSES=proses, AUTH_USER_CACHE=False,
+            ):
+                self.assertEqual(bool(cek_cache_bersama(None)), error)
+
+
+@TANPA_MANIFEST
+class KatalogPublikTest(DataMixin, TestCase):
+    def test_halaman_dicache_dan_ikut_versi_database(self):
+        url = reverse('list_lapangan')
+        pertama = self.client.get(url)
+        self.assertContains(pertama, 'Lapangan A')
+        # halaman dari cache, hanya cek versi katalog
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).content, pertama.content)
+
+        # update langsung di database seperti dari proses lain (tanpa cache proses ini)
+        Lapangan.objects.filter(pk=self.lapangan.pk).update(nama='Lapangan Baru', diubah_at=timezone.now())
+        self.assertContains(self.client.get(url), 'Lapangan Baru')
+
+    def test_versi_berubah_setiap_data_katalog_berubah(self):
+        versi = versi_katalog()
+
+        def berubah():
+            nonlocal versi
+            baru = versi_katalog()
+            self.assertNotEqual(baru, versi)
+            versi = baru
+
+        ulasan = Ulasan.objects.create(user=self.user, lapangan=self.lapangan, rating=4)
+        berubah()
+        ulasan.rating = 5
+        ulasan.save()
+        berubah()
+        call_command('rebuild_rating', stdout=StringIO())
+        berubah()
+        self.lapangan.harga_per_jam = Decimal('120000')
+        self.lapangan.save()
+        berubah()
+        lain = Lapangan.objects.create(nama='Lapangan B', deskripsi='Rumput', harga_per_jam=Decimal('90000'))
+        berubah()
+        Lapangan.objects.filter(pk=self.lapangan.pk).delete()
+        berubah()
+        lain.delete()
+        berubah()
+
+
+class GenerateJadwalTest(DataMixin, TestCase):
+    def test_generate_ulang_melewati_slot_yang_sudah_ada(self):
+        besok = self.hari_ini + timedelta(days=1)
+        lusa = besok + timedelta(days=1)
+        self.assertEqual(Jadwal.objects.generate(self.lapangan, besok, besok, time(8), time(12), 60), (4, 0))
+        # rentang yang tumpang tindih hanya menambah slot yang belum ada
+        self.assertEqual(Jadwal.objects.generate(self.lapangan, besok, lusa, time(8), time(12), 60), (4, 4))
+        self.assertEqual(Jadwal.objects.generate(self.lapangan, besok, lusa, time(8), time(12), 60), (0, 8))
+
+        self.assertEqual(Jadwal.objects.filter(lapangan=self.lapangan).count(), 8)
+        hari = Ketersediaan.objects.get(lapangan=self.lapangan, tanggal=lusa)
+        self.assertEqual([slot['jam_mulai'] for slot in hari.slots], ['08:00:00', '09:00:00', '10:00:00', '11:00:00'])
+
+
+class MigrasiJadwalDuplikatTest(TransactionTestCase):
+    sebelum = [('xarena_app', '0004_ketersediaan')]
+    sesudah = [('xarena_app', '0005_jadwal_unique_jadwal_lapangan_tanggal_jam')]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.sebelum)
+        self.apps = executor.loader.project_state(self.sebelum).apps
+        User = self.apps.get_model('xarena_app', 'CustomUser')
+        Lapangan = self.apps.get_model('xarena_app', 'Lapangan')
+        self.user = User.objects.create(username='budi')
+        self.lapangan = Lapangan.objects.create(nama='Lapangan A', deskripsi='Vinyl', harga_per_jam=100000)
+        self.tanggal = timezone.localdate() + timedelta(days=1)
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def jadwal(self, jam):
+        Jadwal = self.apps.get_model('xarena_app', 'Jadwal')
+        return Jadwal.objects.create(
+            lapangan=self.lapangan, tanggal=self.tanggal, jam_mulai=time(jam), jam_selesai=time(jam + 1),
+        )
+
+    def pesan(self, jadwal, status):
+        Pemesanan = self.apps.get_model('xarena_app', 'Pemesanan')
+        return Pemesanan.objects.create(user=self.user, jadwal=jadwal, status=status)
+
+    def migrate(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.sesudah)
+
+    def test_duplikat_digabung_ke_id_terkecil(self):
+        keep, ganda = self.jadwal(10), self.jadwal(10)
+        batal = self.pesan(keep, 'dibatalkan')
+        aktif = self.pesan(ganda, 'diterima')
+
+        self.migrate()
+
+        apps = MigrationExecutor(connection).loader.project_state(self.sesudah).apps
+        Jadwal = apps.get_model('xarena_app', 'Jadwal')
+        Pemesanan = apps.get_model('xarena_app', 'Pemesanan')
+        self.assertEqual(list(Jadwal.objects.values_list('id', 'is_available')), [(keep.id, False)])
+        self.assertEqual(set(Pemesanan.objects.values_list('id', 'jadwal_id')), {(batal.id, keep.id), (aktif.id, keep.id)})
+
+    def test_duplikat_dengan_dua_pemesanan_aktif_menghentikan_migration(self):
+        pertama, kedua = self.jadwal(10), self.jadwal(10)
+        a = self.pesan(pertama, 'pending')
+        b = self.pesan(kedua, 'diterima')
+
+        with self.assertRaisesMessage(RuntimeError, f'pemesanan [{a.id}, {b.id}]'):
+            self.migrate()
+
+        Jadwal = self.apps.get_model('xarena_app', 'Jadwal')
+        self.assertEqual(Jadwal.objects.count(), 2)
+
+        # setelah salah satu dibatalkan migration bisa dilanjutkan
+        b.status = 'dibatalkan'
+        b.save()
+        self.migrate()
+        self.assertEqual(Jadwal.objects.count(), 1)
+
+
+class ArsipTest(DataMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        lalu = self.hari_ini - timedelta(days=100)
+        self.selesai = self.buat_pemesanan(lalu, 10, status='selesai')
+        self.batal = self.buat_pemesanan(lalu, 11, status='dibatalkan')
+        self.pending = self.buat_pemesanan(lalu, 12)
+        self.kosong = self.buat_jadwal(lalu, 13)
+        self.aktif = self.buat_pemesanan(self.hari_ini + timedelta(days=1), 10, status='diterima')
+        self.batas = self.hari_ini - timedelta(days=90)
+
+    def test_arsipkan_memindahkan_data_tertutup(self):
+        statistik = statistik_pemesanan()
+
+        self.assertEqual(arsipkan(self.batas, batch_size=1), (2, 3))
+
+        self.assertEqual(set(Pemesanan.objects.values_list('id', flat=True)), {self.pending.pk, self.aktif.pk})
+        self.assertEqual(set(PemesananArsip.objects.values_list('id', flat=True)), {self.selesai.pk, self.batal.pk})
+        self.assertEqual(
+            set(JadwalArsip.objects.values_list('id', flat=True)),
+            {self.selesai.jadwal_id, self.batal.jadwal_id, self.kosong.pk},
+        )
+        # jadwal pemesanan yang belum tertutup tetap di tabel utama, index harinya ikut disisakan
+        self.assertEqual([slot['id'] for slot in self.slot_hari(self.pending.jadwal)], [self.pending.jadwal_id])
+        self.assertEqual(dict(JumlahArsip.objects.values_list('status', 'jumlah')), {'selesai': 1, 'dibatalkan': 1})
+
+        cache.clear()
+        hasil = statistik_pemesanan()
+        # total tetap sama, hanya jumlah di tabel utama yang berkurang
+        self.assertEqual(hasil.pop('aktif'), 2)
+        self.assertEqual(statistik.pop('aktif'), 4)
+        self.assertEqual(hasil, statistik)
+
+        # dijalankan ulang tidak memindahkan apa pun
+        self.assertEqual(arsipkan(self.batas), (0, 0))
+
+    @TANPA_MANIFEST
+    def test_dashboard_user_tetap_menampilkan_arsip(self):
+        self.client.force_login(self.user)
+        sebelum = self.client.get(reverse('dashboard_user'))
+        arsipkan(self.batas)
+        sesudah = self.client.get(reverse('dashboard_user'))
+
+        self.assertEqual(sesudah.status_code, 200)
+        self.assertEqual(len(sesudah.context['pemesanan']), 4)
+        self.assertEqual(sum(row['arsip'] for row in sesudah.context['pemesanan']), 2)
+        for key in ('total', 'pending_bookings', 'completed_bookings'):
+            self.assertEqual(sesudah.context[key], sebelum.context[key])
+
+    def test_hapus_dipotong_per_query(self):
+        with mock.patch('xarena_app.arsip.HAPUS_PER_QUERY', 2):
+            self.assertEqual(arsipkan(self.batas), (2, 3))
+        self.assertFalse(Pemesanan.objects.filter(pk__in=[self.selesai.pk, self.batal.pk]).exists())
+        self.assertFalse(Jadwal.objects.filter(pk=self.kosong.pk).exists())
+
+    def slot_hari(self, jadwal):
+        return Ketersediaan.objects.get(lapangan=jadwal.lapangan, tanggal=jadwal.tanggal).slots
+
+
+class EksporPemesananTest(DataMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'rahasia123')
+        self.user.username = '=HYPERLINK("http://contoh")'
+        self.user.save()
+        self.lama = self.buat_pemesanan(self.hari_ini - timedelta(days=100), 10, status='selesai')
+        self.baru = self.buat_pemesanan(self.hari_ini + timedelta(days=1), 23)
+        arsipkan(self.hari_ini - timedelta(days=90))
+        self.client.force_login(self.admin)
+
+    def ekspor(self, **params):
+        response = self.client.get(reverse('export_pemesanan'), params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv_berisi_arsip_dan_aktif_tanpa_formula(self):
+        response, isi = self.ekspor(format='csv')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        baris = list(csv.reader(StringIO(isi.decode())))
+
+        self.assertEqual(baris[0][0], 'ID')
+        self.assertEqual([(row[0], row[-1]) for row in baris[1:]], [(str(self.lama.pk), 'ya'), (str(self.baru.pk), 'tidak')])
+        self.assertEqual({row[5] for row in baris[1:]}, {"'=HYPERLINK(\"http://contoh\")"})
+        # slot 23:00 - 00:00 dihitung satu jam
+        self.assertEqual(baris[2][9], '100000.00')
+
+    def test_xlsx_zip_valid(self):
+        response, isi = self.ekspor(format='xlsx')
+        with zipfile.ZipFile(BytesIO(isi)) as xlsx:
+            self.assertIsNone(xlsx.testzip())
+            sheet = xlsx.read('xl/worksheets/sheet1.xml').decode()
+
+        self.assertEqual(sheet.count('<row>'), 3)
+        # inline string tidak pernah dievaluasi sebagai formula, cukup di-escape
+        self.assertIn('<t>=HYPERLINK("http://contoh")</t>', sheet)
+        self.assertIn(f'<c><v>{self.baru.pk}</v></c>', sheet)
+
+    def test_filter_lapangan_tidak_valid(self):
+        response = self.client.get(reverse('export_pemesanan'), {'lapangan': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+
+class RekapInkrementalTest(DataMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.kemarin = self.hari_ini - timedelta(days=1)
+        self.lusa = self.hari_ini - timedelta(days=2)
+        self.pesanan = self.buat_pemesanan(self.kemarin, 10, status='diterima')
+        self.buat_pemesanan(self.lusa, 10, status='selesai')
+        self.buat_jadwal(self.kemarin, 11)
+        # semua perubahan di atas terjadi sebelum rekap terakhir
+        dua_jam_lalu = timezone.now() - timedelta(hours=2)
+        Pemesanan.objects.update(updated_at=dua_jam_lalu)
+        Ketersediaan.objects.update(diubah_at=dua_jam_lalu)
+        self.rekap_lalu = timezone.now() - timedelta(hours=1)
+        rekap_penuh(dihitung_at=self.rekap_lalu)
+
+    def rekap(self, tanggal):
+        return RekapHarian.objects.get(lapangan=self.lapangan, tanggal=tanggal)
+
+    def test_rekap_penuh(self):
+        kemarin = self.rekap(self.kemarin)
+        self.assertEqual(kemarin.jumlah_pemesanan, 1)
+        self.assertEqual(kemarin.jam_terpesan, Decimal('1.00'))
+        self.assertEqual(kemarin.jam_tersedia, Decimal('2.00'))
+        self.assertEqual(kemarin.pendapatan, Decimal('100000.00'))
+        self.assertEqual(kemarin.okupansi, Decimal('50.00'))
+
+    def test_hanya_hari_yang_berubah_dihitung_ulang(self):
+        self.pesanan.status = 'dibatalkan'
+        self.pesanan.save()
+
+        total, penuh = rekap_inkremental()
+
+        self.assertEqual((total, penuh), (1, False))
+        kemarin = self.rekap(self.kemarin)
+        self.assertEqual(kemarin.jumlah_pemesanan, 0)
+        self.assertEqual(kemarin.pendapatan, Decimal('0.00'))
+        self.assertGreater(kemarin.dihitung_at, self.rekap_lalu)
+        self.assertEqual(self.rekap(self.lusa).dihitung_at, self.rekap_lalu)
+
+    def test_tanpa_perubahan_tidak_ada_yang_dihitung(self):
+        self.assertEqual(rekap_inkremental(), (0, False))
+
+    def test_rekap_kosong_dibangun_ulang_penuh(self):
+        RekapHarian.objects.all().delete()
+        total, penuh = rekap_inkremental()
+        self.assertEqual((total, penuh), (2, True))
+
+    def test_pemesanan_dihapus_dihitung_ulang(self):
+        self.pesanan.delete()
+
+        self.assertEqual(rekap_inkremental(), (1, False))
+        kemarin = self.rekap(self.kemarin)
+        self.assertEqual((kemarin.jumlah_pemesanan, kemarin.basi), (0, False))
+        self.assertEqual(self.rekap(self.lusa).dihitung_at, self.rekap_lalu)
+
+    def test_semua_jadwal_hari_itu_dihapus(self):
+        # index ketersediaan harinya ikut hilang, rekap hari itu tetap harus dibuang
+        Jadwal.objects.filter(tanggal=self.kemarin).delete()
+        self.assertFalse(Ketersediaan.objects.filter(tanggal=self.kemarin).exists())
+
+        self.assertEqual(rekap_inkremental(), (0, False))
+        self.assertFalse(RekapHarian.objects.filter(tanggal=self.kemarin).exists())
+        self.assertEqual(self.rekap(self.lusa).dihitung_at, self.rekap_lalu)
+
+
+@TANPA_MANIFEST
+class ManageJadwalTest(DataMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'rahasia123')
+        self.client.force_login(self.admin)
+        self.lama = date(self.hari_ini.year - 5, 3, 1)
+        for i in range(9):
+            self.buat_jadwal(self.lama + timedelta(days=i), 10)
+        self.buat_jadwal(self.hari_ini, 10)
+
+    def get(self, **params):
+        response = self.client.get(reverse('manage_jadwal'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.context
+
+    def test_tujuh_tanggal_per_halaman_dengan_filter_tahun(self):
+        context = self.get(month=3, year=self.lama.year)
+        self.assertEqual([tanggal for tanggal, _ in context['dates']], [self.lama + timedelta(days=i) for i in range(7)])
+        self.assertEqual(context['dates_page'].paginator.num_pages, 2)
+        self.assertEqual(context['query'], f'month=3&year={self.lama.year}')
+
+    def test_pilihan_tahun_mengikuti_jadwal_terlama(self):
+        self.assertEqual(list(self.get()['years']), list(range(self.lama.year, self.hari_ini.year + 1)))
+
+    def test_filter_tidak_valid_kembali_ke_default(self):
+        context = self.get(month=13, year='abc')
+        self.assertIsNone(context['selected_month'])
+        self.assertIsNone(context['selected_year'])
+        self.assertEqual(context['query'], '')
+        self.assertEqual(context['dates_page'].paginator.count, 10)
+        self.assertEqual([str(m) for m in context['messages']], ['Filter bulan / tahun tidak valid'])
+
+
+class TurunanGambarTest(DataMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        pengaturan = override_settings(MEDIA_ROOT=media.name)
+        pengaturan.enable()
+        self.addCleanup(pengaturan.disable)
+        jadwalkan = mock.patch('xarena_app.signals.jadwalkan_turunan')
+        self.jadwalkan = jadwalkan.start()
+        self.addCleanup(jadwalkan.stop)
+
+    def gambar(self, nama):
+        buffer = BytesIO()
+        Image.new('RGB', (40, 30), 'green').save(buffer, 'PNG')
+        return SimpleUploadedFile(nama, buffer.getvalue(), content_type='image/png')
+
+    def file_turunan(self, lapangan):
+        return semua_path_turunan(lapangan.gambar.name, settings.GAMBAR_TURUNAN)
+
+    def test_turunan_lama_dihapus_setelah_gambar_diganti(self):
+        self.lapangan.gambar = self.gambar('satu.png')
+        self.lapangan.save()
+        buat_turunan(self.lapangan.pk)
+        lama = self.file_turunan(self.lapangan)
+        self.assertTrue(all(default_storage.exists(path) for path in lama))
+
+        self.lapangan.gambar = self.gambar('dua.png')
+        self.lapangan.save()
+        self.jadwalkan.assert_called_with(self.lapangan.pk, lama)
+        self.assertEqual(Lapangan.objects.get(pk=self.lapangan.pk).gambar_turunan, {})
+
+        buat_turunan(*self.jadwalkan.call_args.args)
+        self.assertFalse(any(default_storage.exists(path) for path in lama))
+        self.assertTrue(all(default_storage.exists(path) for path in self.file_turunan(self.lapangan)))
+
+        # gambar dikosongkan: turunan dihapus setelah commit
+        baru = self.file_turunan(self.lapangan)
+        self.lapangan.gambar = None
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lapangan.save()
+        self.assertFalse(any(default_storage.exists(path) for path in baru))
+
+    def test_save_dari_instance_lama_tidak_menimpa_hasil_worker(self):
+        self.lapangan.gambar = self.gambar('satu.png')
+        self.lapangan.save()
+        basi = Lapangan.objects.get(pk=self.lapangan.pk)
+        turunan = buat_turunan(self.lapangan.pk)
+
+        basi.nama = 'Lapangan Utama'
+        basi.save()
+
+        lapangan = Lapangan.objects.get(pk=self.lapangan.pk)
+        self.assertEqual((lapangan.nama, lapangan.gambar_turunan), ('Lapangan Utama', turunan))
+
+
+class SiklusPemesananTest(DataMixin, TestCase):
+    def test_kedaluwarsa_membatalkan_pending_lama_dan_melepas_slot(self):
+        besok = self.hari_ini + timedelta(days=1)
+        lama = self.buat_pemesanan(besok, 10)
+        baru = self.buat_pemesanan(besok, 11)
+        diterima = self.buat_pemesanan(besok, 12, status='diterima')
+        Pemesanan.objects.filter(pk__in=[lama.pk, diterima.pk]).update(
+            created_at=timezone.now() - timedelta(hours=2)
+        )
+
+        total, hari = Pemesanan.objects.kedaluwarsa(timezone.now(), timedelta(hours=1))
+
+        self.assertEqual(total, 1)
+        self.assertEqual(hari, {(self.lapangan.id, besok)})
+        self.assertEqual(Pemesanan.objects.get(pk=lama.pk).status, 'dibatalkan')
+        self.assertEqual(Pemesanan.objects.get(pk=baru.pk).status, 'pending')
+        self.assertEqual(Pemesanan.objects.get(pk=diterima.pk).status, 'diterima')
+        self.assertTrue(Jadwal.objects.get(pk=lama.jadwal_id).is_available)
+        self.assertTrue(self.slot_index(lama.jadwal)['is_available'])
+        self.assertFalse(Jadwal.objects.get(pk=diterima.jadwal_id).is_available)
+
+    def test_kedaluwarsa_tidak_melepas_slot_yang_dipegang_pemesanan_lain(self):
+        pending = self.buat_pemesanan(self.hari_ini + timedelta(days=1), 10)
+        Pemesanan.objects.create(user=self.user, jadwal=pending.jadwal, status='diterima')
+        Pemesanan.objects.filter(pk=pending.pk).update(created_at=timezone.now() - timedelta(hours=2))
+
+        Pemesanan.objects.kedaluwarsa(timezone.now(), timedelta(hours=1))
+
+        self.assertEqual(Pemesanan.objects.get(pk=pending.pk).status, 'dibatalkan')
+        self.assertFalse(Jadwal.objects.get(pk=pending.jadwal_id).is_available)
+
+    def test_selesaikan_hanya_slot_yang_sudah_lewat(self):
+        lewat = self.buat_pemesanan(self.hari_ini - timedelta(days=1), 10, status='diterima')
+        nanti = self.buat_pemesanan(self.hari_ini + timedelta(days=1), 10, status='diterima')
+        pending = self.buat_pemesanan(self.hari_ini - timedelta(days=1), 11)
+
+        self.assertEqual(Pemesanan.objects.selesaikan(timezone.now()), 1)
+        self.assertEqual(Pemesanan.objects.get(pk=lewat.pk).status, 'selesai')
+        self.assertEqual(Pemesanan.objects.get(pk=nanti.pk).status, 'diterima')
+        self.assertEqual(Pemesanan.objects.get(pk=pending.pk).status, 'pending')
+        self.assertFalse(Jadwal.objects.get(pk=lewat.jadwal_id).is_available)
+
+    def test_command_hold_nol_membatalkan_semua_pending(self):
+        pending = self.buat_pemesanan(self.hari_ini + timedelta(days=1), 10)
+        Pemesanan.objects.filter(pk=pending.pk).update(created_at=timezone.now() - timedelta(seconds=1))
+
+        call_command('lifecycle_pemesanan', hold=0, stdout=StringIO())
+
+        self.assertEqual(Pemesanan.objects.get(pk=pending.pk).status, 'dibatalkan')
+
+
+class KlaimJadwalTest(DataMixin, TestCase):
+    def test_klaim_hanya_berhasil_sekali(self):
+        jadwal = self.buat_jadwal(self.hari_ini + timedelta(days=1), 10)
+        basi = Jadwal.objects.get(pk=jadwal.pk)
+
+        self.assertTrue(Jadwal.objects.klaim(jadwal))
+        # instance lain yang masih melihat is_available=True tetap kalah
+        self.assertFalse(Jadwal.objects.klaim(basi))
+        jadwal.refresh_from_db()
+        self.assertFalse(jadwal.is_available)
+        self.assertFalse(self.slot_index(jadwal)['is_available'])
+
+    def test_lepas_mengembalikan_slot(self):
+        jadwal = self.buat_jadwal(self.hari_ini + timedelta(days=1), 10, is_available=False)
+
+        self.assertTrue(Jadwal.objects.lepas(jadwal))
+        self.assertFalse(Jadwal.objects.lepas(jadwal))
+        jadwal.refresh_from_db()
+        self.assertTrue(jadwal.is_available)
+        self.assertTrue(self.slot_index(jadwal)['is_available'])
+
+
+class RatingLapanganTest(DataMixin, TestCase):
+    def rating(self, lapangan):
+        lapangan.refresh_from_db()
+        return lapangan.rating_count, lapangan.rating_sum
+
+    def test_ulasan_dibuat_diubah_dipindah_dihapus(self):
+        lapangan_b = Lapangan.objects.create(nama='Lapangan B', deskripsi='Rumput', harga_per_jam=Decimal('90000'))
+
+        ulasan = Ulasan.objects.create(user=self.user, lapangan=self.lapangan, rating=4)
+        self.assertEqual(self.rating(self.lapangan), (1, 4))
+
+        ulasan.rating = 2
+        ulasan.save()
+        self.assertEqual(self.rating(self.lapangan), (1, 2))
+
+        ulasan.lapangan = lapangan_b
+        ulasan.save()
+        self.assertEqual(self.rating(self.lapangan), (0, 0))
+        self.assertEqual(self.rating(lapangan_b), (1, 2))
+
+        ulasan.delete()
+        self.assertEqual(self.rating(lapangan_b), (0, 0))
+
+    def test_save_instance_lama_tidak_menimpa_rating(self):
+        basi = Lapangan.objects.get(pk=self.lapangan.pk)
+        Ulasan.objects.create(user=self.user, lapangan=self.lapangan, rating=5)
+
+        basi.nama = 'Lapangan A2'
+        basi.save()
+
+        self.assertEqual(self.rating(self.lapangan), (1, 5))
+        self.assertEqual(self.lapangan.nama, 'Lapangan A2')
+
+
+class KetersediaanTest(DataMixin, TestCase):
+    def test_mask_slot(self):
+        self.assertEqual(Ketersediaan.mask_slot(time(8), time(9)), 0b11 << 16)
+        # jam selesai dibulatkan ke atas ke batas bucket
+        self.assertEqual(Ketersediaan.mask_slot(time(8), time(8, 40)), 0b11 << 16)
+        # lewat tengah malam berhenti di bucket terakhir
+        self.assertEqual(Ketersediaan.mask_slot(time(23), time(0)), 0b11 << 46)
+
+    def test_index_ikut_jadwal_dan_window_kosong(self):
+        besok = self.hari_ini + timedelta(days=1)
+        self.buat_jadwal(besok, 8)
+        self.buat_jadwal(besok, 9)
+        self.buat_jadwal(besok, 10, is_available=False)
+
+        hari = Ketersediaan.objects.get(lapangan=self.lapangan, tanggal=besok)
+        self.assertEqual(hari.mask_tersedia, 0b1111 << 16)
+        self.assertEqual(hari.mask_terisi, 0b11 << 20)
+        self.assertEqual(
+            hari.window_kosong(120), [{'jam_mulai': time(8), 'jam_selesai': time(10)}]
+        )
+        self.assertEqual(
+            [window['jam_mulai'] for window in hari.window_kosong(60)], [time(8), time(8, 30), time(9)]
+        )
+        self.assertEqual(hari.window_kosong(180), [])
+
+
+class JadwalVirtualTest(DataMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.lapangan.pakai_jam_operasional = True
+        self.lapangan.save()
+        self.besok = self.hari_ini + timedelta(days=1)
+        JamOperasional.objects.create(
+            lapangan=self.lapangan, hari=self.besok.weekday(), jam_buka=time(8), jam_tutup=time(10),
+        )
+
+    def test_slot_virtual_tampil_tanpa_baris_jadwal(self):
+        [hari] = self.lapangan.ketersediaan(self.besok, self.besok)
+
+        self.assertEqual([slot['id'] for slot in hari.slots], [None, None])
+        self.assertEqual(hari.window_kosong(120), [{'jam_mulai': time(8), 'jam_selesai': time(10)}])
+        self.assertFalse(Jadwal.objects.exists())
+
+    def test_klaim_virtual_membuat_jadwal_sekali(self):
+        jadwal = Jadwal.objects.klaim_virtual(self.lapangan, self.besok, time(9))
+        lagi = Jadwal.objects.klaim_virtual(self.lapangan, self.besok, time(9))
+
+        self.assertEqual(jadwal.pk, lagi.pk)
+        self.assertEqual(jadwal.jam_selesai, time(10))
+        self.assertEqual(Jadwal.objects.count(), 1)
+        self.assertIsNone(Jadwal.objects.klaim_virtual(self.lapangan, self.besok, time(11)))
+
+        self.assertTrue(Jadwal.objects.klaim(jadwal))
+        [hari] = self.lapangan.ketersediaan(self.besok, self.besok)
+        self.assertEqual(
+            [(slot['id'], slot['is_available']) for slot in hari.slots], [(None, True), (jadwal.pk, False)]
+        )
+
+    def test_pengecualian_tutup_tidak_punya_slot(self):
+        PengecualianJadwal.objects.create(lapangan=self.lapangan, tanggal=self.besok)
+
+        self.assertEqual(self.lapangan.ketersediaan(self.besok, self.besok), [])
+        self.assertIsNone(Jadwal.objects.klaim_virtual(self.lapangan, self.besok, time(8)))
+
+
+class HargaPemesananTest(DataMixin, TestCase):
+    def test_durasi_lewat_tengah_malam(self):
+        self.assertEqual(durasi_menit(time(8), time(9, 30)), 90)
+        self.assertEqual(durasi_menit(time(23), time(0)), 60)
+        self.assertEqual(durasi_menit(time(23), time(1)), 120)
+
+    def test_harga_disnapshot_saat_dibuat(self):
+        jadwal = Jadwal.objects.create(
+            lapangan=self.lapangan, tanggal=self.hari_ini, jam_mulai=time(23), jam_selesai=time(1), is_available=False,
+        )
+        pemesanan = Pemesanan.objects.create(user=self.user, jadwal=jadwal, status='diterima')
+        self.assertEqual(pemesanan.harga_total, Decimal('200000.00'))
+
+        self.lapangan.harga_per_jam = Decimal('150000')
+        self.lapangan.save()
+        pemesanan.refresh_from_db()
+        pemesanan.save()
+        self.assertEqual(pemesanan.harga_total, Decimal('200000.00'))
+
+        # rekap database memakai durasi yang sama dengan durasi_menit
+        rekap_penuh()
+        rekap = RekapHarian.objects.get(lapangan=self.lapangan, tanggal=self.hari_ini)
+        self.assertEqual(rekap.jam_terpesan, Decimal('2'))
+        self.assertEqual(rekap.pendapatan, Decimal('200000'))
+
+
+class ApiJadwalTest(DataMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.besok = self.hari_ini + timedelta(days=1)
+        self.jadwal = self.buat_jadwal(self.besok, 8)
+        self.jadwal_lain = self.buat_jadwal(self.besok, 9)
+        self.url = reverse('get_jadwal')
+        self.params = {'lapangan': self.lapangan.id, 'tanggal': self.besok.isoformat()}
+
+    def test_etag_tetap_selama_slot_tidak_berubah(self):
+        response = self.client.get(self.url, self.params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+        lagi = self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(lagi.status_code, 304)
+        self.assertEqual(lagi['ETag'], response['ETag'])
+
+    def test_etag_berubah_setelah_slot_diklaim(self):
+        etag = self.client.get(self.url, self.params)['ETag']
+        Jadwal.objects.klaim(self.jadwal)
+
+        response = self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual([slot['jam_mulai'] for slot in response.json()], ['09:00:00'])
+
+    def test_etag_berubah_setelah_jam_operasional_diubah(self):
+        self.lapangan.pakai_jam_operasional = True
+        self.lapangan.save()
+        etag = self.client.get(self.url, self.params)['ETag']
+        JamOperasional.objects.create(
+            lapangan=self.lapangan, hari=self.besok.weekday(), jam_buka=time(10), jam_tutup=time(11),
+        )
+
+        response = self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [slot['id'] for slot in response.json()], [self.jadwal.id, self.jadwal_lain.id, f'{self.besok}T10:00:00']
+        )
@@ -18,6 +18,7 @@ urlpatterns = [
     
     path('pesan/<int:jadwal_id>/', views.PemesananCreateView.as_view(), name='pesan_lapangan'),
     path('konfirmasi-pemesanan/<int:jadwal_id>/', views.PemesananCreateView.as_view(), name='konfirmasi_pemesanan'),
+    path('konfirmasi-pemesanan/<int:lapangan_id>/<str:tanggal>/<str:jam>/', views.PemesananCreateView.as_view(), name='konfirmasi_pemesanan_slot'),
     path('pemesanan/cancel/<int:pemesanan_id>/', views.cancel_pemesanan, name='cancel_pemesanan'),
     path('pemesanan/<int:pemesanan_id>/', views.detail_pemesanan_user, name='detail_pemesanan_user'),
     
@@ -31,6 +32,7 @@ urlpatterns = [
 
     # admin
     path('adm/dashboard/', views.dashboard_admin, name='dashboard_admin'),
+    path('adm/pemesanan/export/', views.export_pemesanan, name='export_pemesanan'),
     path('adm/lapangan/', views.ManageLapanganView.as_view(), name='manage_lapangan'),
     path('adm/lapangan/add/', views.add_lapangan, name='add_lapangan'),
     path('adm/lapangan/<int:pk>/edit/', views.edit_lapangan, name='edit_lapangan'),
@@ -42,4 +44,6 @@ urlpatterns = [
 
     # api
     path('api/jadwal/', views.get_available_jadwal, name='get_jadwal'),
+    path('api/jadwal/window/', views.get_window_kosong, name='get_window_kosong'),
+    path('api/jadwal/stream/', views.stream_jadwal, name='stream_jadwal'),
 ]
\ No newline at end of file
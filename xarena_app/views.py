@@ -1,17 +1,48 @@
-from datetime import datetime, timedelta
+import asyncio
+import json
+import mimetypes
+import os
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from heapq import merge
+from operator import itemgetter
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.exceptions import PermissionDenied
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import PermissionDenied, SuspiciousFileOperation
 from django.urls import reverse_lazy
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date, quote_etag, urlencode
+from django.views.static import was_modified_since
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_time
 from django.views.generic import CreateView , DetailView, ListView
-from django.http import HttpResponseNotAllowed, JsonResponse
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotAllowed, HttpResponseNotModified, JsonResponse,
+    StreamingHttpResponse,
+)
 from django.core.paginator import Paginator
-from .models import CustomUser, Lapangan, Jadwal, Pemesanan, Ulasan
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum, Value
+from .models import CustomUser, Lapangan, Jadwal, Ketersediaan, Pemesanan, PemesananArsip, Ulasan
 from .forms import CustomUserCreationForm, CustomAuthenticationForm
+from .arsip import riwayat_pemesanan
+from .ekspor import baris_pemesanan, stream_async, stream_csv, stream_xlsx
+from .paginasi import halaman_kursor
+from . import live
+from .caching import (
+    cache_halaman_publik, hapus_statistik, statistik_lapangan, statistik_pemesanan, statistik_rekap, statistik_ulasan,
+    statistik_user, versi_katalog,
+)
 
 
 # tampilan register
@@ -76,10 +107,12 @@ def logout_view(request):
     return render(request, 'auth/logout.html')
 
 
+@cache_halaman_publik
 def landing(request):
     return render(request, "public/landing.html",)
 
 
+@cache_halaman_publik
 def about(request):
     return render(request, "public/about.html",)
 
@@ -90,22 +123,31 @@ def dashboard_user(request):
     if request.user.is_staff or request.user.is_superuser:
         raise PermissionDenied
     
-    pemesanan = Pemesanan.objects.filter(
-        user=request.user
-    ).select_related(
-        'jadwal',
-        'jadwal__lapangan'
-    ).order_by('-created_at')
-    
-    # hitung total kecuali pemesanan yang dibatalkan
-    pesanan = pemesanan.exclude(status='dibatalkan')
-    total = sum(pesan.hitung_harga() for pesan in pesanan)
+    # riwayat lengkap: pemesanan aktif + yang sudah diarsipkan, keduanya urut terbaru dulu lalu digabung
+    aktif, arsip = (qs.filter(user=request.user) for qs in riwayat_pemesanan(dengan_user=False))
+    kolom = ('id', 'status', 'harga_total', 'created_at', 'tanggal', 'jam_mulai', 'jam_selesai', 'nama_lapangan')
+    pemesanan = list(merge(
+        aktif.order_by('-created_at').values(*kolom, arsip=Value(False)),
+        arsip.order_by('-created_at').values(*kolom, arsip=Value(True)),
+        key=itemgetter('created_at'),
+        reverse=True,
+    ))
+    
+    # hitung total (kecuali yang dibatalkan) dan jumlah per status, satu query per tabel
+    agregat = {
+        'total': Sum('harga_total', filter=~Q(status='dibatalkan'), default=0),
+        'pending': Count('id', filter=Q(status='pending')),
+        'selesai': Count('id', filter=Q(status='selesai')),
+    }
+    statistik = [
+        model.objects.filter(user=request.user).aggregate(**agregat) for model in (Pemesanan, PemesananArsip)
+    ]
     
     context = {
         'pemesanan': pemesanan,
-        'total': total,
-        'pending_bookings': pemesanan.filter(status='pending').count(),
-        'completed_bookings': pemesanan.filter(status='selesai').count()
+        'total': sum(row['total'] for row in statistik),
+        'pending_bookings': sum(row['pending'] for row in statistik),
+        'completed_bookings': sum(row['selesai'] for row in statistik)
     }
     
     return render(request, 'user/dashboard_user.html', context)
@@ -122,6 +164,7 @@ def detail_pemesanan_user(request, pemesanan_id):
     })
 
 # list lapangan
+@method_decorator(cache_halaman_publik, name='dispatch')
 class LapanganListView(ListView):
     model = Lapangan
     template_name = 'public/list_lapangan.html'
@@ -131,6 +174,13 @@ class LapanganListView(ListView):
         return Lapangan.objects.all()
         # return Lapangan.objects.all().filter(is_available=True)
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # queryset baru dievaluasi saat fragment katalog tidak ada di cache
+        context['versi_katalog'] = getattr(self.request, 'versi_katalog', None) or versi_katalog()
+        context['katalog_ttl'] = settings.KATALOG_CACHE_TTL
+        return context
+
 # detail lapangan
 class DetailLapanganView(LoginRequiredMixin, DetailView):
     model = Lapangan
@@ -140,26 +190,28 @@ class DetailLapanganView(LoginRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        dates = []
-        
-        # Get all unique dates from Jadwal
-        jadwal_dates = Jadwal.objects.filter(
-            lapangan=self.object,
-            # is_available=True
-        ).dates('tanggal', 'day')
-
-        for date in jadwal_dates:
-            jadwal = Jadwal.objects.filter(
-                lapangan=self.object,
-                tanggal=date,
-                # is_available=True
-            )
-            dates.append({
-                'date': date,
-                'slots': jadwal
-            })
-            
-        context['dates'] = dates
+
+        # slot dalam window tanggal_mulai .. +JADWAL_WINDOW_HARI, default mulai hari ini
+        jumlah_hari = settings.JADWAL_WINDOW_HARI
+        today = timezone.localdate()
+        tanggal_mulai = _parse_tanggal(self.request.GET.get('mulai')) or today
+        tanggal_selesai = tanggal_mulai + timedelta(days=jumlah_hari - 1)
+        sebelumnya = tanggal_mulai - timedelta(days=jumlah_hari)
+
+        context.update({
+            'dates': [
+                {
+                    'date': hari.tanggal,
+                    'slots': hari.daftar_slot(),
+                }
+                for hari in self.object.ketersediaan(tanggal_mulai, tanggal_selesai)
+            ],
+            'tanggal_mulai': tanggal_mulai,
+            'tanggal_selesai': tanggal_selesai,
+            'window_sebelumnya': max(sebelumnya, today) if tanggal_mulai > today else None,
+            'window_berikutnya': tanggal_selesai + timedelta(days=1),
+            'ulasan_list': self.object.ulasan_set.select_related('user').order_by('-created_at'),
+        })
         return context
 
 # pesan lapangan
@@ -169,9 +221,27 @@ class PemesananCreateView(LoginRequiredMixin, CreateView):
     fields = ['metode_pembayaran']
     success_url = reverse_lazy('dashboard_user')
 
+    def get_jadwal(self, klaim=False):
+        if 'jadwal_id' in self.kwargs:
+            return get_object_or_404(Jadwal, id=self.kwargs['jadwal_id'])
+
+        # slot virtual: lapangan + tanggal + jam mulai
+        lapangan = get_object_or_404(Lapangan, id=self.kwargs['lapangan_id'])
+        tanggal = _parse_tanggal(self.kwargs['tanggal'])
+        jam_mulai = parse_time(self.kwargs['jam'])
+        jadwal = None
+        if tanggal and jam_mulai:
+            if klaim:
+                jadwal = Jadwal.objects.klaim_virtual(lapangan, tanggal, jam_mulai)
+            else:
+                jadwal = Jadwal.objects.dari_template(lapangan, tanggal, jam_mulai)
+        if jadwal is None:
+            raise Http404('Jadwal tidak ditemukan')
+        return jadwal
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        jadwal = get_object_or_404(Jadwal, id=self.kwargs['jadwal_id'])
+        jadwal = self.get_jadwal()
 
         # buat temp pemesanan untuk hitung harga
         temp_pemesanan = Pemesanan(jadwal=jadwal)
@@ -185,18 +255,22 @@ class PemesananCreateView(LoginRequiredMixin, CreateView):
         return context
     
     def form_valid(self, form):
-        jadwal = get_object_or_404(Jadwal, id=self.kwargs['jadwal_id'])
-        if not jadwal.is_available:
-            messages.error(self.request, 'Jadwal tidak tersedia.')
-            return self.form_invalid(form)
-
-        form.instance.user = self.request.user
-        form.instance.jadwal = jadwal
-        jadwal.is_available = False
-        jadwal.save()
-        
+        jadwal = self.get_jadwal(klaim=True)
+
+        # klaim slot dan simpan pemesanan dalam satu transaksi
+        with transaction.atomic():
+            if not Jadwal.objects.klaim(jadwal):
+                messages.error(self.request, 'Jadwal tidak tersedia, sudah dipesan pengguna lain.')
+                response = self.form_invalid(form)
+                response.status_code = 409
+                return response
+
+            form.instance.user = self.request.user
+            form.instance.jadwal = jadwal
+            response = super().form_valid(form)
+
         messages.success(self.request, 'Pemesanan berhasil dibuat.')
-        return super().form_valid(form)
+        return response
 
 # cancel pesanan
 @login_required
@@ -209,14 +283,20 @@ def cancel_pemesanan(request, pemesanan_id):
         return redirect('dashboard_user')
         
     if request.method == 'POST':
-        # Update pemesanan status
-        pemesanan.status = 'dibatalkan'
-        pemesanan.save()
-        
-        # Make jadwal available again
-        jadwal = pemesanan.jadwal
-        jadwal.is_available = True 
-        jadwal.save()
+        with transaction.atomic():
+            # Update pemesanan status, hanya jika masih pending saat ditulis
+            dibatalkan = Pemesanan.objects.filter(
+                pk=pemesanan.pk, status='pending'
+            ).update(status='dibatalkan', updated_at=timezone.now())
+            if not dibatalkan:
+                messages.error(request, 'Hanya pemesanan dengan status pending yang dapat dibatalkan.')
+                return redirect('dashboard_user')
+
+            # Make jadwal available again
+            Jadwal.objects.lepas(pemesanan.jadwal)
+
+        # update() tidak memicu signal, statistik dihapus manual
+        hapus_statistik('pemesanan')
         
         messages.success(request, 'Pemesanan berhasil dibatalkan.')
         return redirect('dashboard_user')
@@ -246,12 +326,14 @@ def add_ulasan(request, lapangan_id):
             messages.error(request, str(e))
             return redirect('detail_lapangan', lapangan_id=lapangan_id)
         
-        ulasan = Ulasan.objects.create(
-            user=request.user,
-            lapangan=lapangan,
-            rating=rating,
-            komentar=komentar
-        )
+        # rating agregat di lapangan diupdate lewat signal dalam transaksi yang sama
+        with transaction.atomic():
+            Ulasan.objects.create(
+                user=request.user,
+                lapangan=lapangan,
+                rating=rating,
+                komentar=komentar
+            )
 
         messages.success(request, 'Terima kasih atas ulasan Anda.')
         return redirect('detail_lapangan', lapangan_id=lapangan_id)
@@ -261,39 +343,39 @@ def add_ulasan(request, lapangan_id):
 # -----STAFF-----
 @staff_member_required
 def dashboard_staff(request):
-    # pemesanan
-    pemesanan_list = Pemesanan.objects.all().order_by('-created_at')
-    pemesanan_paginator = Paginator(pemesanan_list, 10)
-    pemesanan_page = request.GET.get('pemesanan_page')
-    pemesanan = pemesanan_paginator.get_page(pemesanan_page)
+    statistik = statistik_pemesanan()
+
+    # pemesanan & ulasan: keyset pagination (tanpa OFFSET / COUNT), total dari cache statistik
+    pemesanan = halaman_kursor(
+        Pemesanan.objects.select_related('user', 'jadwal__lapangan'),
+        request.GET.get('pemesanan_page'),
+        total=statistik['aktif'],
+    )
 
     # lapangan
-    lapangan_list = Lapangan.objects.all()
-    for field in lapangan_list:
-        field.average_rating = field.avg_rating()
+    lapangan_list = Lapangan.objects.all().order_by('id')
     lapangan_paginator = Paginator(lapangan_list, 10)
     lapangan_page = request.GET.get('lapangan_page')
     lapangan = lapangan_paginator.get_page(lapangan_page)
     
     # ulasan
-    ulasan_list = Ulasan.objects.all().order_by('-created_at')
-    ulasan_paginator = Paginator(ulasan_list, 10)
-    ulasan_page = request.GET.get('ulasan_page')
-    ulasan = ulasan_paginator.get_page(ulasan_page)
+    ulasan = halaman_kursor(
+        Ulasan.objects.select_related('user', 'lapangan'),
+        request.GET.get('ulasan_page'),
+        total=statistik_ulasan()['total'],
+    )
 
-    # user
-    users = CustomUser.objects.filter(is_staff=False, is_superuser=False).order_by('username')
-    
     context = {
         'pemesanan': pemesanan,
-        'users': users,
         'lapangan': lapangan,
         'ulasan': ulasan,
-        'total_lapangan': lapangan_list.count(),
-        'total_pemesanan': pemesanan_list.count(),
-        'pending_pemesanan': pemesanan_list.filter(status='pending').count(),
-        'diterima_pemesanan': pemesanan_list.filter(status='diterima').count(),
-        'completed_pemesanan': pemesanan_list.filter(status='selesai').count(),
+        'total_lapangan': statistik_lapangan()['total'],
+        'total_pemesanan': statistik['total'],
+        'pending_pemesanan': statistik['pending'],
+        'diterima_pemesanan': statistik['diterima'],
+        'completed_pemesanan': statistik['selesai'],
+        # modal tambah pemesanan mengikuti stream SSE hanya jika diaktifkan
+        'stream_jadwal': settings.JADWAL_STREAM_SSE,
     }
     
     return render(request, 'staff/dashboard_staff.html', context)
@@ -328,22 +410,127 @@ def update_pemesanan(request, pk):
         
     return HttpResponseNotAllowed(['POST'])
 
-# ambil jadwal tersedia
+async def _ambil_lapangan_slot(lapangan_id):
+    if not lapangan_id or not str(lapangan_id).isdigit():
+        return None
+    return await Lapangan.objects.filter(id=lapangan_id).only('id', 'pakai_jam_operasional').afirst()
+
+def _parse_tanggal(value):
+    try:
+        return parse_date(value or '')
+    except ValueError:
+        return None
+
+# ambil jadwal tersedia (async, memakai async ORM)
+# etag dari versi ketersediaan di database, body json dicache per etag
 @login_required
-def get_available_jadwal(request):
+async def get_available_jadwal(request):
     lapangan_id = request.GET.get('lapangan')
-    tanggal = request.GET.get('tanggal')
-    
-    if not lapangan_id or not tanggal:
+    tanggal = _parse_tanggal(request.GET.get('tanggal'))
+    etag = None
+    if lapangan_id and lapangan_id.isdigit() and tanggal is not None:
+        etag = quote_etag(f"jadwal-{lapangan_id}-{tanggal}-{await Ketersediaan.aversi(lapangan_id, tanggal)}")
+        tidak_berubah = get_conditional_response(request, etag=etag)
+        if tidak_berubah is not None:
+            tidak_berubah['ETag'] = etag
+            patch_cache_control(tidak_berubah, private=True, no_cache=True)
+            return tidak_berubah
+
+    body = await cache.aget(f'ketersediaan:json:{etag}') if etag else None
+
+    if body is None:
+        lapangan = await _ambil_lapangan_slot(lapangan_id)
+        jadwal = []
+        if lapangan is not None and tanggal is not None:
+            # slot virtual belum punya id, dikirim sebagai "<tanggal>T<jam_mulai>"
+            jadwal = [
+                {
+                    'id': slot['id'] or f"{tanggal.isoformat()}T{slot['jam_mulai']}",
+                    'jam_mulai': slot['jam_mulai'],
+                    'jam_selesai': slot['jam_selesai'],
+                }
+                for hari in await lapangan.aketersediaan(tanggal, tanggal)
+                for slot in hari.slots
+                if slot['is_available']
+            ]
+        body = JsonResponse(jadwal, safe=False).content
+        if etag:
+            await cache.aset(f'ketersediaan:json:{etag}', body, settings.JADWAL_API_CACHE_TTL)
+
+    response = HttpResponse(body, content_type='application/json')
+    if etag:
+        response['ETag'] = etag
+    # browser selalu revalidasi dengan If-None-Match
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+# cari window kosong dengan durasi tertentu dalam rentang tanggal
+@login_required
+async def get_window_kosong(request):
+    lapangan_id = request.GET.get('lapangan')
+    tanggal = _parse_tanggal(request.GET.get('tanggal')) or timezone.localdate()
+
+    try:
+        durasi = int(request.GET.get('durasi', 60))
+        hari = int(request.GET.get('hari', 7))
+        if durasi < 30 or not 1 <= hari <= 31:
+            raise ValueError
+    except ValueError:
+        return JsonResponse({'error': 'Durasi atau jumlah hari tidak valid'}, status=400)
+
+    lapangan = await _ambil_lapangan_slot(lapangan_id)
+    if lapangan is None:
         return JsonResponse([], safe=False)
-    
-    jadwal = Jadwal.objects.filter(
-        lapangan_id=lapangan_id,
-        tanggal=tanggal,
-        is_available=True
-    ).values('id', 'jam_mulai', 'jam_selesai')
-    
-    return JsonResponse(list(jadwal), safe=False)
+
+    data = []
+    for item in await lapangan.aketersediaan(tanggal, tanggal + timedelta(days=hari - 1)):
+        windows = item.window_kosong(durasi)
+        if windows:
+            data.append({'tanggal': item.tanggal, 'windows': windows})
+
+    return JsonResponse(data, safe=False)
+
+async def _event_ketersediaan(lapangan_id, tanggal):
+    antrean = live.subscribe(lapangan_id, tanggal)
+    versi = await Ketersediaan.aversi(lapangan_id, tanggal)
+    try:
+        yield f'retry: {settings.JADWAL_STREAM_RETRY}\n\n'
+        while True:
+            try:
+                nama, data = await asyncio.wait_for(antrean.get(), settings.JADWAL_STREAM_HEARTBEAT)
+            except asyncio.TimeoutError:
+                # perubahan dari proses lain tidak lewat broker, cukup dideteksi dari versi di database
+                baru = await Ketersediaan.aversi(lapangan_id, tanggal)
+                if baru != versi:
+                    versi = baru
+                    yield 'event: refresh\ndata: {}\n\n'
+                else:
+                    yield ': ping\n\n'
+                continue
+            versi = await Ketersediaan.aversi(lapangan_id, tanggal)
+            yield f'event: {nama}\ndata: {json.dumps(data)}\n\n'
+    finally:
+        live.unsubscribe(lapangan_id, tanggal, antrean)
+
+# stream SSE slot-taken / slot-freed untuk satu lapangan & tanggal
+# satu koneksi hanya menunggu di event loop, jadi hanya aktif jika JADWAL_STREAM_SSE (server ASGI)
+@login_required
+async def stream_jadwal(request):
+    # di WSGI stream tidak pernah terkirim dan menahan thread, jadi ikut dimatikan walau setting aktif
+    if not settings.JADWAL_STREAM_SSE or not isinstance(request, ASGIRequest):
+        raise Http404
+    lapangan_id = request.GET.get('lapangan')
+    tanggal = _parse_tanggal(request.GET.get('tanggal'))
+    if not lapangan_id or not lapangan_id.isdigit() or tanggal is None:
+        return JsonResponse({'error': 'Lapangan atau tanggal tidak valid'}, status=400)
+    if not await Lapangan.objects.filter(id=lapangan_id).aexists():
+        raise Http404
+
+    response = StreamingHttpResponse(_event_ketersediaan(int(lapangan_id), tanggal), content_type='text/event-stream')
+    patch_cache_control(response, no_cache=True)
+    # nginx tidak boleh menahan event di buffer
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 # add pemesanan
 @login_required
@@ -352,27 +539,39 @@ def add_pemesanan(request):
         raise PermissionDenied
     
     if request.method == 'POST':
-        user_id = request.POST.get('user')
+        username = (request.POST.get('username') or '').strip()
         jadwal_id = request.POST.get('jadwal')
         metode_pembayaran = request.POST.get('metode_pembayaran')
         
-        user = get_object_or_404(CustomUser, id=user_id, is_staff=False, is_superuser=False)
-        jadwal = get_object_or_404(Jadwal, id=jadwal_id)
-        
-        if not jadwal.is_available:
-            messages.error(request, 'Jadwal tidak tersedia.')
+        user = CustomUser.objects.filter(username=username, is_staff=False, is_superuser=False).first()
+        if user is None:
+            messages.error(request, f'Pelanggan dengan username "{username}" tidak ditemukan.')
             return redirect('dashboard_staff')
+        if jadwal_id and not jadwal_id.isdigit():
+            # slot virtual dari api jadwal: "<tanggal>T<jam_mulai>"
+            lapangan = get_object_or_404(Lapangan, id=request.POST.get('lapangan'))
+            try:
+                waktu = datetime.fromisoformat(jadwal_id)
+            except ValueError:
+                raise Http404('Jadwal tidak ditemukan')
+            jadwal = Jadwal.objects.klaim_virtual(lapangan, waktu.date(), waktu.time())
+            if jadwal is None:
+                raise Http404('Jadwal tidak ditemukan')
+        else:
+            jadwal = get_object_or_404(Jadwal, id=jadwal_id)
         
-        pemesanan = Pemesanan.objects.create(
-            user=user,
-            jadwal=jadwal,
-            metode_pembayaran=metode_pembayaran,
-            status='diterima',
-            staff=request.user
-        )
-        
-        jadwal.is_available = False
-        jadwal.save()
+        with transaction.atomic():
+            if not Jadwal.objects.klaim(jadwal):
+                messages.error(request, 'Jadwal tidak tersedia, sudah dipesan pengguna lain.')
+                return redirect('dashboard_staff')
+
+            Pemesanan.objects.create(
+                user=user,
+                jadwal=jadwal,
+                metode_pembayaran=metode_pembayaran,
+                status='diterima',
+                staff=request.user
+            )
         
         messages.success(request, f'Pemesanan oleh {user.username} berhasil dibuat.')
         return redirect('dashboard_staff')
@@ -386,7 +585,8 @@ def delete_ulasan(request, pk):
         raise PermissionDenied
     
     ulasan = get_object_or_404(Ulasan, pk=pk)
-    ulasan.delete()
+    with transaction.atomic():
+        ulasan.delete()
     messages.success(request, 'Ulasan berhasil dihapus.')
     return redirect('dashboard_staff')
     
@@ -397,27 +597,71 @@ def dashboard_admin(request):
     if not request.user.is_superuser:
         raise PermissionDenied
 
-    pemesanan_list = Pemesanan.objects.all().order_by('-created_at')
-    paginator = Paginator(pemesanan_list, 10)
-    
-    page = request.GET.get('page')
-    pemesanan = paginator.get_page(page)
+    statistik = statistik_pemesanan()
+    pemesanan = halaman_kursor(
+        Pemesanan.objects.select_related('user'), request.GET.get('page'), total=statistik['aktif'],
+    )
+    statistik_akun = statistik_user()
 
     context = {
         'pemesanan': pemesanan,
-        'total_users': CustomUser.objects.filter(is_staff=False, is_superuser=False).count(),
-        'total_staff': CustomUser.objects.filter(is_staff=True).count(),
-        'total_pemesanan': pemesanan_list.count(),
-        'pending_pemesanan': pemesanan_list.filter(status='pending').count(),
+        'total_users': statistik_akun['users'],
+        'total_staff': statistik_akun['staff'],
+        'total_pemesanan': statistik['total'],
+        'pending_pemesanan': statistik['pending'],
+        # grafik pendapatan & okupansi (python manage.py rekap_harian)
+        'grafik': statistik_rekap(),
+        # pilihan filter export
+        'lapangan': Lapangan.objects.only('id', 'nama').order_by('nama'),
     }
     
     return render(request, 'admin/dashboard_admin.html', context)
 
+# export riwayat pemesanan (aktif + arsip), di-stream per chunk supaya memori tetap konstan
+FORMAT_EKSPOR = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'xlsx': (stream_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+@login_required
+def export_pemesanan(request):
+    if not request.user.is_superuser:
+        raise PermissionDenied
+
+    format_ekspor = request.GET.get('format', 'csv')
+    if format_ekspor not in FORMAT_EKSPOR:
+        return HttpResponse('Format tidak valid', status=400)
+    lapangan_id = request.GET.get('lapangan')
+    if lapangan_id and not lapangan_id.isdigit():
+        return HttpResponse('Lapangan tidak valid', status=400)
+
+    mulai = _parse_tanggal(request.GET.get('mulai'))
+    selesai = _parse_tanggal(request.GET.get('selesai'))
+    rows = baris_pemesanan(
+        mulai=mulai,
+        selesai=selesai,
+        lapangan_id=lapangan_id,
+        status=request.GET.get('status') or None,
+    )
+
+    stream, content_type = FORMAT_EKSPOR[format_ekspor]
+    konten = stream(rows)
+    if isinstance(request, ASGIRequest):
+        # lihat stream_async
+        konten = stream_async(konten)
+    response = StreamingHttpResponse(konten, content_type=content_type)
+    nama = f"pemesanan_{mulai or 'awal'}_{selesai or timezone.localdate()}.{format_ekspor}"
+    response['Content-Disposition'] = f'attachment; filename="{nama}"'
+    return response
+
 # manage lapangan
 class ManageLapanganView(LoginRequiredMixin, ListView):
     model = Lapangan
     template_name = 'admin/manage_lapangan.html'
     context_object_name = 'lapangan'
+    # template sudah memakai page_obj, tanpa paginate_by semua lapangan dirender di satu halaman
+    paginate_by = 10
+    ordering = 'id'
 
     def dispatch(self, request, *args, **kwargs):
         if not request.user.is_superuser:
@@ -488,29 +732,40 @@ def manage_jadwal(request):
     # filter
     lapangan_id = request.GET.get('lapangan')
     month = request.GET.get('month')
+    year = request.GET.get('year')
+    today = timezone.localdate()
 
     jadwal_list = Jadwal.objects.all()
     
     if lapangan_id:
         jadwal_list = jadwal_list.filter(lapangan_id=lapangan_id)
         
-    if month:
-        jadwal_list = jadwal_list.filter(tanggal__month=month)
+    # bulan selalu dipasangkan dengan tahun (default tahun ini), difilter sebagai rentang tanggal
+    try:
+        if month:
+            year = year or str(today.year)
+            awal = date(int(year), int(month), 1)
+            akhir = date(awal.year + awal.month // 12, awal.month % 12 + 1, 1) - timedelta(days=1)
+            jadwal_list = jadwal_list.filter(tanggal__range=(awal, akhir))
+        elif year:
+            jadwal_list = jadwal_list.filter(tanggal__range=(date(int(year), 1, 1), date(int(year), 12, 31)))
+    except ValueError:
+        messages.error(request, 'Filter bulan / tahun tidak valid')
+        # kembali ke default tanpa filter, nilai yang tidak valid tidak ikut ke form & link pagination
+        month = year = None
         
-    # group jadwal by date
-    dates = {}
-    for jadwal in jadwal_list.order_by('tanggal', 'jam_mulai'):
-        if jadwal.tanggal not in dates:
-            dates[jadwal.tanggal] = []
-        dates[jadwal.tanggal].append(jadwal)
-        
-    # sort by date
-    sorted_dates = sorted(dates.items())
-    
-    # pagination
-    paginator = Paginator(sorted_dates, 7)
+    # pagination per 7 tanggal, tanggal dipilih di database
+    tanggal_list = jadwal_list.order_by('tanggal').values_list('tanggal', flat=True).distinct()
+    paginator = Paginator(tanggal_list, 7)
     page = request.GET.get('page')
     dates_page = paginator.get_page(page)
+
+    # ambil slot hanya untuk tanggal di halaman ini
+    dates = {tanggal: [] for tanggal in dates_page}
+    for jadwal in jadwal_list.filter(tanggal__in=list(dates)).order_by('tanggal', 'jam_mulai').values(
+        'id', 'tanggal', 'jam_mulai', 'jam_selesai', 'is_available', 'lapangan__nama'
+    ):
+        dates[jadwal['tanggal']].append(jadwal)
     
     month_choices = [
         (1, 'Januari'),
@@ -527,12 +782,29 @@ def manage_jadwal(request):
         (12, 'Desember')
     ]
     
+    # pilihan tahun mengikuti rentang jadwal yang ada, dibaca dari index ketersediaan
+    # (satu baris per lapangan per tanggal, jauh lebih kecil dari tabel jadwal)
+    rentang = Ketersediaan.objects.aggregate(awal=Min('tanggal'), akhir=Max('tanggal'))
+    tahun_awal = min(rentang['awal'].year, today.year) if rentang['awal'] else today.year
+    tahun_akhir = max(rentang['akhir'].year, today.year) if rentang['akhir'] else today.year
+
+    # filter aktif ikut dibawa di link pagination
+    query = urlencode({
+        key: value
+        for key, value in (('lapangan', lapangan_id), ('month', month), ('year', year))
+        if value
+    })
+
     context = {
-        'dates': dates_page,
+        'dates': list(dates.items()),
+        'dates_page': dates_page,
+        'query': query,
         'lapangan': Lapangan.objects.all(),
         'selected_lapangan': lapangan_id,
         'selected_month': month,
+        'selected_year': year,
         'months': month_choices,
+        'years': range(tahun_awal, tahun_akhir + 1),
     }
     return render(request, 'admin/manage_jadwal.html', context)
 
@@ -567,25 +839,12 @@ def generate_jadwal(request):
             end_date = datetime.strptime(tanggal_selesai, '%Y-%m-%d').date()
             start_time = datetime.strptime(jam_mulai, '%H:%M').time()
             end_time = datetime.strptime(jam_selesai, '%H:%M').time()
-            
-            current_date = start_date
-            while current_date <= end_date:
-                current_time = datetime.combine(current_date, start_time) 
-                end_datetime = datetime.combine(current_date, end_time)
-                
-                while current_time < end_datetime:
-                    next_time = current_time + timedelta(minutes=durasi) # Now using integer
-                    if next_time.time() <= end_time:
-                        Jadwal.objects.create(
-                            lapangan=lapangan,
-                            tanggal=current_date,
-                            jam_mulai=current_time.time(),
-                            jam_selesai=next_time.time()
-                        )
-                    current_time = next_time
-                current_date += timedelta(days=1)
-                
-            messages.success(request, 'Jadwal berhasil dibuat')
+
+            created, skipped = Jadwal.objects.generate(
+                lapangan, start_date, end_date, start_time, end_time, durasi
+            )
+
+            messages.success(request, f'Jadwal berhasil dibuat: {created} slot baru, {skipped} slot sudah ada')
             
         except ValueError as e:
             messages.error(request, f'Error format input: {str(e)}')
@@ -624,4 +883,44 @@ def edit_jadwal(request, pk):
             
         return redirect('manage_jadwal')
         
-    return HttpResponseNotAllowed(['POST'])
\ No newline at end of file
+    return HttpResponseNotAllowed(['POST'])
+
+
+# -----STATIC-----
+# file hasil collectstatic, varian .br / .gz dipilih dari Accept-Encoding
+def serve_static(request, path):
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    stat = os.stat(full_path)
+    if not was_modified_since(request.headers.get('If-Modified-Since'), stat.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        file_path, encoding = full_path, None
+        accept_encoding = request.headers.get('Accept-Encoding', '')
+        for nama, ekstensi in (('br', '.br'), ('gzip', '.gz')):
+            if nama in accept_encoding and os.path.isfile(full_path + ekstensi):
+                file_path, encoding = full_path + ekstensi, nama
+                break
+
+        content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        response = FileResponse(open(file_path, 'rb'), content_type=content_type)
+        response.headers['Last-Modified'] = http_date(stat.st_mtime)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+
+    patch_vary_headers(response, ['Accept-Encoding'])
+    # nama yang di-hash berubah setiap isinya berubah, jadi aman dicache selamanya
+    if path in _static_hashed():
+        patch_cache_control(response, public=True, max_age=settings.STATIC_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=60)
+    return response
+
+@lru_cache(maxsize=1)
+def _static_hashed():
+    return frozenset(getattr(staticfiles_storage, 'hashed_files', {}).values())
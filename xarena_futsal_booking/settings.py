@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,6 +47,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # tidak aktif kecuali SQL_INSTRUMENTASI, lihat bagian instrumentasi di bawah
+    'xarena_app.middleware.InstrumentasiSQLMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -79,13 +82,136 @@ WSGI_APPLICATION = 'xarena_futsal_booking.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
+# profil database dipilih lewat environment XARENA_DB:
+# - sqlite (default): WAL, synchronous=NORMAL, busy timeout, transaksi IMMEDIATE, koneksi persisten
+# - sqlite-basic: journal bawaan sqlite tanpa tuning, hanya sebagai pembanding benchmark_db
+# - postgres: PostgreSQL dengan connection pool psycopg 3 (pip install "psycopg[pool]")
+DB_PROFIL = os.environ.get('XARENA_DB', 'sqlite')
+
+if DB_PROFIL == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('XARENA_DB_NAME', 'xarena'),
+            'USER': os.environ.get('XARENA_DB_USER', 'xarena'),
+            'PASSWORD': os.environ.get('XARENA_DB_PASSWORD', ''),
+            'HOST': os.environ.get('XARENA_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('XARENA_DB_PORT', '5432'),
+            # koneksi diambil dari pool, CONN_MAX_AGE harus 0
+            'CONN_MAX_AGE': 0,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('XARENA_DB_POOL_MIN', 2)),
+                    'max_size': int(os.environ.get('XARENA_DB_POOL_MAX', 10)),
+                    'timeout': 10,
+                },
+            },
+        }
+    }
+elif DB_PROFIL == 'sqlite-basic':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('XARENA_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            # mode journal WAL tersimpan di file database, dikembalikan ke bawaan
+            'OPTIONS': {'init_command': 'PRAGMA journal_mode=DELETE'},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('XARENA_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('XARENA_DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # WAL: pembaca tidak memblokir penulis, NORMAL cukup aman dengan WAL
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL',
+                # busy timeout (detik), request yang menunggu lock tidak langsung "database is locked"
+                'timeout': 20,
+                # lock tulis diambil di awal transaksi, menghindari deadlock saat upgrade lock
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# LocMemCache hanya untuk satu proses, dengan lebih dari satu worker pakai cache bersama (XARENA_REDIS_URL)
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['XARENA_REDIS_URL'],
+    } if os.environ.get('XARENA_REDIS_URL') else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'xarena',
     }
 }
 
+# TTL (detik) statistik dashboard staff / admin
+DASHBOARD_STATS_TTL = 5
+
+# TTL (detik) body api jadwal per versi ketersediaan
+JADWAL_API_CACHE_TTL = 60 * 60
+
+# TTL (detik) halaman & fragment katalog publik, key-nya sudah memakai versi katalog
+KATALOG_CACHE_TTL = 60 * 60 * 24
+
+# turunan gambar lapangan (lebar maksimal px), dibuat di thread worker setelah upload
+GAMBAR_TURUNAN = {'thumb': 160, 'card': 480, 'hero': 1280}
+GAMBAR_WORKER = 2
+
+# stream SSE ketersediaan, default mati: modal booking cukup fetch ulang saat lapangan / tanggal berubah
+# nyalakan (XARENA_SSE=1) hanya di server ASGI, mis. uvicorn xarena_futsal_booking.asgi:application
+# di WSGI (runserver, gunicorn sync) setiap stream menahan satu thread worker selamanya
+# broker event (xarena_app/live.py) hanya ada di dalam satu proses: dengan lebih dari satu proses,
+# perubahan dari proses lain (worker lain, lifecycle_pemesanan, shell) baru terkirim saat heartbeat
+# lewat cek versi di database, bukan seketika; untuk event seketika lintas proses perlu broker bersama
+JADWAL_STREAM_SSE = os.environ.get('XARENA_SSE') == '1'
+# interval heartbeat (detik) sekaligus cek versi untuk perubahan dari proses lain
+JADWAL_STREAM_HEARTBEAT = 15
+# jeda reconnect EventSource (milidetik)
+JADWAL_STREAM_RETRY = 3000
+
+
+# lifecycle pemesanan (python manage.py lifecycle_pemesanan --loop)
+# pemesanan pending yang belum dibayar selama ini (menit) dibatalkan dan slotnya dilepas
+PEMESANAN_HOLD_MENIT = 60
+# jeda antar putaran worker (detik)
+LIFECYCLE_INTERVAL = 60
+
+# arsip (python manage.py arsipkan): jadwal & pemesanan tertutup lebih lama dari ini (hari)
+# dipindah ke tabel arsip, alur booking hanya membaca tabel utama
+ARSIP_RETENSI_HARI = 90
+
+# instrumentasi SQL per request (log request lambat / dugaan n+1, header Server-Timing untuk staff atau DEBUG)
+# opt-in lewat environment XARENA_INSTRUMENTASI=1
+SQL_INSTRUMENTASI = os.environ.get('XARENA_INSTRUMENTASI') == '1'
+# request selama ini (milidetik) atau lebih masuk log xarena.performa
+SQL_LAMBAT_MS = int(os.environ.get('XARENA_LAMBAT_MS', 200))
+# bentuk query yang sama sebanyak ini dalam satu request dianggap n+1
+SQL_N_PLUS_1_BATAS = 5
+# jumlah query terlambat yang dilaporkan per request
+SQL_TERLAMBAT_JUMLAH = 3
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # satu baris JSON per request lambat, XARENA_LOG_PERFORMA=DEBUG untuk semua request
+        'xarena.performa': {
+            'handlers': ['console'],
+            'level': os.environ.get('XARENA_LOG_PERFORMA', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -123,6 +249,20 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [STATIC_DIR]
+# hasil build: python manage.py collectstatic (nama file di-hash + varian .gz/.br)
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'xarena_app.storage.KompresiManifestStaticFilesStorage',
+    },
+}
+
+# cache-control file static yang namanya sudah di-hash (1 tahun, immutable)
+STATIC_MAX_AGE = 60 * 60 * 24 * 365
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -135,5 +275,38 @@ AUTH_USER_MODEL = 'xarena_app.CustomUser'
 # login url
 LOGIN_URL = 'login'
 
+# backend login (ModelBackend tetap ada untuk session lama)
+# CachedModelBackend mengambil user dari cache hanya jika XARENA_AUTH_CACHE=1 dan cache-nya bersama
+# (XARENA_REDIS_URL), selain itu selalu query database seperti ModelBackend
+AUTHENTICATION_BACKENDS = [
+    'xarena_app.auth.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+AUTH_USER_CACHE = os.environ.get('XARENA_AUTH_CACHE') == '1'
+# user yang dinonaktifkan / diganti password lewat QuerySet.update (tanpa signal) paling lama selama ini
+AUTH_USER_CACHE_TTL = 60
+
+# session engine dipilih lewat environment XARENA_SESSION:
+# - cached_db (default jika XARENA_REDIS_URL): dibaca dari cache, ditulis ke cache & database
+# - cache: hanya cache
+# - db (default tanpa XARENA_REDIS_URL): hanya database
+# - signed_cookies: seluruh isi session di cookie yang ditandatangani
+# cache & cached_db dengan LocMemCache hanya untuk satu proses: session yang di-logout di satu worker
+# tetap berlaku di worker lain sampai SESSION_COOKIE_AGE habis (ditolak check xarena.E001)
+SESSION_ENGINE = {
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'db': 'django.contrib.sessions.backends.db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[os.environ.get('XARENA_SESSION', 'cached_db' if os.environ.get('XARENA_REDIS_URL') else 'db')]
+
+# jumlah proses web yang berjalan (dibaca juga oleh gunicorn sebagai jumlah worker),
+# dipakai check xarena.E001 untuk menolak cache per proses saat lebih dari satu proses
+JUMLAH_PROSES = int(os.environ.get('WEB_CONCURRENCY', 1))
+
 # messages storage
-MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
\ No newline at end of file
+# cookie, supaya messages.success tidak menulis ulang session
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# jumlah hari jadwal yang ditampilkan per halaman detail lapangan
+JADWAL_WINDOW_HARI = 7
\ No newline at end of file